@@ -1,5 +1,8 @@
 import tkinter as tk
 from text_utilities import strip_trailing_newline
+import config
+import WordDictionary
+from Indexes import ListRange
 
 class AutoText(tk.Text):
     def __init__(self, master, **kwargs):
@@ -10,10 +13,11 @@ class AutoText(tk.Text):
         )
         self.DELETE_KEYSYMS = ['Delete','KP_Delete','BackSpace']
         self.DELETE_KEYCODES = [458872, 458776]
+        self.MIN_WORD_LENGTH = 2 #Shorter words aren't completed from dictionary
         self.current_text = '' #Actual text input by user
         self.current_cursor = None #Current tracked cursor position
         self.suggestion_text = '' #Current autocomplete string
-        self.suggestion_list = [] #Current possible autocompletions
+        self.suggestions = None #Range of possible autocompletions, see Indexes.PrefixRange
         self.tag_configure('grey', foreground='#666666')
         
     def get_contents(self):
@@ -86,7 +90,7 @@ class AutoText(tk.Text):
         self.current_text = ''
         self.current_cursor = None
         self.suggestion_text = ''
-        self.suggestion_list = []
+        self.suggestions = None
         
     def update_display(self):
         #self.debug('update_display')
@@ -160,16 +164,43 @@ class AutoText(tk.Text):
         error_message = 'get_suggestion must be overridden by subclass'
         raise NotImplementedError(error_message)
 
+    def get_partial(self):
+        """ Typed text completed by suggestions | None -> str """
+        return self.current_text
+
+    def get_language(self):
+        """ Language of typed words, for word completion | None -> str """
+        return config.config_dict['language']
+
+    def get_word_suggestions(self, text):
+        """ Complete last word of text from language dictionary | str -> ListRange
+
+        Suggestions are the whole text with the word completed. The typed
+        text is kept, so a capitalized word is completed from its lowercase
+        form if it isn't in the dictionary, and a word typed without accents
+        from its accented forms if accents are ignored in config.
+        """
+        words = text.split()
+        if not words or text[-1].isspace() or len(words[-1]) < self.MIN_WORD_LENGTH:
+            return ListRange([])
+        dictionary = WordDictionary.get_dictionary(self.get_language())
+        if dictionary is None:
+            return ListRange([])
+        word = words[-1]
+        fold = config.get_fold_accents()
+        completions = (dictionary.complete(word, fold=fold)
+                       or dictionary.complete(word.lower(), fold=fold))
+        return ListRange([text + completion[len(word):] for completion in completions], text)
+
     def update_suggestions(self):
-        """ Removes impossible suggestions as user types | None -> None """
+        """ Narrow suggestions to typed text, in O(log n) | None -> None """
         #self.debug('update_suggestions')
-        self.suggestion_list = [suggestion for suggestion in self.suggestion_list
-                                if suggestion.startswith(self.current_text)
-                                and not suggestion == self.current_text]
+        if self.suggestions:
+            self.suggestions = self.suggestions.narrow(self.get_partial())
         #self.debug('update_suggestions', out=True)
         
     def reset_suggestions(self):
-        self.suggestion_list = []
+        self.suggestions = None
         self.suggestion_text = ''
         
     def ignore_suggestion(self):
@@ -301,7 +332,7 @@ class AutoText(tk.Text):
         print(f'display_text = {self.get_contents()}')
         print(f'display_cursor = {self.get_cursor()}')
         print(f'suggestion_text = {self.suggestion_text}')
-        print(f'suggestion_list = {self.suggestion_list}')
+        print(f'suggestions = {self.suggestions}')
         if out:
             print(f'Leaving: {name}')
 
@@ -2,20 +2,56 @@
 
 Implements all the logic related to database queries and storage.
 
-Presently, databases are implemented as Pandas dataframes. It might eventually
-be better to convert it to a form of SQL.
+Databases are stored sparsely as links between rows and columns, using the
+storage classes in Storage.py. The storage format is set in config:
+    'pickle': LinkStore, rewritten whole on each save (default)
+    'sqlite': SQLiteStore, only changed rows written on each save
+    'columnar': LinkStore memory-mapped from a columnar file, see columnar.py
 
-Database variable:
-    db
+With pickle storage in journal mode (config 'journal') and with columnar
+storage, each save only appends the changes to a journal file, see
+Journal.py. The journal of the active database is folded into the database
+file at exit.
+
+Saves are written by a background thread, see Saver.py. Changes to the
+store hold the database lock, which the thread only holds while copying
+changes, so the interface never waits for the disk. SQLite changes are
+committed by the thread too, holding the lock, so a change made during a
+commit waits for that commit only.
+
+Undo and redo revert the changes tracked by the store since each undo
+point. Changes are tracked by id, see Storage.Store.
+
+Lookups that would scan every key or phrase use the name indexes in
+Indexes.py, which the store keeps up to date. Keys typed with a typo or two
+are matched to the closest stored keys (see Indexes.FuzzyIndex). Phrases
+are found by any of their words or by any part of their text with
+indexes saved next to the database at exit, so they aren't built again on
+next start.
+
+Completions of typed prefixes are cached until names are added or
+removed, see SuggestionCache.py.
+
+Keys and phrases are ranked by decayed usage, see Ranker.py. Uses are
+recorded when entries are copied or saved.
+
+Older databases saved as Pandas dataframes are converted on load.
+
+Database variables:
+    store
+    db (dense pd.DataFrame view, for display and tests only)
 
 Functions:
-    load_database() -> pd.DataFrame
-    get_phrase_series() -> pd.Series
+    load_database() -> LinkStore or SQLiteStore
+    get_phrase_series() -> pd.Index
     save(pd.DataFrame)
     add_column_if_missing(string, pd.DataFrame)
-    initialize_db(list, string) -> pd.DataFrame
+    initialize_db(list, string)
     save_entry(list, string)
-    get_phrase_list(list) -> list
+    get_phrase_list(list, opt:bool) -> list
+    closest_keys(string, opt:int) -> list
+    search_phrases(string) -> list
+    search_substring(string, opt:bool) -> list
     valid_keys(string) -> list
     get_words(list, int, int) -> list
     generate_key_list(list) -> list
@@ -23,57 +59,213 @@ Functions:
     generate_test_db(kwargs: str, int)
 """
 
+import atexit
+import functools
 import random
 import shutil
+import threading
 import pandas as pd
 import numpy as np
 import config
+import columnar
+from Storage import LinkStore, SQLiteStore
+from Indexes import (NormalizedIndex, PrefixIndex, FrontCodedIndex, FuzzyIndex, TokenIndex,
+                     TrigramIndex, PrefixRange, ListRange)
+from text_utilities import normalize, fold, fold_accents
+from Journal import Journal
+from Ranker import Ranker
+from Saver import Saver
+from SuggestionCache import SuggestionCache
+
+def locked(method):
+    """ Hold database lock while method changes store | function -> function """
+    @functools.wraps(method)
+    def locked_method(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return locked_method
 
 class Database():
     """ Abstract class """
 
     def __init__(self, name=None):
         self.name = name #Defined by subclasses
-        self.undo_db_list = [] #Cleared after each session
-        self.redo_db_list = [] #Cleared after each session
-        self.db = self.load_database()
-        
+        self.undo_list = [] #Changes tracked since each undo point, by id
+        self.redo_list = [] #Changes made by each undo, by id
+        self.journal = None #Journal object in journal mode
+        self.lock = threading.RLock() #Held while store changes or is copied
+        self.saver = None #Background writer of saves
+        self.saved_indexes = [] #Written next to database on checkpoint
+        self.suggestion_cache = SuggestionCache() #Completions by prefix
+        Saver.flush_all() #Another instance may have pending changes
+        self.store = self.load_database()
+        self.ranker = Ranker.load(self.get_ranking_filepath())
+        self.saver = Saver(self.write)
+        self.ranking_saver = Saver(self.write_ranking) #Scores change on every copy
+
+    @property
+    def db(self):
+        """ Dense DataFrame view of database | None -> pd.DataFrame
+
+        Memory is rows x columns, so only use for display and tests.
+        """
+        return self.store.to_frame()
+
     def get_filepath(self):
         """ Get full filepath of database file | None -> Path """
         folder = config.get_db_path()
-        extension = '.pickle'
+        extension = config.get_db_extension()
         filename = self.name + extension
         filepath = folder / filename
         return filepath
+
+    def get_ranking_filepath(self):
+        """ Get filepath of usage scores, shared by storage formats | None -> Path """
+        return self.get_filepath().with_suffix('.ranking')
+
+    def get_tokens_filepath(self):
+        """ Get filepath of saved word index, shared by storage formats | None -> Path """
+        return self.get_filepath().with_suffix('.tokens')
+
+    def get_trigrams_filepath(self):
+        """ Get filepath of saved substring index, shared by storage formats | None -> Path """
+        return self.get_filepath().with_suffix('.trigrams')
         
     def load_database(self):
-        """ Loads database from disk if it exists | None -> pd.DataFrame or None """
+        """ Loads database from disk if it exists | None -> LinkStore or SQLiteStore """
+        if config.get_storage() == 'sqlite':
+            return self.load_sqlite_database()
+        filepath = self.get_filepath()
+        if config.get_storage() == 'columnar':
+            store = self.load_columnar_database(filepath)
+            self.journal = Journal(filepath, columnar.write)
+            self.journal.start(store)
+            return store
+        store = self.load_pickle_database(filepath)
+        if config.get_journal():
+            self.journal = Journal(filepath)
+            self.journal.start(store)
+        return store
+
+    @staticmethod
+    def load_pickle_database(filepath):
+        """ Loads pickle database and replays its journal if any | Path -> LinkStore """
+        journal = Journal(filepath)
         try:
-            db = pd.read_pickle(self.get_filepath())
-            print('Loading saved key dataframe')
-            print(db)
+            store = LinkStore.load(filepath)
+            journal.recover(store)
+            print('Loading saved database')
+            print(store)
         except FileNotFoundError or AttributeError:
-            print('No saved key dataframe')
-            db = pd.DataFrame() #Initialize empty db
-            db.to_pickle(self.get_filepath()) 
-        return db
-
-    def reload_database(self):
-        """ Reload db from disk - used for undo and redo """
-        self.db = self.load_database()
+            print('No saved database')
+            journal.discard() #Left over from a deleted database
+            store = LinkStore() #Initialize empty db
+            store.save(filepath)
+        return store
+
+    def load_columnar_database(self, filepath):
+        """ Opens columnar database, converting pickle if needed | Path -> LinkStore """
+        if not filepath.exists():
+            pickle_filepath = filepath.with_suffix('.pickle')
+            if pickle_filepath.exists(): #First use of columnar storage
+                print('Converting saved pickle database')
+                state = self.load_pickle_database(pickle_filepath).get_state()
+            else:
+                print('No saved database')
+                Journal(filepath).discard() #Left over from a deleted database
+                state = LinkStore().get_state()
+            columnar.write(state, filepath)
+        store = LinkStore.open_columnar(filepath)
+        Journal(filepath, columnar.write).recover(store)
+        print(store)
+        return store
+
+    def load_sqlite_database(self):
+        """ Opens SQLite database, converting pickle if needed | None -> SQLiteStore """
+        filepath = self.get_filepath()
+        pickle_filepath = filepath.with_suffix('.pickle')
+        new_database = not filepath.exists()
+        store = SQLiteStore(filepath)
+        if new_database and pickle_filepath.exists(): #First use of SQLite
+            print('Converting saved pickle database')
+            pickle_store = self.load_pickle_database(pickle_filepath)
+            store.import_state(pickle_store.get_state())
+        print(store)
+        return store
 
     def save(self):
-        """ Save contents of database to disk | db.DataFrame -> None """
-        self.db.to_pickle(self.get_filepath())
+        """ Save contents of database to disk in background | None -> None """
+        self.saver.mark_dirty()
+
+    def write_ranking(self):
+        """ Write usage scores if changed, called by saver thread | None -> None
+
+        Scores change on every copy, so they have their own saver rather
+        than rewriting the database with them.
+        """
+        with self.lock:
+            if not self.ranker.dirty:
+                return
+            state = self.ranker.get_state()
+            self.ranker.dirty = False
+        Ranker.write_state(state, self.get_ranking_filepath())
+
+    def write(self):
+        """ Write changes to disk, called by saver thread | None -> None
+
+        The lock is only held while changes are copied from the store, or
+        while SQLite commits, as the connection holds the changes.
+        """
+        if isinstance(self.store, SQLiteStore):
+            with self.lock:
+                self.store.save()
+        elif self.journal:
+            with self.lock:
+                records = self.store.take_records()
+            self.journal.write(records)
+            if self.journal.needs_checkpoint():
+                self.journal.wait()
+                with self.lock:
+                    self.journal.checkpoint(self.store)
+        else:
+            with self.lock:
+                state = self.store.get_state()
+            pd.to_pickle(state, self.get_filepath())
+
+    def flush(self, wait=True):
+        """ Write pending changes and wait until on disk | opt:bool -> None """
+        self.saver.flush(wait)
+        self.ranking_saver.flush(wait)
+
+    def get_durable_time(self):
+        """ Time of last completed write, None if none yet | None -> float """
+        return self.saver.durable_time
+
+    def checkpoint(self):
+        """ Fold journal into database file in journal mode | None -> None
+
+        Saved indexes are also written, see save_indexes.
+        """
+        self.flush()
+        if self.journal:
+            with self.lock:
+                self.journal.checkpoint(self.store, background=False)
+        self.save_indexes()
+
+    def save_indexes(self):
+        """ Write saved indexes changed since last written | None -> None """
+        with self.lock:
+            for index in self.saved_indexes:
+                index.save()
 
     def get_index(self):
-        return list(self.db.index.values)
+        return self.store.row_names()
 
     def get_columns(self):
-        return list(self.db.columns.values)
+        return self.store.column_names()
         
     def initialize_db(self, entry_1, entry_2):
-        """ Create new database on first startup | -> pd.DataFrame """
+        """ Create new database on first startup | -> None """
         error_message = 'initialize_db must be overridden by subclass'
         raise NotImplementedError(error_message)
 
@@ -86,6 +278,16 @@ class Database():
         """ Save new combination to database | str, str -> None """
         error_message = 'save_entry must be overridden by subclass'
         raise NotImplementedError(error_message)
+
+    def save_entries(self, entries, undo=True):
+        """ Save many combinations at once | iterable(str, str), opt:bool -> None """
+        error_message = 'save_entries must be overridden by subclass'
+        raise NotImplementedError(error_message)
+
+    def record_use(self, entry_1, entry_2):
+        """ Count use of copied or saved combination for ranking | str, str -> None """
+        error_message = 'record_use must be overridden by subclass'
+        raise NotImplementedError(error_message)
     
     @staticmethod
     def get_words(word_list, minimum, maximum):
@@ -107,183 +309,381 @@ class Database():
         return ' '.join(Database.get_words(word_list, 8, 30))
 
     def generate_test_db(self, language='fr', size=500):
-        """ Adds random key/phrase entries to a test db | None -> None """
+        """ Adds random key/phrase entries to a test db | None -> None
+
+        Entries are saved in one batch, see synthetic.py for large databases.
+        """
         if language == 'fr':
             with open('language/mots.txt', 'r') as f:
                 word_list = f.read().splitlines()
         elif language == 'en':
             with open('/usr/share/dict/words', 'r') as f:
                 word_list = f.read().splitlines()
-        for i in range(size):
-            print(f'Generating entry {i+1} of {size}')
-            self.save_entry(Database.generate_key_list(word_list),
-                            Database.generate_phrase(word_list))
-        print(self.db)
-
-    def generate_undo_filepath(self):
-        """ Generate filepath for undo file | None -> Path """
-        session_path = config.get_session_path()
-        name = 'undo_' + str(len(self.undo_db_list)) + '.pickle'
-        filepath = session_path / name
-        return filepath
+        print(f'Generating {size} entries')
+        self.save_entries((Database.generate_key_list(word_list),
+                           Database.generate_phrase(word_list))
+                          for i in range(size))
+        print(self)
 
     def prepare_undo(self):
-        """ Saves current db state to undo file and saves path | None -> None """
-        db_filepath = self.get_filepath()
-        filepath = self.generate_undo_filepath()
-        shutil.copy(db_filepath, filepath)
-        self.undo_db_list.append(filepath)
-
-    def generate_redo_filepath(self):
-        """ Generate filepath for redo file | None -> Path """
-        session_path = config.get_session_path()
-        name = 'redo_' + str(len(self.redo_db_list)) + '.pickle'
-        filepath = session_path / name 
-        return filepath
+        """ Start undo point before a change | None -> None
+
+        Changes from here on are undone together. Redo is no longer possible.
+        """
+        with self.lock:
+            self.redo_list.clear()
+            self.start_undo_point()
+
+    def clear_undo(self):
+        """ Forget undo and redo history and stop tracking | None -> None """
+        with self.lock:
+            self.undo_list.clear()
+            self.redo_list.clear()
+            self.store.changes = None
+
+    def start_undo_point(self):
+        """ Track changes from here on in new undo point | None -> None """
+        self.store.changes = []
+        self.undo_list.append(self.store.changes)
 
-    def prepare_redo(self):
-        """ Saves current db state to redo file and saves path | None -> None """
-        db_filepath = self.get_filepath()
-        filepath = self.generate_redo_filepath()
-        shutil.copy(db_filepath, filepath)
-        self.redo_db_list.append(filepath)
-    
     def undo(self):
-        """ Reverts previous database save command | None -> None """
-        if not self.undo_db_list: #If no previous saved state
+        """ Reverts changes since last undo point | None -> None """
+        if not self.undo_list: #If no undo point
             return
-        #Part 1: Save current state to temp backup
-        self.prepare_redo()
-        #Part 2: Revert previous save command
-        db_filepath = self.get_filepath()
-        revert_filepath = self.undo_db_list[-1]
-        shutil.copy(revert_filepath, db_filepath)
-        self.undo_db_list.pop().unlink()
-        self.reload_database()
-    
+        with self.lock:
+            self.redo_list.append(self.store.revert(self.undo_list.pop()))
+            #Later changes are undone with previous undo point
+            self.store.changes = self.undo_list[-1] if self.undo_list else None
+        self.save()
+
     def redo(self):
         """ Reverts previous undo call | None -> None """
-        if not self.redo_db_list: # If no undo in memory
+        if not self.redo_list: #If no undo in memory
             return
-        #Part 1: Save current state to temp backup
-        self.prepare_undo()
-        #Part 2: Revert previous undo command
-        db_filepath = self.get_filepath()
-        revert_filepath = self.redo_db_list[-1]
-        shutil.copy(revert_filepath, db_filepath)
-        self.redo_db_list.pop().unlink()
-        self.reload_database()
+        with self.lock:
+            self.start_undo_point()
+            self.store.changes.extend(self.store.revert(self.redo_list.pop()))
+        self.save()
 
     def __repr__(self):
-        return self.db.__repr__()
+        return self.store.__repr__()
 
     def __str__(self):
-        return self.db.__str__()
+        return self.store.__str__()
+
+@atexit.register
+def checkpoint_active_database():
+    """ Fold journal of active database into its file at exit | None -> None """
+    db = config.active_objects['db']
+    if db:
+        db.checkpoint()
 
 class StandardDatabase(Database):
     """
     Database class for Key/Phrase combinations
 
-    Keys form the column names.
-    Phrases form the index.
+    Keys form the columns.
+    Phrases form the rows.
 
-    Values are booleans. True indicates a valid key / phrase match.
+    A link between a key and a phrase indicates a valid key / phrase match.
     """
 
     def __init__(self):
         Database.__init__(self, name='standard')
+        self.add_indexes()
 
+    def add_indexes(self):
+        """ Attach indexes of keys (columns) and phrases (rows) to store | None -> None
+
+        Also called by TranslationDatabase, where language 1 keys are the
+        keys and language 2 keys the phrases, so lookups inherited from
+        StandardDatabase work on both.
+        """
+        #Sorted keys for completion, caseless or also without accents
+        self.key_index = PrefixIndex(self.store.column_names)
+        self.folded_key_index = PrefixIndex(self.store.column_names, fold)
+        #Keys by typos, for keys not stored as typed
+        self.fuzzy_key_index = FuzzyIndex(self.store.column_names)
+        #Sorted phrases for completion by (case specific, accents ignored)
+        self.phrase_indexes = {
+            (True, False): FrontCodedIndex(self.store.row_names),
+            (False, False): FrontCodedIndex(self.store.row_names, normalize),
+            (True, True): FrontCodedIndex(self.store.row_names, fold_accents),
+            (False, True): FrontCodedIndex(self.store.row_names, fold)
+        }
+        #Phrases by words and by substrings they contain, saved at exit
+        self.token_index = TokenIndex(self.store.row_names, self.get_tokens_filepath())
+        self.trigram_index = TrigramIndex(self.store.row_names,
+                                          self.get_trigrams_filepath())
+        self.store.attach_index('columns', self.key_index)
+        self.store.attach_index('columns', self.folded_key_index)
+        self.store.attach_index('columns', self.fuzzy_key_index)
+        for index in self.phrase_indexes.values():
+            self.store.attach_index('rows', index)
+        for index in [self.token_index, self.trigram_index]:
+            self.store.attach_index('rows', index)
+            self.saved_indexes.append(index)
+
+    @locked
     def add_column_if_missing(self, name):
-        """ Initializes column if it doesn't exist | str, pd.DataFrame -> None """
-        if not name in self.db.columns:
-            self.db[name] = False
+        """ Initializes column if it doesn't exist | str -> None """
+        self.store.add_column(name)
 
+    @locked
     def initialize_db(self, key_list, phrase):
-        """ Create new database on first startup | list(str), str -> pd.DataFrame """
+        """ Create new database on first startup | list(str), str -> None """
         print('Initializing database')
-        row_data = []
-        for i in range(len(key_list)):
-            row_data.append(True)
-        self.db = pd.DataFrame.from_dict({phrase:row_data},
-                                         orient='index',
-                                         columns=key_list)
-        self.db.to_pickle(self.get_filepath())
+        self.store.set_row(phrase, key_list)
+        self.save()
 
+    @locked
     def save_entry(self, key_list, phrase):
         """ Save new key/phrase combination to database | list(str), str -> None """
         if not phrase: #To prevent accidental empty phrase entry
             return
-        if self.db.empty: #If first entry, initialize new database
+        if not key_list: #If no keys given
+            self.delete_phrase(phrase)
+            return
+        if self.store.is_empty(): #If first entry, initialize new database
             self.initialize_db(key_list, phrase)
-            self.save_entry(key_list, phrase)
         else:
-            print('Found DataFrame')
-            if not key_list: #If no keys given
-                self.delete_phrase(phrase)
-                return
-            self.db.loc[phrase] = False #Initialize row with all False 
-            for key in key_list:
-                self.add_column_if_missing(key) #Add missing new keys 
-            self.db.loc[phrase, key_list] = True #Set keys in key_list to True
+            print('Found database')
+            #Replaces previous keys of phrase and adds missing new keys
+            self.store.set_row(phrase, key_list)
             self.save()
 
+    @locked
+    def save_entries(self, entries, undo=True):
+        """ Save many key/phrase combinations | iterable(list(str), str) -> None
+
+        Same result as save_entry for each entry, with one undo point and
+        one save. Entries are read from the iterable as they are saved.
+        With undo False, no undo point is created (see importer.py).
+        """
+        if undo:
+            self.prepare_undo()
+        rows = [] #Entries waiting to be saved together
+        for key_list, phrase in entries:
+            if not phrase: #To prevent accidental empty phrase entry
+                continue
+            if key_list:
+                rows.append((phrase, key_list))
+                continue
+            self.store.set_rows(rows) #Saved before phrase is deleted
+            rows = []
+            try:
+                self.store.remove_row(phrase, prune=True)
+            except KeyError:
+                pass
+        self.store.set_rows(rows)
+        self.save()
+
+    def record_use(self, key_list, phrase):
+        """ Count use of phrase and its stored keys for ranking | list(str), str -> None
+
+        Phrases and keys that aren't stored are ignored.
+        """
+        with self.lock:
+            if not self.store.has_row(phrase):
+                return
+            self.ranker.record('rows', [phrase])
+            self.ranker.record('columns', [key for key in key_list
+                                           if self.store.has_column(key)])
+        self.ranking_saver.mark_dirty()
+
+    @locked
     def delete_phrase(self, phrase):
         """ Delete phrase from database and unused keys | str, str -> None """
         try:
-            self.db.drop(phrase, inplace=True)
-            self.db = self.db.loc[:, self.db.any()]
+            self.store.remove_row(phrase, prune=True) #Only its keys are checked
             self.save()
         except KeyError:
             pass
             
     def get_phrase_series(self):
-        """ Gets phrase Series from key DataFrame | None -> pd.Series """
-        return self.db.index
+        """ Gets phrase index from database | None -> pd.Index """
+        return pd.Index(self.store.row_names())
             
-    def get_phrase_list(self, key_list):
-        """ Get list of valid phrases for a list of keys | list(str) -> list(str) """
+    def get_phrase_list(self, key_list, fuzzy=False):
+        """ Get list of valid phrases for a list of keys | list(str), opt:bool -> list(str)
+
+        Most used phrases come first. With fuzzy, keys not stored are
+        replaced by the closest stored keys, see correct_keys.
+        """
         if not key_list:
             return None
+        if fuzzy:
+            key_list = self.correct_keys(key_list)
         try:
-            index = self.db.loc[self.db[key_list].all(axis=1), :].index
-            if list(index.values):
-                return list(index.values)
+            phrase_list = self.store.rows_with_all(key_list)
+            if phrase_list:
+                return self.ranker.rank('rows', phrase_list)
             else:
                 return None
         except KeyError:
             return None
 
+    def correct_keys(self, key_list):
+        """ Keys not stored replaced by the closest stored key | list(str) -> list(str)
+
+        Of stored keys equally close, the most used is taken. Keys with no
+        stored key close enough are kept as typed.
+        """
+        return [key if self.store.has_column(key)
+                else self.ranker.top('columns', self.fuzzy_key_index.nearest(key) or [key])[0]
+                for key in key_list]
+
+    def closest_keys(self, key, max_distance=None):
+        """ Stored keys within a few typos of key, closest first | str, opt:int -> list(str)
+
+        Case and accents aren't counted as typos. The number of typos
+        allowed grows with the length of key, see Indexes.FuzzyIndex.
+        """
+        if not key:
+            return []
+        return self.fuzzy_key_index.closest(key, max_distance)
+
+    def count_phrases(self, key_list):
+        """ Count valid phrases for a list of keys | list(str) -> int """
+        if not key_list:
+            return 0
+        try:
+            return self.store.count_rows_with_all(key_list)
+        except KeyError:
+            return 0
+
+    def iter_entries(self):
+        """ All key/phrase combinations, read lazily | None -> iterator(tuple)
+
+        Yields (key_list, phrase) as taken by save_entries.
+        """
+        for phrase, key_list in self.store.iter_rows():
+            yield key_list, phrase
+
     def get_matching_keys(self, phrase):
         """ Get matching keys for phrase if any | str -> list(str) """
         if not phrase:
             return []
         try:
-            row = self.db.loc[phrase, :]
-            return list(row[row==True].index)
+            return self.store.columns_of_row(phrase)
         except KeyError:
             return []
         
+    def get_completions(self, field, partial, index, compute):
+        """ Completions of partial from suggestion cache, computed on a miss
+
+        str, str, PrefixIndex or FrontCodedIndex, function -> object
+
+        Entries are keyed by database, field and form of partial in index,
+        and computed with compute(partial). They are dropped when names
+        are added or removed (see SuggestionCache.py).
+        """
+        key = (self.name, field, index.get_form(partial))
+        return self.suggestion_cache.get(key, self.store.version,
+                                         lambda: compute(partial))
+
+    def complete(self, field, partial, index, folded_index):
+        """ Names starting with partial, sorted, in O(log n + results)
+
+        str, str, PrefixIndex, PrefixIndex -> list(str)
+
+        folded_index is used if accents are ignored in config. Lists are
+        cached by field, so they must not be changed.
+        """
+        if not partial:
+            return []
+        if config.get_fold_accents():
+            field, index = 'folded_' + field, folded_index
+        return self.get_completions(field, partial, index, index.starting_with)
+
+    def complete_range(self, field, partial, index, folded_index):
+        """ Range of names extending partial, in O(log n), see Indexes.PrefixRange
+
+        str, str, PrefixIndex or FrontCodedIndex, PrefixIndex or FrontCodedIndex
+        -> PrefixRange
+
+        Names are read from the range as needed. Empty for empty partial.
+        folded_index is used if accents are ignored in config. Ranges are
+        cached by field.
+        """
+        if not partial:
+            return ListRange([])
+        if config.get_fold_accents():
+            field, index = 'folded_' + field, folded_index
+        return self.get_completions(field + '_range', partial, index,
+                                    functools.partial(PrefixRange, index))
+
     def valid_keys(self, partial_key):
-        """ Get list of db keys starting with specific string | str -> list(str) """
-        if partial_key: #Not case specific
-            mask = self.db.columns.str.lower().str.startswith(partial_key.lower())
-            return list(self.db.columns[mask])
-        return []
-
-    def valid_phrases(self, partial_phrase):
-        """ Get list of db phrases starting with specific string | str -> list(str) """
-        if partial_phrase: #Case specific
-            return list(self.db.index[self.db.index.str.startswith(partial_phrase)])
-        return []
+        """ Get list of db keys starting with specific string | str -> list(str)
+
+        Not case specific. Accents are ignored if set in config.
+        """
+        return self.complete('keys', partial_key, self.key_index, self.folded_key_index)
+
+    def valid_phrases(self, partial_phrase, case_specific=True):
+        """ Get list of db phrases starting with specific string
+
+        str, opt:bool -> list(str)
+
+        Phrases are sorted. Accents are ignored if set in config.
+        """
+        return self.complete('phrases' if case_specific else 'caseless_phrases',
+                             partial_phrase, self.phrase_indexes[case_specific, False],
+                             self.phrase_indexes[case_specific, True])
+
+    def key_range(self, partial_key):
+        """ Range of db keys extending string, for suggestions | str -> PrefixRange
+
+        Not case specific. Accents are ignored if set in config.
+        """
+        return self.complete_range('keys', partial_key, self.key_index,
+                                   self.folded_key_index)
+
+    def phrase_range(self, partial_phrase, case_specific=True):
+        """ Range of db phrases extending string, for suggestions
+
+        str, opt:bool -> PrefixRange
+
+        Accents are ignored if set in config.
+        """
+        return self.complete_range('phrases' if case_specific else 'caseless_phrases',
+                                   partial_phrase, self.phrase_indexes[case_specific, False],
+                                   self.phrase_indexes[case_specific, True])
+
+    def search_phrases(self, query):
+        """ Get list of db phrases containing all words of query | str -> list(str)
+
+        Words are matched whole, in any case and order. Accents are ignored
+        if set in config. Most used phrases come first.
+        """
+        if not query:
+            return []
+        phrases = self.token_index.search(query, config.get_fold_accents())
+        return self.ranker.rank('rows', phrases)
+
+    def search_substring(self, pattern, case_specific=False):
+        """ Get list of db phrases containing pattern anywhere
+
+        str, opt:bool -> list(str)
+
+        As in SQL LIKE, '%' in pattern stands for any characters and '_'
+        for any character. Accents are ignored if set in config. Most used
+        phrases come first.
+        """
+        if not pattern:
+            return []
+        phrases = self.trigram_index.search(pattern, case_specific,
+                                            config.get_fold_accents())
+        return self.ranker.rank('rows', phrases)
 
 class TranslationDatabase(StandardDatabase):
     """
     Database class for language pair databases.
 
-    Language 1 keys form the column names.
-    Language 2 keys from the index.
+    Language 1 keys form the columns.
+    Language 2 keys form the rows.
 
-    Values are booleans. True indicates a valid translation.
+    A link between two keys indicates a valid translation.
     """
 
     def __init__(self, lang1, lang2):
@@ -294,46 +694,103 @@ class TranslationDatabase(StandardDatabase):
         """
         name = lang1 + '_' + lang2
         Database.__init__(self, name)
-
+        self.add_indexes() #Language 1 keys as keys, language 2 keys as phrases
+        #Stored keys by caseless form, for matches typed in any case
+        self.lang1_index = NormalizedIndex(self.store.column_names)
+        self.lang2_index = NormalizedIndex(self.store.row_names)
+        #Sorted keys for completion, caseless or also without accents
+        self.lang1_prefix_index = self.key_index
+        self.lang2_prefix_index = PrefixIndex(self.store.row_names)
+        self.lang1_folded_index = self.folded_key_index
+        self.lang2_folded_index = PrefixIndex(self.store.row_names, fold)
+        #Keys by typos, for keys not stored as typed
+        self.lang1_fuzzy_index = self.fuzzy_key_index
+        self.lang2_fuzzy_index = FuzzyIndex(self.store.row_names)
+        self.store.attach_index('columns', self.lang1_index)
+        for index in [self.lang2_index, self.lang2_prefix_index,
+                      self.lang2_folded_index, self.lang2_fuzzy_index]:
+            self.store.attach_index('rows', index)
+
+    @locked
     def add_column_if_missing(self, key_lang1):
         """ Initializes column if it doesn't exist | str -> None """
-        if not key_lang1 in self.db.columns:
-            self.db[key_lang1] = False
+        self.store.add_column(key_lang1)
 
+    @locked
     def add_row_if_missing(self, key_lang2):
         """ Initialize row if it doesn't exist | str -> None """
-        if not key_lang2 in self.db.index:
-            self.db.loc[key_lang2] = False #Initialize row with all False 
+        self.store.add_row(key_lang2)
             
+    @locked
     def initialize_db(self, key_lang1, key_lang2):
-        """ Create new database on first entry | str, str -> pd.DataFrame """
+        """ Create new database on first entry | str, str -> None """
         print('Initializing database')
-        self.db = pd.DataFrame.from_dict({key_lang2:[True]},
-                                         orient='index',
-                                         columns=[key_lang1])
-        self.db.to_pickle(self.get_filepath())
+        self.store.link_names(key_lang2, key_lang1)
+        self.save()
 
+    @locked
     def save_entry(self, key_lang1, key_lang2):
         """ Save new translation to database | str, str -> None """
         if not key_lang1 or not key_lang2: #To prevent accidental empty entry
             return
-        if self.db.empty: #If first entry, initialize new database
+        if self.store.is_empty(): #If first entry, initialize new database
             self.initialize_db(key_lang1, key_lang2)
-            self.save_entry(key_lang1, key_lang2)
         else:
-            print('Found DataFrame')
+            print('Found database')
             self.add_row_if_missing(key_lang2)
             self.add_column_if_missing(key_lang1) #Add missing new key 
-            self.db.loc[key_lang2, key_lang1] = True #Set key in key_lang1 to True
+            self.store.link_names(key_lang2, key_lang1)
             self.save()
 
+    @locked
+    def save_entries(self, entries, undo=True):
+        """ Save many translations | iterable(str, str), opt:bool -> None
+
+        Same result as save_entry for each entry, with one undo point and
+        one save. Translations of each language 2 key are saved together.
+        With undo False, no undo point is created (see importer.py).
+        """
+        if undo:
+            self.prepare_undo()
+        rows = {} #Language 2 key -> language 1 keys, in order of entry
+        for key_lang1, key_lang2 in entries:
+            if not key_lang1 or not key_lang2: #To prevent accidental empty entry
+                continue
+            self.add_column_if_missing(key_lang1) #Keys added in order of entry
+            rows.setdefault(key_lang2, []).append(key_lang1)
+        new_rows = [(key_lang2, keys_lang1) for key_lang2, keys_lang1 in rows.items()
+                    if not self.store.has_row(key_lang2)]
+        for key_lang2, keys_lang1 in rows.items():
+            if self.store.has_row(key_lang2): #Keeps existing translations
+                for key_lang1 in keys_lang1:
+                    self.store.link_names(key_lang2, key_lang1)
+        self.store.set_rows(new_rows)
+        self.save()
+
+    def record_use(self, key_lang1, key_lang2):
+        """ Count use of stored translation keys for ranking | str, str -> None """
+        with self.lock:
+            if self.store.has_column(key_lang1):
+                self.ranker.record('columns', [key_lang1])
+            if self.store.has_row(key_lang2):
+                self.ranker.record('rows', [key_lang2])
+        self.ranking_saver.mark_dirty()
+
+    @locked
     def delete_match(self, key_lang1, key_lang2):
         """ Delete translation match from database | str, str -> None """
-        self.db.loc[key_lang2, key_lang1] = False
-        self.db = self.db.loc[:, self.db.any()]
-        self.db = self.db.loc[self.db.any(axis=1),:]
+        self.store.unlink_names(key_lang2, key_lang1, prune=True)
         self.save()
 
+    def iter_entries(self):
+        """ All translation matches, read lazily | None -> iterator(tuple)
+
+        Yields (key_lang1, key_lang2) as taken by save_entries.
+        """
+        for key_lang2, lang1_keys in self.store.iter_rows():
+            for key_lang1 in lang1_keys:
+                yield key_lang1, key_lang2
+
     def get_lang1_keys(self):
         """ Gets list of keys for language 1 | None -> list """
         return self.get_columns() #alias for get_columns
@@ -342,44 +799,98 @@ class TranslationDatabase(StandardDatabase):
         """ Gets list of keys for language 2 | None -> list """
         return self.get_index() #alias for get_index
             
-    def get_lang1_matches(self, key_lang2):
-        """ Get list of valid translations for language 2 key | str -> list(str) """
+    @staticmethod
+    def find_keys(key, index, folded_index):
+        """ Stored keys matching key in any case, or without accents if set
+
+        str, NormalizedIndex, PrefixIndex -> list(str)
+        """
+        keys = index.lookup(key)
+        if not keys and config.get_fold_accents():
+            keys = folded_index.lookup(key)
+        return keys
+
+    @staticmethod
+    def merge_matches(keys, get_matches):
+        """ Matches of all keys without repeats | list(str), function -> list(str) """
+        return list(dict.fromkeys(match for key in keys for match in get_matches(key)))
+
+    def get_lang1_matches(self, key_lang2, fuzzy=False):
+        """ Get list of valid translations for language 2 key | str, opt:bool -> list(str)
+
+        If key_lang2 isn't stored as typed, matches of stored keys differing
+        only by case or Unicode form are returned, or with fuzzy, of the
+        closest stored keys. Most used matches come first.
+        """
         try:
-            row = self.db.loc[key_lang2, :]
+            matches = self.store.columns_of_row(key_lang2)
         except KeyError:
-            try:
-                row = self.db.loc[key_lang2.lower(), :]
-            except KeyError:
-                try:
-                    row = self.db.loc[key_lang2.title(), :]
-                except KeyError:
-                    return []
-        return list(row[row==True].index)
-    
-    def get_lang2_matches(self, key_lang1):
-        """ Get list of valid translations for language 1 key | str -> list(str) """
+            keys = self.find_keys(key_lang2, self.lang2_index, self.lang2_folded_index)
+            if not keys and fuzzy and key_lang2:
+                keys = self.lang2_fuzzy_index.nearest(key_lang2)
+            matches = self.merge_matches(keys, self.store.columns_of_row)
+        return self.ranker.rank('columns', matches)
+
+    def get_lang2_matches(self, key_lang1, fuzzy=False):
+        """ Get list of valid translations for language 1 key | str, opt:bool -> list(str)
+
+        If key_lang1 isn't stored as typed, matches of stored keys differing
+        only by case or Unicode form are returned, or with fuzzy, of the
+        closest stored keys. Most used matches come first.
+        """
         try:
-            index = self.db.loc[self.db[key_lang1], :].index
+            matches = self.store.rows_of_column(key_lang1)
         except KeyError:
-            try:
-                index = self.db.loc[self.db[key_lang1.lower()], :].index
-            except KeyError:
-                try:
-                    index = self.db.loc[self.db[key_lang1.title()], :].index
-                except KeyError:
-                    return []
-        return list(index.values)
+            keys = self.find_keys(key_lang1, self.lang1_index, self.lang1_folded_index)
+            if not keys and fuzzy and key_lang1:
+                keys = self.lang1_fuzzy_index.nearest(key_lang1)
+            matches = self.merge_matches(keys, self.store.rows_of_column)
+        return self.ranker.rank('rows', matches)
+
+    def closest_lang1_keys(self, key, max_distance=None):
+        """ Language 1 keys within a few typos of key | str, opt:int -> list(str) """
+        if not key:
+            return []
+        return self.lang1_fuzzy_index.closest(key, max_distance)
+
+    def closest_lang2_keys(self, key, max_distance=None):
+        """ Language 2 keys within a few typos of key | str, opt:int -> list(str) """
+        if not key:
+            return []
+        return self.lang2_fuzzy_index.closest(key, max_distance)
     
     def valid_lang1_keys(self, partial_key):
-        """ Get list of language 1 keys starting with string | str -> list(str) """
-        if partial_key:
-            mask = self.db.columns.str.lower().str.startswith(partial_key.lower())
-            return list(self.db.columns[mask])
-        return []
+        """ Get list of language 1 keys starting with string | str -> list(str)
+
+        Not case specific. Accents are ignored if set in config.
+        """
+        return self.complete('lang1_keys', partial_key, self.lang1_prefix_index,
+                             self.lang1_folded_index)
 
     def valid_lang2_keys(self, partial_key):
-        """ Get list of language 2 keys starting with string | str -> list(str) """
-        if partial_key:
-            mask = self.db.index.str.lower().str.startswith(partial_key.lower())
-            return list(self.db.index[mask])
-        return []
+        """ Get list of language 2 keys starting with string | str -> list(str)
+
+        Not case specific. Accents are ignored if set in config.
+        """
+        return self.complete('lang2_keys', partial_key, self.lang2_prefix_index,
+                             self.lang2_folded_index)
+
+    def lang1_key_range(self, partial_key):
+        """ Range of language 1 keys extending string, for suggestions
+
+        str -> PrefixRange
+
+        Not case specific. Accents are ignored if set in config.
+        """
+        return self.complete_range('lang1_keys', partial_key, self.lang1_prefix_index,
+                                   self.lang1_folded_index)
+
+    def lang2_key_range(self, partial_key):
+        """ Range of language 2 keys extending string, for suggestions
+
+        str -> PrefixRange
+
+        Not case specific. Accents are ignored if set in config.
+        """
+        return self.complete_range('lang2_keys', partial_key, self.lang2_prefix_index,
+                                   self.lang2_folded_index)
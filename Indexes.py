@@ -0,0 +1,1231 @@
+""" Indexes of database names for fast lookups
+
+A database answers lookups that a plain scan of its keys or phrases would
+make O(n) per keystroke. The classes in this module keep the names of rows
+or columns of a store in a structure suited to one kind of lookup.
+
+An index is attached to a store (see Storage.Store.attach_index), which
+calls add and remove for every name added or removed, including by undo
+and journal replay. An index is only built when first queried, so opening
+a database costs nothing. Until then, add and remove are ignored.
+
+Classes:
+    NameIndex
+    NormalizedIndex
+    PrefixIndex
+    FrontCodedIndex
+    PrefixRange
+    ListRange
+    DeleteTable
+    FuzzyIndex
+    PhraseIndex
+    TokenIndex
+    TrigramIndex
+
+Functions:
+    shared_length(str, str) -> int
+    front_code(list(str)) -> tuple(array, str)
+    front_decode(tuple(array, str)) -> list(str)
+    get_deletes(str, int) -> set(str)
+    get_checksum(iterable(str)) -> int
+    intersect(list(np.ndarray)) -> np.ndarray
+    get_trigrams(str) -> np.ndarray
+"""
+
+import os
+import pickle
+import re
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+import numpy as np
+from text_utilities import normalize, fold, fold_accents, tokenize, edit_distance
+
+class NameIndex():
+    """ Abstract class for indexes of row or column names
+
+    Args:
+        get_names (function): Returns all names, called when first queried
+
+    Attributes:
+        version (int): Number of names added and removed, see PrefixRange
+
+    Methods:
+        build()
+        add(str)
+        remove(str)
+        insert(str) @abstract
+        delete(str) @abstract
+    """
+
+    def __init__(self, get_names):
+        self.get_names = get_names
+        self.built = False
+        self.version = 0
+
+    def build(self):
+        """ Index all names if not done yet, called by queries | None -> None """
+        if not self.built:
+            self.built = True
+            for name in self.get_names():
+                self.insert(name)
+
+    def add(self, name):
+        """ Index name added to store | str -> None """
+        self.version += 1
+        if self.built:
+            self.insert(name)
+
+    def remove(self, name):
+        """ Forget name removed from store | str -> None """
+        self.version += 1
+        if self.built:
+            self.delete(name)
+
+    def insert(self, name):
+        """ Add name to index structure | str -> None """
+        error_message = 'insert must be overridden by subclass'
+        raise NotImplementedError(error_message)
+
+    def delete(self, name):
+        """ Remove name from index structure | str -> None """
+        error_message = 'delete must be overridden by subclass'
+        raise NotImplementedError(error_message)
+
+class NormalizedIndex(NameIndex):
+    """ Maps a normalized form to the stored names having that form
+
+    With the default text_utilities.normalize, any casing or Unicode
+    composition of a name is found in one hash lookup.
+
+    Args:
+        get_names (function): Returns all names, called when first queried
+        normalize (function): Form shared by names found together
+
+    Methods:
+        lookup(str) -> list(str)
+        forget(str, str)
+    """
+
+    def __init__(self, get_names, normalize=normalize):
+        NameIndex.__init__(self, get_names)
+        self.normalize = normalize
+        self.forms = {} #Normalized form -> names in insertion order
+
+    def insert(self, name):
+        self.forms.setdefault(self.normalize(name), []).append(name)
+
+    def delete(self, name):
+        self.forget(self.normalize(name), name)
+
+    def forget(self, form, name):
+        """ Remove name from names having form | str, str -> None """
+        names = self.forms[form]
+        names.remove(name)
+        if not names:
+            del self.forms[form]
+
+    def lookup(self, string):
+        """ Stored names with the same normalized form as string | str -> list(str) """
+        self.build()
+        return list(self.forms.get(self.normalize(string), []))
+
+class PrefixIndex(NameIndex):
+    """ Names sorted by normalized form, for completion with binary search
+
+    Forms and names are kept in two parallel lists sorted by form. Names
+    whose form starts with a prefix are a contiguous range found with two
+    bisections, so completion is O(log n + k) for k names. Names with the
+    same form keep their insertion order.
+
+    With text_utilities.fold as normalize, names are found without accents.
+    Forms are computed once when a name is indexed, never while typing.
+
+    Args:
+        get_names (function): Returns all names, called when first queried
+        normalize (function): Form compared with typed prefixes
+
+    Positions are list indexes, see PrefixRange.
+
+    Methods:
+        get_form(str) -> str
+        find_range(str) -> tuple(int, int)
+        starting_with(str) -> list(str)
+        lookup(str) -> list(str)
+        get_bounds() -> tuple(int, int)
+        find_extensions(str, int, int) -> tuple(int, int)
+        get_name(int) -> str
+        iter_names(int, int) -> iterator(str)
+    """
+
+    END = chr(0x10FFFF) #Sorts after any character following a prefix
+
+    def __init__(self, get_names, normalize=normalize):
+        NameIndex.__init__(self, get_names)
+        self.normalize = normalize
+        self.forms = [] #Sorted normalized forms
+        self.names = [] #Name of each form
+
+    def build(self):
+        """ Index all names with one sort if not done yet | None -> None """
+        if not self.built:
+            self.built = True
+            pairs = sorted(((self.normalize(name), name) for name in self.get_names()),
+                           key=lambda pair: pair[0]) #Stable, keeps insertion order
+            self.forms = [form for form, name in pairs]
+            self.names = [name for form, name in pairs]
+
+    def insert(self, name):
+        form = self.normalize(name)
+        index = bisect_right(self.forms, form) #After names with same form
+        self.forms.insert(index, form)
+        self.names.insert(index, name)
+
+    def delete(self, name):
+        index = self.names.index(name, bisect_left(self.forms, self.normalize(name)))
+        del self.forms[index]
+        del self.names[index]
+
+    def get_form(self, name):
+        """ Form of name compared with prefixes | str -> str """
+        return self.normalize(name)
+
+    def find_range(self, prefix):
+        """ Start and stop of names starting with prefix | str -> tuple(int, int) """
+        self.build()
+        prefix = self.normalize(prefix)
+        return (bisect_left(self.forms, prefix),
+                bisect_left(self.forms, prefix + self.END))
+
+    def starting_with(self, prefix):
+        """ Names whose form starts with form of prefix | str -> list(str) """
+        start, stop = self.find_range(prefix)
+        return self.names[start:stop]
+
+    def lookup(self, string):
+        """ Names with the same form as string | str -> list(str) """
+        self.build()
+        form = self.normalize(string)
+        return self.names[bisect_left(self.forms, form):bisect_right(self.forms, form)]
+
+    def get_bounds(self):
+        """ Positions of first name and after last name | None -> tuple(int, int) """
+        self.build()
+        return 0, len(self.names)
+
+    def find_extensions(self, form, start, stop):
+        """ Range of names with longer forms starting with form, within a range
+
+        str, int, int -> tuple(int, int)
+        """
+        return (bisect_right(self.forms, form, start, stop),
+                bisect_left(self.forms, form + self.END, start, stop))
+
+    def get_name(self, position):
+        """ Name at position | int -> str """
+        return self.names[position]
+
+    def iter_names(self, start, stop):
+        """ Names from start to stop, lazily | int, int -> iterator(str) """
+        names = self.names
+        return (names[position] for position in range(start, stop))
+
+def shared_length(previous, string):
+    """ Length of the prefix shared by two strings | str, str -> int
+
+    Slices are compared in a binary search, so characters aren't looped
+    over in Python.
+    """
+    low, high = 0, min(len(previous), len(string))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if previous[:middle] == string[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+def front_code(strings):
+    """ Encode sorted strings as shared prefixes and suffixes
+
+    list(str) -> tuple(array, str)
+
+    Each string is stored as the length of the prefix it shares with the
+    previous string and the rest of it. Lengths go in one array and the
+    rests are joined in one string, so a block takes two objects however
+    many strings it holds.
+    """
+    lengths = array('L')
+    suffixes = []
+    previous = ''
+    for string in strings:
+        shared = shared_length(previous, string)
+        lengths.append(shared)
+        lengths.append(len(string) - shared)
+        suffixes.append(string[shared:])
+        previous = string
+    return lengths, ''.join(suffixes)
+
+def front_decode(block):
+    """ Decode strings encoded by front_code | tuple(array, str) -> list(str) """
+    lengths, text = block
+    strings = []
+    previous = ''
+    position = 0
+    for i in range(0, len(lengths), 2):
+        shared, length = lengths[i], lengths[i+1]
+        previous = previous[:shared] + text[position:position+length]
+        position += length
+        strings.append(previous)
+    return strings
+
+class FrontCodedIndex(NameIndex):
+    """ Names sorted by form in blocks, for phrase completion
+
+    Names are kept in blocks of about BLOCK_SIZE, sorted by form. The first
+    form of each block is kept whole for a binary search, then only the
+    blocks holding matches are read. A change rewrites one block.
+
+    Normalized forms would double the memory used by phrases, so they are
+    front-coded (see front_code): sorted phrases often share their start
+    with the previous one. Names are references to the strings held by the
+    store. Without normalize, forms are the names themselves (case and
+    accents specific) and nothing is copied.
+
+    Args:
+        get_names (function): Returns all names, called when first queried
+        normalize (function): Form compared with typed prefixes, or None
+
+    Positions are (block number, index in block) tuples, the position
+    after the last name of a block being the start of the next one.
+
+    Methods:
+        starting_with(str) -> list(str)
+        lookup(str) -> list(str)
+        iter_from(str) -> iterator(tuple(str, str))
+        get_bounds() -> tuple(tuple(int, int), tuple(int, int))
+        find_position(str, tuple, tuple, opt:bool) -> tuple(int, int)
+        find_extensions(str, tuple, tuple) -> tuple(tuple, tuple)
+        get_name(tuple(int, int)) -> str
+        iter_names(tuple(int, int), tuple(int, int)) -> iterator(str)
+    """
+
+    BLOCK_SIZE = 32 #Names per block, blocks split at twice this size
+
+    def __init__(self, get_names, normalize=None):
+        NameIndex.__init__(self, get_names)
+        self.normalize = normalize
+        self.heads = [] #First form of each block
+        self.form_blocks = [] #Front-coded forms, unused without normalize
+        self.name_blocks = [] #Names of each block
+
+    def get_form(self, name):
+        """ Form of name compared with prefixes | str -> str """
+        return self.normalize(name) if self.normalize else name
+
+    def build(self):
+        """ Index all names with one sort if not done yet | None -> None """
+        if not self.built:
+            self.built = True
+            pairs = sorted(((self.get_form(name), name) for name in self.get_names()),
+                           key=lambda pair: pair[0]) #Stable, keeps insertion order
+            for start in range(0, len(pairs), self.BLOCK_SIZE):
+                self.add_block(len(self.heads), pairs[start:start+self.BLOCK_SIZE])
+
+    def get_block(self, number):
+        """ Decode forms and names of block | int -> list(tuple(str, str)) """
+        names = self.name_blocks[number]
+        if not self.normalize:
+            return list(zip(names, names))
+        return list(zip(front_decode(self.form_blocks[number]), names))
+
+    def set_block(self, number, pairs):
+        """ Encode forms and names of block | int, list(tuple(str, str)) -> None """
+        self.heads[number] = pairs[0][0]
+        self.name_blocks[number] = [name for form, name in pairs]
+        if self.normalize:
+            self.form_blocks[number] = front_code([form for form, name in pairs])
+
+    def add_block(self, number, pairs):
+        """ Insert new block before block number | int, list(tuple(str, str)) -> None """
+        self.heads.insert(number, None)
+        self.form_blocks.insert(number, None)
+        self.name_blocks.insert(number, None)
+        self.set_block(number, pairs)
+
+    def insert(self, name):
+        form = self.get_form(name)
+        if not self.heads:
+            self.add_block(0, [(form, name)])
+            return
+        number = max(bisect_right(self.heads, form) - 1, 0)
+        pairs = self.get_block(number)
+        pairs.insert(bisect_right([form for form, _ in pairs], form), (form, name))
+        if len(pairs) > 2 * self.BLOCK_SIZE: #Split in two blocks
+            self.add_block(number + 1, pairs[self.BLOCK_SIZE:])
+            pairs = pairs[:self.BLOCK_SIZE]
+        self.set_block(number, pairs)
+
+    def delete(self, name):
+        form = self.get_form(name)
+        number = max(bisect_left(self.heads, form) - 1, 0)
+        while name not in self.name_blocks[number]: #Same form can span blocks
+            number += 1
+        pairs = self.get_block(number)
+        pairs.remove((form, name))
+        if pairs:
+            self.set_block(number, pairs)
+        else:
+            del self.heads[number]
+            del self.form_blocks[number]
+            del self.name_blocks[number]
+
+    def iter_from(self, prefix):
+        """ Forms and names from first form not before prefix, lazily
+
+        str -> iterator(tuple(str, str))
+
+        Blocks are decoded one at a time as the iterator advances.
+        """
+        self.build()
+        form = self.get_form(prefix)
+        number = max(bisect_left(self.heads, form) - 1, 0)
+        for number in range(number, len(self.heads)):
+            for pair in self.get_block(number):
+                if pair[0] >= form:
+                    yield pair
+
+    def starting_with(self, prefix):
+        """ Names whose form starts with form of prefix | str -> list(str) """
+        form = self.get_form(prefix)
+        names = []
+        for other, name in self.iter_from(prefix):
+            if not other.startswith(form):
+                break
+            names.append(name)
+        return names
+
+    def lookup(self, string):
+        """ Names with the same form as string | str -> list(str) """
+        form = self.get_form(string)
+        names = []
+        for other, name in self.iter_from(string):
+            if not other == form:
+                break
+            names.append(name)
+        return names
+
+    def get_bounds(self):
+        """ Positions of first name and after last name | None -> tuple(tuple, tuple) """
+        self.build()
+        return (0, 0), (len(self.heads), 0)
+
+    def find_position(self, form, start, stop, right=False):
+        """ Position of first name with a form after form, within a range
+
+        str, tuple(int, int), tuple(int, int), opt:bool -> tuple(int, int)
+
+        Names with the same form as form come after the position, or
+        before it if right is True.
+        """
+        if start >= stop:
+            return start
+        find = bisect_right if right else bisect_left
+        number = max(find(self.heads, form, start[0], min(stop[0] + 1, len(self.heads))) - 1,
+                     start[0])
+        forms = [other for other, name in self.get_block(number)]
+        index = find(forms, form, start[1] if number == start[0] else 0)
+        position = (number, index) if index < len(forms) else (number + 1, 0)
+        return min(position, stop)
+
+    def find_extensions(self, form, start, stop):
+        """ Range of names with longer forms starting with form, within a range
+
+        str, tuple(int, int), tuple(int, int) -> tuple(tuple, tuple)
+        """
+        start = self.find_position(form, start, stop, right=True)
+        return start, self.find_position(form + PrefixIndex.END, start, stop)
+
+    def get_name(self, position):
+        """ Name at position | tuple(int, int) -> str """
+        return self.name_blocks[position[0]][position[1]]
+
+    def iter_names(self, start, stop):
+        """ Names from start to stop, a block at a time | tuple, tuple -> iterator(str) """
+        number, index = start
+        while (number, index) < stop:
+            names = self.name_blocks[number]
+            yield from names[index:stop[1] if number == stop[0] else len(names)]
+            number, index = number + 1, 0
+
+class PrefixRange():
+    """ Names of an index extending a prefix, as a range of positions
+
+    Completions of typed text are the names whose form starts with the form
+    of the text and is longer. In a sorted index, they're the names between
+    two positions, found by binary search. As more is typed, the range is
+    narrowed by searching only between its positions, so no list of
+    candidates is built or filtered while typing. Names are read from the
+    index when iterated.
+
+    A range is found again from the whole index if names were added or
+    removed since (see NameIndex.version).
+
+    Args:
+        index (PrefixIndex or FrontCodedIndex): Sorted index of names
+        prefix (str): Typed text
+        bounds (tuple): Positions searched between, whole index by default
+
+    Methods:
+        narrow(str) -> PrefixRange
+        head() -> str
+    """
+
+    def __init__(self, index, prefix, bounds=None):
+        self.index = index
+        self.prefix = prefix
+        self.form = index.get_form(prefix)
+        self.version = index.version
+        if bounds is None:
+            bounds = index.get_bounds()
+        self.start, self.stop = index.find_extensions(self.form, *bounds)
+
+    def __bool__(self):
+        return self.start < self.stop
+
+    def __iter__(self):
+        return self.index.iter_names(self.start, self.stop)
+
+    def __contains__(self, name):
+        form = self.index.get_form(name)
+        return (form.startswith(self.form) and not form == self.form
+                and name in self.index.lookup(name))
+
+    def __repr__(self):
+        return f'PrefixRange({self.prefix!r}, {self.start}, {self.stop})'
+
+    def narrow(self, prefix):
+        """ Range of names extending prefix typed after this one | str -> PrefixRange """
+        if (self.version == self.index.version
+                and self.index.get_form(prefix).startswith(self.form)):
+            return PrefixRange(self.index, prefix, (self.start, self.stop))
+        return PrefixRange(self.index, prefix)
+
+    def head(self):
+        """ First name in sorted order, None if empty | None -> str """
+        return self.index.get_name(self.start) if self else None
+
+class ListRange():
+    """ Names of a short list extending a prefix, with the methods of PrefixRange
+
+    For completions not taken from an index, like words of a dictionary.
+    Narrowing filters the list.
+
+    Args:
+        names (list(str)): Completions in order
+        prefix (str): Typed text, names not extending it are left out
+
+    Methods:
+        narrow(str) -> ListRange
+        head() -> str
+    """
+
+    def __init__(self, names, prefix=''):
+        self.names = [name for name in names
+                      if name.startswith(prefix) and not name == prefix]
+
+    def __bool__(self):
+        return bool(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __repr__(self):
+        return f'ListRange({self.names!r})'
+
+    def narrow(self, prefix):
+        """ Names extending prefix typed after this one | str -> ListRange """
+        return ListRange(self.names, prefix)
+
+    def head(self):
+        """ First name, None if empty | None -> str """
+        return self.names[0] if self.names else None
+
+def get_deletes(string, distance):
+    """ Strings left by deleting up to distance characters | str, int -> set(str)
+
+    string itself is included.
+    """
+    deletes = {string}
+    last = {string}
+    for _ in range(distance):
+        last = {other[:i] + other[i+1:] for other in last for i in range(len(other))}
+        deletes |= last
+    return deletes
+
+class DeleteTable():
+    """ Ids of forms by strings left after deleting some of their characters
+
+    A dict of millions of short strings would take hundreds of MB, so
+    strings are kept as their hashes in a sorted numpy array, next to the
+    form id of each. A lookup is one searchsorted for all strings of a
+    query. Hashes can collide, so found forms must be checked. Strings
+    added later go in a dict, merged into the arrays when it grows large.
+
+    Methods:
+        extend(iterable(int), iterable(int))
+        add(iterable(str), int)
+        merge()
+        get_ranges(set(str)) -> iterator(tuple(int, int))
+        find(set(str)) -> np.ndarray
+        select(set(str), np.ndarray) -> np.ndarray
+    """
+
+    MERGE_SIZE = 10000 #Strings added before merging into arrays
+
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.int64) #Sorted hashes of strings
+        self.ids = np.empty(0, dtype=np.int32) #Form id of each hash
+        self.pending = {} #String -> form ids, added since last merge
+        self.pending_count = 0
+
+    def extend(self, hashes, ids):
+        """ Add many hashes with their form ids, then sort | iterable(int) x2 -> None """
+        hashes = np.concatenate([self.hashes, np.array(hashes, dtype=np.int64)])
+        ids = np.concatenate([self.ids, np.array(ids, dtype=np.int32)])
+        order = np.lexsort((ids, hashes)) #Ids of a hash sorted, see select
+        self.hashes, self.ids = hashes[order], ids[order]
+
+    def add(self, strings, form_id):
+        """ Map strings to form id | iterable(str), int -> None """
+        for string in strings:
+            self.pending.setdefault(string, []).append(form_id)
+            self.pending_count += 1
+        if self.pending_count > self.MERGE_SIZE:
+            self.merge()
+
+    def merge(self):
+        """ Move strings added since last merge to arrays | None -> None """
+        pairs = [(hash(string), form_id) for string, form_ids in self.pending.items()
+                 for form_id in form_ids]
+        self.extend([hash_ for hash_, form_id in pairs],
+                    [form_id for hash_, form_id in pairs])
+        self.pending = {}
+        self.pending_count = 0
+
+    def get_ranges(self, strings):
+        """ Ranges of ids of the hash of each string | set(str) -> iterator(tuple(int, int)) """
+        queries = np.fromiter((hash(string) for string in strings), dtype=np.int64,
+                              count=len(strings))
+        starts = np.searchsorted(self.hashes, queries, side='left').tolist()
+        stops = np.searchsorted(self.hashes, queries, side='right').tolist()
+        return ((start, stop) for start, stop in zip(starts, stops) if start < stop)
+
+    def find(self, strings):
+        """ Sorted ids of forms possibly mapped from strings | set(str) -> np.ndarray """
+        found = [self.ids[start:stop] for start, stop in self.get_ranges(strings)]
+        found.append(np.array([form_id for string in strings
+                               for form_id in self.pending.get(string, ())], dtype=np.int32))
+        return np.unique(np.concatenate(found))
+
+    def select(self, strings, form_ids):
+        """ Form ids also possibly mapped from strings | set(str), np.ndarray -> np.ndarray
+
+        Common strings can be mapped to thousands of forms, so ids are looked
+        up in the sorted ids of each hash rather than gathering them.
+        """
+        kept = np.isin(form_ids, [form_id for string in strings
+                                  for form_id in self.pending.get(string, ())])
+        for start, stop in self.get_ranges(strings):
+            ids = self.ids[start:stop]
+            positions = np.minimum(np.searchsorted(ids, form_ids), len(ids) - 1)
+            kept |= ids[positions] == form_ids
+        return form_ids[kept]
+
+class FuzzyIndex(NameIndex):
+    """ Names within a few typos of a string, by symmetric deletes (SymSpell)
+
+    Two strings within edit distance d have a common string left after
+    deleting up to d characters from each, and so do their first and their
+    last PREFIX_LENGTH characters. Strings left by deletes from both ends
+    of each form are mapped to the form (see DeleteTable). Candidates for a
+    string are the forms found from the deletes of its start, narrowed to
+    those also found from its end when there are many, then checked with
+    text_utilities.edit_distance. Words of a family, like conjugations of a
+    verb, share their start but not their end, so few forms are left.
+
+    Forms are folded (see text_utilities.fold), so case and accents aren't
+    counted as typos. Short strings have fewer allowed typos, see
+    get_max_distance, as one typo in a short key leads to any other.
+
+    Deleted forms are only forgotten by id, and tables are rebuilt on next
+    query once most forms were deleted.
+
+    Args:
+        get_names (function): Returns all names, called when first queried
+        normalize (function): Form compared for typos
+
+    Methods:
+        get_indexed_deletes(str) -> iterator(tuple(DeleteTable, set(str)))
+        get_max_distance(str) -> int @class
+        find(str, int) -> list(int)
+        get_distances(str, opt:int) -> list(tuple(int, str))
+        closest(str, opt:int) -> list(str)
+        nearest(str) -> list(str)
+    """
+
+    MAX_DISTANCE = 2 #Most typos found, for strings of LONG_LENGTH or more
+    LONG_LENGTH = 8
+    SHORT_LENGTH = 4 #Strings shorter than this are only matched exactly
+    PREFIX_LENGTH = 7 #Characters deleted from at each end
+    SELECT_SIZE = 32 #Fewer candidates are checked without looking up ends
+
+    def __init__(self, get_names, normalize=fold):
+        NameIndex.__init__(self, get_names)
+        self.normalize = normalize
+        self.clear()
+
+    def clear(self):
+        """ Forget all forms | None -> None """
+        self.forms = {} #Form -> names in insertion order
+        self.form_ids = {} #Form -> id
+        self.id_forms = [] #Id -> form, None once deleted
+        self.deleted = 0 #Ids of deleted forms
+        self.prefix_deletes = DeleteTable() #Starts of forms
+        self.suffix_deletes = DeleteTable() #Ends of forms
+
+    def build(self):
+        """ Index all names with one sort per table if not done yet | None -> None """
+        if self.built:
+            return
+        self.built = True
+        hashes = {self.prefix_deletes:[], self.suffix_deletes:[]}
+        ids = {self.prefix_deletes:[], self.suffix_deletes:[]}
+        for name in self.get_names():
+            form = self.normalize(name)
+            if form not in self.forms:
+                form_id = self.add_form(form)
+                for table, strings in self.get_indexed_deletes(form):
+                    hashes[table].extend(map(hash, strings))
+                    ids[table].extend([form_id] * len(strings))
+            self.forms[form].append(name)
+        for table in hashes:
+            table.extend(hashes[table], ids[table])
+
+    def add_form(self, form):
+        """ Give form a new id | str -> int """
+        self.forms[form] = []
+        self.form_ids[form] = len(self.id_forms)
+        self.id_forms.append(form)
+        return self.form_ids[form]
+
+    def get_indexed_deletes(self, form):
+        """ Deletes of form kept in each table | str -> iterator(tuple) """
+        yield self.prefix_deletes, get_deletes(form[:self.PREFIX_LENGTH],
+                                               self.MAX_DISTANCE)
+        yield self.suffix_deletes, get_deletes(form[-self.PREFIX_LENGTH:],
+                                               self.MAX_DISTANCE)
+
+    def insert(self, name):
+        form = self.normalize(name)
+        if form not in self.forms:
+            form_id = self.add_form(form)
+            for table, strings in self.get_indexed_deletes(form):
+                table.add(strings, form_id)
+        self.forms[form].append(name)
+
+    def delete(self, name):
+        form = self.normalize(name)
+        names = self.forms[form]
+        names.remove(name)
+        if not names:
+            del self.forms[form]
+            self.id_forms[self.form_ids.pop(form)] = None
+            self.deleted += 1
+
+    @classmethod
+    def get_max_distance(cls, string):
+        """ Typos allowed for string of this length | str -> int """
+        if len(string) >= cls.LONG_LENGTH:
+            return cls.MAX_DISTANCE
+        if len(string) >= cls.SHORT_LENGTH:
+            return 1
+        return 0
+
+    def find(self, form, max_distance):
+        """ Ids of forms possibly within max_distance of form | str, int -> list(int) """
+        form_ids = self.prefix_deletes.find(
+            get_deletes(form[:self.PREFIX_LENGTH], max_distance))
+        if len(form) > self.PREFIX_LENGTH and len(form_ids) > self.SELECT_SIZE:
+            form_ids = self.suffix_deletes.select(
+                get_deletes(form[-self.PREFIX_LENGTH:], max_distance), form_ids)
+        return form_ids.tolist()
+
+    def get_distances(self, string, max_distance=None):
+        """ Forms within max_distance typos of string, closest first
+
+        str, opt:int -> list(tuple(int, str))
+
+        Returns (distance, form) pairs. max_distance defaults to
+        get_max_distance(string), and can't be more than MAX_DISTANCE.
+        """
+        if self.deleted > len(self.id_forms) // 2: #Mostly stale ids
+            self.clear()
+            self.built = False
+        self.build()
+        form = self.normalize(string)
+        if max_distance is None:
+            max_distance = self.get_max_distance(form)
+        max_distance = min(max_distance, self.MAX_DISTANCE)
+        found = []
+        for form_id in self.find(form, max_distance):
+            candidate = self.id_forms[form_id]
+            if candidate is not None and abs(len(candidate) - len(form)) <= max_distance:
+                distance = edit_distance(form, candidate, max_distance)
+                if distance <= max_distance:
+                    found.append((distance, candidate))
+        return sorted(found)
+
+    def closest(self, string, max_distance=None):
+        """ Names within max_distance typos of string, closest first
+
+        str, opt:int -> list(str)
+
+        Names at the same distance are sorted by form.
+        """
+        return [name for distance, form in self.get_distances(string, max_distance)
+                for name in self.forms[form]]
+
+    def nearest(self, string):
+        """ Names at the least distance from string, if any | str -> list(str) """
+        found = self.get_distances(string)
+        return [name for distance, form in found if distance == found[0][0]
+                for name in self.forms[form]]
+
+def get_checksum(names):
+    """ Checksum of a set of names, in any order | iterable(str) -> int
+
+    CRCs of names are combined by XOR, so adding or removing a name
+    updates the checksum in O(1).
+    """
+    checksum = 0
+    for name in names:
+        checksum ^= zlib.crc32(name.encode('utf-8'))
+    return checksum
+
+def intersect(lists):
+    """ Ids in all sorted id arrays | list(np.ndarray) -> np.ndarray
+
+    Starting from the shortest, ids kept are looked up in each other array
+    by binary search, in O(k log n) for k ids kept, so long lists of
+    frequent terms cost little.
+    """
+    lists = sorted(lists, key=len)
+    ids = lists[0]
+    for other in lists[1:]:
+        if not len(ids):
+            break
+        positions = np.minimum(np.searchsorted(other, ids), len(other) - 1)
+        ids = ids[other[positions] == ids]
+    return ids
+
+class PhraseIndex(NameIndex):
+    """ Abstract class for indexes of terms of phrases by phrase ids
+
+    Each phrase gets an id when added, and terms of phrases list the ids
+    of the phrases they're in. Ids are given in increasing order, so lists
+    are sorted as they're appended to, and intersected with intersect.
+
+    Deleted phrases are only forgotten by id, and the index is rebuilt on
+    next query once most phrases were deleted.
+
+    With a filepath, the index is saved by save and read back on first
+    query instead of being built, if the checksum of saved phrases matches
+    the store. Otherwise, like after a crash, it's built again.
+
+    Args:
+        get_names (function): Returns all names, called when first queried
+        filepath (Path): File the index is saved to, optional
+
+    Methods:
+        clear()
+        refresh()
+        index_all(list(str))
+        index_phrase(str, int) @abstract
+        get_phrases(iterable(int)) -> list(str)
+        get_state() -> dict
+        set_state(dict)
+        save()
+        load() -> bool
+    """
+
+    def __init__(self, get_names, filepath=None):
+        NameIndex.__init__(self, get_names)
+        self.filepath = filepath
+        self.clear()
+
+    def clear(self):
+        """ Forget all phrases | None -> None """
+        self.phrases = [] #Id -> phrase, None once deleted
+        self.phrase_ids = {} #Phrase -> id
+        self.deleted = 0 #Ids of deleted phrases
+        self.checksum = 0 #See get_checksum
+        self.dirty = False #Changed since saved or loaded
+
+    def build(self):
+        """ Read saved index, or index all names, if not done yet | None -> None """
+        if self.built:
+            return
+        self.built = True
+        if not self.load():
+            self.index_all(self.get_names())
+
+    def refresh(self):
+        """ Build index, again if mostly stale, called by queries | None -> None """
+        if self.deleted > len(self.phrases) // 2: #Mostly stale ids
+            self.clear()
+            self.built = False
+        self.build()
+
+    def index_all(self, names):
+        """ Index many phrases | list(str) -> None """
+        for name in names:
+            self.insert(name)
+
+    def insert(self, name):
+        phrase_id = len(self.phrases)
+        self.phrases.append(name)
+        self.phrase_ids[name] = phrase_id
+        self.index_phrase(name, phrase_id)
+        self.checksum ^= zlib.crc32(name.encode('utf-8'))
+        self.dirty = True
+
+    def delete(self, name):
+        self.phrases[self.phrase_ids.pop(name)] = None
+        self.deleted += 1
+        self.checksum ^= zlib.crc32(name.encode('utf-8'))
+        self.dirty = True
+
+    def index_phrase(self, phrase, phrase_id):
+        """ Add ids of phrase to lists of its terms | str, int -> None """
+        error_message = 'index_phrase must be overridden by subclass'
+        raise NotImplementedError(error_message)
+
+    def get_phrases(self, phrase_ids):
+        """ Phrases of ids, without deleted ones | iterable(int) -> list(str) """
+        phrases = [self.phrases[phrase_id] for phrase_id in phrase_ids]
+        return [phrase for phrase in phrases if phrase is not None]
+
+    def get_state(self):
+        """ Saved state of index, extended by subclasses | None -> dict """
+        return {
+            'version': 1,
+            'count': len(self.phrase_ids),
+            'checksum': self.checksum,
+            'phrases': self.phrases,
+        }
+
+    def set_state(self, state):
+        """ Index saved by get_state, extended by subclasses | dict -> None """
+        self.clear()
+        self.phrases = state['phrases']
+        self.phrase_ids = {phrase: phrase_id for phrase_id, phrase
+                           in enumerate(self.phrases) if phrase is not None}
+        self.deleted = len(self.phrases) - len(self.phrase_ids)
+        self.checksum = state['checksum']
+
+    def save(self):
+        """ Write index if built and changed, replacing file once written | None -> None """
+        if not (self.filepath and self.built and self.dirty):
+            return
+        temporary_filepath = self.filepath.with_name(self.filepath.name + '.tmp')
+        with open(temporary_filepath, 'wb') as index_file:
+            pickle.dump(self.get_state(), index_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_filepath, self.filepath)
+        self.dirty = False
+
+    def load(self):
+        """ Read saved index if it matches names | None -> bool
+
+        Returns False if there's no saved index or if it's out of date.
+        """
+        if not self.filepath:
+            return False
+        try:
+            with open(self.filepath, 'rb') as index_file:
+                state = pickle.load(index_file)
+        except (FileNotFoundError, pickle.UnpicklingError, EOFError):
+            return False
+        if not state.get('version') == 1:
+            return False
+        names = self.get_names()
+        if not (state['count'] == len(names) and state['checksum'] == get_checksum(names)):
+            return False
+        self.set_state(state)
+        return True
+
+class TokenIndex(PhraseIndex):
+    """ Phrases containing words, by posting lists of phrase ids
+
+    Terms are the words of phrases (see text_utilities.tokenize), indexed
+    folded (see text_utilities.fold), and phrases found are checked when
+    accents matter. A query for several words intersects their lists.
+
+    Methods:
+        find(list(str)) -> list(int)
+        search(str, opt:bool) -> list(str)
+    """
+
+    def clear(self):
+        PhraseIndex.clear(self)
+        self.postings = {} #Folded word -> array of sorted phrase ids
+
+    def index_phrase(self, phrase, phrase_id):
+        for word in set(tokenize(fold_accents(phrase))):
+            if word not in self.postings:
+                self.postings[word] = array('I')
+            self.postings[word].append(phrase_id)
+
+    def get_state(self):
+        """ Saved state of index | None -> dict
+
+        Posting lists are saved one after the other in a single array.
+        """
+        state = PhraseIndex.get_state(self)
+        words = list(self.postings)
+        lengths = [len(self.postings[word]) for word in words]
+        offsets = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        postings = array('I')
+        for word in words:
+            postings.extend(self.postings[word])
+        state.update({'words': words, 'offsets': offsets, 'postings': postings})
+        return state
+
+    def set_state(self, state):
+        PhraseIndex.set_state(self, state)
+        postings = memoryview(state['postings']).cast('B')
+        offsets = (state['offsets'] * state['postings'].itemsize).tolist() #In bytes
+        for number, word in enumerate(state['words']):
+            self.postings[word] = array('I')
+            self.postings[word].frombytes(postings[offsets[number]:offsets[number+1]])
+
+    def find(self, words):
+        """ Sorted ids of phrases with all folded words | list(str) -> list(int)
+
+        Ids of deleted phrases may be included.
+        """
+        self.refresh()
+        if not words or any(word not in self.postings for word in words):
+            return []
+        return intersect([np.frombuffer(self.postings[word], dtype=np.uint32)
+                          for word in set(words)]).tolist()
+
+    def search(self, query, ignore_accents=True):
+        """ Phrases with all words of query, in order added | str, opt:bool -> list(str)
+
+        Words are matched whole and in any case. Accents are ignored unless
+        ignore_accents is False.
+        """
+        words = tokenize(query)
+        phrases = self.get_phrases(self.find([fold_accents(word) for word in words]))
+        if not ignore_accents:
+            words = set(words)
+            phrases = [phrase for phrase in phrases if words <= set(tokenize(phrase))]
+        return phrases
+
+def get_trigrams(string):
+    """ Codes of the distinct 3 character substrings of string | str -> np.ndarray
+
+    The code of a trigram packs the code points of its characters in 21
+    bits each, so trigrams are sorted and searched as integers.
+    """
+    points = np.frombuffer(string.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    return np.unique((points[:-2] << 42) | (points[1:-1] << 21) | points[2:])
+
+class TrigramIndex(PhraseIndex):
+    """ Phrases containing a substring, by posting lists of trigrams (pg_trgm)
+
+    Terms are the 3 character substrings of folded phrases (see
+    text_utilities.fold). A phrase contains a substring only if it
+    contains all its trigrams, so phrases found by intersecting their
+    lists are then checked, as few are found that don't contain it.
+
+    Like DeleteTable, lists are kept in sorted numpy arrays: sorted trigram
+    codes (see get_trigrams), with the ids of phrases of each one after the
+    other. Phrases added later go in a dict, merged into the arrays when it
+    grows large. All phrases are indexed at once with a few vectorized
+    passes, see index_all.
+
+    Patterns can hold '%' for any characters and '_' for any character,
+    as in SQL LIKE, and match anywhere in phrases. Fragments between them
+    shorter than 3 characters have no trigrams, so patterns without longer
+    fragments are checked against every phrase.
+
+    Methods:
+        get_postings(int) -> np.ndarray
+        merge()
+        find(str) -> list(int) or None
+        get_form(str, bool, bool) -> str @static
+        search(str, opt:bool, opt:bool) -> list(str)
+        get_matcher(str) -> function @static
+    """
+
+    MERGE_SIZE = 100000 #Ids added before merging into arrays
+    CHUNK_SIZE = 100000 #Phrases indexed together, bounds temporary memory
+    SEPARATOR = '\0' #Between phrases indexed together
+
+    def clear(self):
+        PhraseIndex.clear(self)
+        self.forms = [] #Id -> folded phrase, kept to check phrases found
+        self.codes = np.empty(0, dtype=np.int64) #Sorted trigram codes
+        self.offsets = np.zeros(1, dtype=np.int64) #Ids of codes[i] start at offsets[i]
+        self.ids = np.empty(0, dtype=np.uint32) #Sorted ids of each code
+        self.pending = {} #Trigram code -> array of ids, added since last merge
+        self.pending_count = 0
+
+    def index_all(self, names):
+        """ Index many phrases with numpy, a chunk at a time | list(str) -> None """
+        first_id = len(self.phrases)
+        for name in names:
+            self.phrases.append(name)
+            self.phrase_ids[name] = len(self.phrases) - 1
+            self.forms.append(fold(name))
+            self.checksum ^= zlib.crc32(name.encode('utf-8'))
+        self.dirty = True
+        codes, ids = [], []
+        for start in range(first_id, len(self.phrases), self.CHUNK_SIZE):
+            forms = self.forms[start:start+self.CHUNK_SIZE]
+            text = self.SEPARATOR.join(forms)
+            points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+            lengths = np.array([len(form) + 1 for form in forms], dtype=np.int64)
+            chunk_ids = np.repeat(np.arange(start, start + len(forms), dtype=np.uint32),
+                                  lengths)[:len(points)]
+            separators = points == ord(self.SEPARATOR)
+            within = ~(separators[:-2] | separators[1:-1] | separators[2:])
+            chunk_codes = (points[:-2] << 42) | (points[1:-1] << 21) | points[2:]
+            codes.append(chunk_codes[within])
+            ids.append(chunk_ids[:-2][within])
+        if codes:
+            self.extend(np.concatenate(codes), np.concatenate(ids))
+
+    def extend(self, codes, ids):
+        """ Add ids of trigram codes to arrays | np.ndarray, np.ndarray -> None
+
+        ids are larger than ids in arrays and in increasing order, so a
+        stable sort by code keeps the ids of each code sorted.
+        """
+        codes = np.concatenate([np.repeat(self.codes, np.diff(self.offsets)), codes])
+        ids = np.concatenate([self.ids, ids])
+        order = np.argsort(codes, kind='stable')
+        codes, ids = codes[order], ids[order]
+        kept = np.ones(len(codes), dtype=bool) #Repeats of a trigram in a phrase
+        kept[1:] = (codes[1:] != codes[:-1]) | (ids[1:] != ids[:-1])
+        codes, ids = codes[kept], ids[kept]
+        starts = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1]]))
+        self.codes = codes[starts]
+        self.offsets = np.append(starts, len(codes)).astype(np.int64)
+        self.ids = ids
+
+    def index_phrase(self, phrase, phrase_id):
+        self.forms.append(fold(phrase))
+        for code in get_trigrams(self.forms[phrase_id]).tolist():
+            if code not in self.pending:
+                self.pending[code] = array('I')
+            self.pending[code].append(phrase_id)
+            self.pending_count += 1
+        if self.pending_count > self.MERGE_SIZE:
+            self.merge()
+
+    def merge(self):
+        """ Move ids added since last merge to arrays | None -> None """
+        if not self.pending:
+            return
+        codes = [code for code, ids in self.pending.items() for _ in ids]
+        ids = array('I')
+        for code_ids in self.pending.values():
+            ids.extend(code_ids)
+        order = np.argsort(np.frombuffer(ids, dtype=np.uint32), kind='stable')
+        self.extend(np.array(codes, dtype=np.int64)[order],
+                    np.frombuffer(ids, dtype=np.uint32)[order])
+        self.pending = {}
+        self.pending_count = 0
+
+    def get_postings(self, code):
+        """ Sorted ids of phrases with trigram code | int -> np.ndarray """
+        position = np.searchsorted(self.codes, code)
+        postings = np.empty(0, dtype=np.uint32)
+        if position < len(self.codes) and self.codes[position] == code:
+            postings = self.ids[self.offsets[position]:self.offsets[position+1]]
+        if code in self.pending:
+            postings = np.concatenate([postings,
+                                       np.frombuffer(self.pending[code], dtype=np.uint32)])
+        return postings
+
+    def get_state(self):
+        self.merge()
+        state = PhraseIndex.get_state(self)
+        state.update({'forms': self.forms, 'codes': self.codes, 'offsets': self.offsets,
+                      'ids': self.ids})
+        return state
+
+    def set_state(self, state):
+        PhraseIndex.set_state(self, state)
+        self.forms = state['forms']
+        self.codes, self.offsets, self.ids = state['codes'], state['offsets'], state['ids']
+
+    def find(self, pattern):
+        """ Sorted ids of phrases that may match pattern | str -> list(int) or None
+
+        Returns None if pattern has no trigrams, as any phrase may match.
+        Ids of deleted phrases may be included.
+        """
+        self.refresh()
+        codes = set()
+        for fragment in re.split('[%_]', fold(pattern)):
+            codes.update(get_trigrams(fragment).tolist())
+        if not codes:
+            return None
+        return intersect([self.get_postings(code) for code in codes]).tolist()
+
+    @staticmethod
+    def get_form(phrase, case_specific, ignore_accents):
+        """ Form of phrase matched by patterns | str, bool, bool -> str """
+        if not case_specific:
+            phrase = normalize(phrase)
+        if ignore_accents:
+            phrase = fold_accents(phrase)
+        return phrase
+
+    def search(self, pattern, case_specific=False, ignore_accents=True):
+        """ Phrases containing pattern, in order added | str, opt:bool, opt:bool -> list(str)
+
+        Case is ignored unless case_specific is True, and accents are
+        ignored unless ignore_accents is False. Phrases found are checked
+        folded first, then as asked if case or accents matter.
+        """
+        if not pattern:
+            return []
+        phrase_ids = self.find(pattern)
+        if phrase_ids is None:
+            phrase_ids = range(len(self.phrases))
+        matches = self.get_matcher(fold(pattern))
+        phrases = self.get_phrases(phrase_id for phrase_id in phrase_ids
+                                   if matches(self.forms[phrase_id]))
+        if case_specific or not ignore_accents:
+            matches = self.get_matcher(self.get_form(pattern, case_specific, ignore_accents))
+            phrases = [phrase for phrase in phrases
+                       if matches(self.get_form(phrase, case_specific, ignore_accents))]
+        return phrases
+
+    @staticmethod
+    def get_matcher(pattern):
+        """ Test of strings containing pattern | str -> function(str) -> bool """
+        if '%' in pattern or '_' in pattern:
+            return re.compile(''.join(
+                '.*' if character == '%' else '.' if character == '_'
+                else re.escape(character) for character in pattern), re.DOTALL).search
+        return lambda string: pattern in string
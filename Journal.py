@@ -0,0 +1,211 @@
+""" Implements the Journal class
+
+With pickle storage, saving used to rewrite the whole database after every
+change. In journal mode, each save only appends the changes to a journal file
+next to the pickle. The journal is folded into the pickle (a checkpoint) in a
+background thread once it grows large, and at exit.
+
+Columnar databases (see columnar.py) are never modified in place, so they
+always use a journal.
+
+Files for a database saved as standard.pickle:
+    standard.journal - changes since the last checkpoint
+    standard.journal.old - changes being folded by a running checkpoint
+
+Each journal starts with a header line holding its generation. Each
+following line holds the changes written by one save, as a JSON list.
+A checkpoint
+starts a new journal with the next generation and saves that generation in
+the pickle. On load, only journals with a generation at least as recent as
+the pickle are replayed, so a checkpoint interrupted at any point never loses
+or repeats changes.
+
+Classes: Journal
+"""
+
+import json
+import os
+import shutil
+import threading
+import pandas as pd
+
+class Journal():
+    """ Append-only log of changes to a LinkStore saved as a pickle
+
+    Args:
+        filepath (Path): Path of the pickle file the journal belongs to
+        write_state (function): Writes LinkStore state to file, defaults
+                                to pickle. Use columnar.write for columnar files
+
+    Methods:
+        get_filepath(Path) -> Path @static
+        read(Path) -> int, list @static
+        copy_files(Path, Path) @static
+        recover(LinkStore)
+        discard()
+        start(LinkStore)
+        append(LinkStore)
+        write(list)
+        needs_checkpoint() -> bool
+        checkpoint(LinkStore, opt:bool)
+        write_snapshot(dict)
+        wait()
+    """
+
+    CHECKPOINT_SIZE = 1000000 #Minimum journal size in bytes starting a checkpoint
+    ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+    def __init__(self, filepath, write_state=pd.to_pickle):
+        self.snapshot_filepath = filepath #Pickle file
+        self.write_state = write_state
+        self.filepath = self.get_filepath(filepath) #Current journal
+        self.old_filepath = self.filepath.with_name(self.filepath.name + '.old')
+        self.size = 0 #Bytes written to current journal
+        self.snapshot_size = 0 #Bytes in pickle file when journal started
+        self.thread = None #Running background checkpoint
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_filepath(filepath):
+        """ Get journal filepath for pickle filepath | Path -> Path """
+        return filepath.with_suffix('.journal')
+
+    @staticmethod
+    def read(filepath):
+        """ Read generation and changes from journal file | Path -> int, list
+
+        A save cut short by a crash is ignored along with anything after it.
+        Lines holding a single change, written by older versions, are read too.
+        """
+        with open(filepath, 'r', encoding='utf-8') as journal_file:
+            lines = journal_file.read().split('\n')
+        try:
+            generation = json.loads(lines[0])['generation']
+        except (ValueError, KeyError, TypeError):
+            return -1, []
+        records = []
+        for line in lines[1:]:
+            try:
+                changes = json.loads(line)
+            except ValueError: #Empty last line or incomplete save
+                break
+            if changes and isinstance(changes[0], list):
+                records.extend(changes)
+            else:
+                records.append(changes)
+        return generation, records
+
+    @staticmethod
+    def copy_files(source, destination):
+        """ Copy database file and its journal if any, used by backups | Path, Path -> None
+
+        The destination is replaced rather than overwritten, since it may be
+        memory-mapped by an open columnar store.
+        """
+        temp_filepath = destination.with_name(destination.name + '.tmp')
+        shutil.copy(source, temp_filepath)
+        os.replace(temp_filepath, destination)
+        source_journal = Journal.get_filepath(source)
+        destination_journal = Journal.get_filepath(destination)
+        if source_journal.exists():
+            shutil.copy(source_journal, destination_journal)
+        else:
+            destination_journal.unlink(missing_ok=True)
+
+    def recover(self, store):
+        """ Replay journals newer than the pickle into store | LinkStore -> None
+
+        If any change was replayed, the database was not closed properly.
+        The changes are then folded into the pickle right away.
+        """
+        replayed = False
+        for filepath in [self.old_filepath, self.filepath]:
+            if not filepath.exists():
+                continue
+            generation, records = self.read(filepath)
+            if generation >= store.generation and records:
+                print(f'Replaying {len(records)} changes from {filepath.name}')
+                store.replay(records)
+                store.generation = generation
+                replayed = True
+        if replayed:
+            store.generation += 1
+            self.write_snapshot(store.get_state())
+        self.discard()
+
+    def discard(self):
+        """ Delete journal files | None -> None """
+        self.filepath.unlink(missing_ok=True)
+        self.old_filepath.unlink(missing_ok=True)
+
+    def start(self, store):
+        """ Start new journal and record changes to store | LinkStore -> None """
+        with open(self.filepath, 'w', encoding='utf-8') as journal_file:
+            journal_file.write(json.dumps({'generation':store.generation}) + '\n')
+        self.size = 0
+        if self.snapshot_filepath.exists():
+            self.snapshot_size = self.snapshot_filepath.stat().st_size
+        store.records = []
+
+    def append(self, store):
+        """ Write changes recorded since last call to journal | LinkStore -> None
+
+        Starts a background checkpoint if the journal is large.
+        """
+        self.write(store.take_records())
+        if self.needs_checkpoint():
+            self.checkpoint(store)
+
+    def write(self, records):
+        """ Write changes to journal and wait until on disk | list -> None """
+        if not records:
+            return
+        lines = self.ENCODER.encode(records) + '\n' #One line, written or lost whole
+        with self.lock:
+            with open(self.filepath, 'a', encoding='utf-8') as journal_file:
+                journal_file.write(lines)
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+            self.size += len(lines)
+
+    def needs_checkpoint(self):
+        """ Check if journal is large enough to fold into pickle | None -> bool
+
+        The journal must reach the size of the pickle, so the time spent
+        rewriting the pickle stays proportional to the changes written.
+        """
+        return self.size >= max(self.CHECKPOINT_SIZE, self.snapshot_size)
+
+    def checkpoint(self, store, background=True):
+        """ Fold journal into pickle file | LinkStore, opt:bool -> None
+
+        The state is copied on the calling thread, so only the disk write
+        happens in the background.
+        """
+        self.wait() #One checkpoint at a time
+        with self.lock:
+            store.take_records() #Included in state below
+            os.replace(self.filepath, self.old_filepath)
+            store.generation += 1
+            state = store.get_state()
+            self.start(store)
+        if background:
+            self.thread = threading.Thread(target=self.write_snapshot,
+                                           args=(state,))
+            self.thread.start()
+        else:
+            self.write_snapshot(state)
+
+    def write_snapshot(self, state):
+        """ Replace pickle file with state, then drop folded journal | dict -> None """
+        temp_filepath = self.snapshot_filepath.with_name(
+            self.snapshot_filepath.name + '.tmp')
+        self.write_state(state, temp_filepath)
+        os.replace(temp_filepath, self.snapshot_filepath)
+        self.old_filepath.unlink(missing_ok=True)
+
+    def wait(self):
+        """ Wait for background checkpoint to finish if any | None -> None """
+        if self.thread:
+            self.thread.join()
+            self.thread = None
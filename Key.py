@@ -30,7 +30,7 @@ class Key(AutoText):
         current_text = str
         current_cursor = int
         suggestion_text = str
-        suggestion_list = list
+        suggestions = PrefixRange
 
     Methods:
         __init__(MainFrame)
@@ -44,6 +44,7 @@ class Key(AutoText):
         get_key_start(int)
         get_key_end(int)
         compare_states()
+        get_partial()
         get_suggestion()
         ignore_suggestion()
         confirm_suggestion()
@@ -84,25 +85,27 @@ class Key(AutoText):
             return True
         return False
     
+    def get_partial(self):
+        """ Last partial key, empty after a space | None -> str """
+        words = self.current_text.split()
+        if not words or self.current_text[-1].isspace():
+            return ''
+        return words[-1]
+
     def get_suggestion(self):
         """ Complete current key input with valid keys from db | None -> None """
         self.debug('get_suggestion Key')
-        partial_key = self.current_text.split()[-1] #Get last partial key
-        if self.suggestion_list:
-            suggestion_list = self.suggestion_list
-        else:
-            suggestion_list = self.db.valid_keys(partial_key) #All valid possible keys
-            suggestion_list = [s for s in suggestion_list if not s == partial_key]
-        print('suggestion_list', suggestion_list)
-        if suggestion_list: #If current input can be completed with a valid key: 
-            suggestion = suggestion_list[0] #TODO: Rank suggestions
+        partial_key = self.get_partial() #Get last partial key
+        if not self.suggestions: #Get range of all valid possible keys
+            self.suggestions = self.db.key_range(partial_key) #Typed text itself left out
+        print('suggestions', self.suggestions)
+        if self.suggestions: #If current input can be completed with a valid key: 
+            suggestion = self.db.ranker.top_of_range('columns', self.suggestions) #Most used
             print('suggestion', suggestion)
             #Save suggested chars
             self.suggestion_text = suggestion[len(partial_key):]
-            if self.suggestion_text:
-                self.suggestion_list = suggestion_list
-            else:
-                self.suggestion_list = []
+            if not self.suggestion_text:
+                self.suggestions = None
             self.update_display()
         self.debug('get_suggestion', out=True)
 
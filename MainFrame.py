@@ -284,6 +284,7 @@ class MainFrame(tk.Frame):
         phrase = self.phrase.get_contents()
         self.master.clipboard_clear()
         self.master.clipboard_append(phrase)
+        self.db.record_use(self.key.get_display_key_list(), phrase) #For ranking
         
     def save_entry(self):
         """ Save active key/phrase combination to db | None -> None """
@@ -295,6 +296,7 @@ class MainFrame(tk.Frame):
         #Save combination
         self.db.prepare_undo()
         self.db.save_entry(key_list, phrase)
+        self.db.record_use(key_list, phrase) #For ranking
         print(self.db)
         #Clear widgets after save
         self.phrase.full_clear()
@@ -367,7 +369,7 @@ class MainFrame(tk.Frame):
         print(f'display_text = {self.key.get_contents()}')
         print(f'display_cursor = {self.key.get_cursor()}')
         print(f'suggestion_text = {self.key.suggestion_text}')
-        print(f'suggestion_list = {self.key.suggestion_list}')
+        print(f'suggestions = {self.key.suggestions}')
         
     def handle_key_key_release(self, event):
         """ Key release manager for key widget | tk.Event -> None """
@@ -440,11 +442,11 @@ class MainFrame(tk.Frame):
         print('Key variables:')
         print(f'Key - current_text: {self.key.current_text}')
         print(f'Key - current_text: {self.key.suggestion_text}')
-        print(f'Key - current_text: {self.key.suggestion_list}')
+        print(f'Key - current_text: {self.key.suggestions}')
         print(f'Key - current_text: {self.key.current_cursor}')
         print(f'Phrase - current_text: {self.phrase.current_text}')
         print(f'Phrase - current_text: {self.phrase.suggestion_text}')
-        print(f'Phrase - current_text: {self.phrase.suggestion_list}')
+        print(f'Phrase - current_text: {self.phrase.suggestions}')
         print(f'Phrase - current_text: {self.phrase.current_cursor}')
             
     def bind_event_handlers(self):
@@ -17,8 +17,11 @@ Classes:
 """
 
 import tkinter as tk
+from tkinter import simpledialog
 from functools import partial
 import config
+import importer
+import exporter
 
 class MenuBar(tk.Menu):
     """ Implements the main menu bar
@@ -63,12 +66,13 @@ class FileMenu(tk.Menu):
         temp - TEST FUNCTION, WILL BE DELETED
         add_menus
         add_commands
+        search_dialog
     """
 
     def __init__(self, master):
         tk.Menu.__init__(self, master)
         self.database_menu = DatabaseMenu(self)
-        #self.add_commands()
+        self.add_commands()
         self.add_menus()
         
     def temp(self):
@@ -83,6 +87,45 @@ class FileMenu(tk.Menu):
             label=language_dict['db']
         )
 
+    def add_commands(self):
+        """ Add items to file menu | None -> None """
+        language_dict = config.get_language_dict()
+        self.add_command(
+            label=language_dict['import'],
+            command=importer.import_dialog
+        )
+        self.add_command(
+            label=language_dict['export'],
+            command=exporter.export_dialog
+        )
+        self.add_command(
+            label=language_dict['search'],
+            command=self.search_dialog
+        )
+        self.add_command(
+            label=language_dict['search_text'],
+            command=partial(self.search_dialog, substring=True)
+        )
+
+    def search_dialog(self, substring=False):
+        """ Ask for query and display matching phrases | opt:bool -> None
+
+        Phrases containing all words of query, or query anywhere if
+        substring, most used first. Up/Down show the other results.
+        """
+        language_dict = config.get_language_dict()
+        label = language_dict['search_text' if substring else 'search']
+        query = simpledialog.askstring(label.rstrip('.'), label.rstrip('.'),
+                                       parent=self.master.master)
+        if not query:
+            return
+        db = config.active_objects['db']
+        if substring:
+            phrases = db.search_substring(query)
+        else:
+            phrases = db.search_phrases(query)
+        self.master.master.main_frame.display_search_results(phrases)
+
 class DatabaseMenu(tk.Menu):
     """ Implements the database selection menu
 
@@ -116,6 +159,7 @@ class OptionMenu(tk.Menu):
         temp - TEST FUNCTION, WILL BE DELETED
         add_menus
         add_commands
+        print_cache_stats
     """
 
     def __init__(self, master):
@@ -138,6 +182,15 @@ class OptionMenu(tk.Menu):
     
     def add_commands(self):
         """ Add items to option menu | None -> None """
+        language_dict = config.get_language_dict()
+        self.add_command(
+            label=language_dict['ignore_accents'],
+            command=partial(config.set_fold_accents, True)
+        )
+        self.add_command(
+            label=language_dict['match_accents'],
+            command=partial(config.set_fold_accents, False)
+        )
         self.add_command(
             label='Debug Mode',
             command=config.debug_mode
@@ -154,6 +207,17 @@ class OptionMenu(tk.Menu):
             label='Print variables',
             command=self.master.master.main_frame.print_tracker_variables
         )
+        self.add_command(
+            label='Print suggestion cache',
+            command=self.print_cache_stats
+        )
+
+    def print_cache_stats(self):
+        """ Print hit rate of suggestion cache of active database | None -> None """
+        stats = config.active_objects['db'].suggestion_cache.get_stats()
+        print(f'Suggestion cache: {stats["hits"]} hits, {stats["misses"]} misses, '
+              f'hit rate {stats["hit_rate"]:.1%}, {stats["entries"]}/{stats["size"]} entries, '
+              f'{stats["invalidations"]} invalidations')
 
 class LanguageMenu(tk.Menu):
     """ Implements the language menu
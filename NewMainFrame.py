@@ -41,6 +41,7 @@ class MainFrame(tk.Frame):
         handle_phrase_backspace(tk.Event) -> str
         handle_key_release(tk.Event)
         handle_phrase_input(tk.Event) - NOT IMPLEMENTED
+        display_search_results(list)
         bind_event_handlers()
     """
     def __init__(self, master):
@@ -268,13 +269,19 @@ class MainFrame(tk.Frame):
     def copy(self):
         """ Copy active suggestion to clipboard | None -> None """
         active_box = self.get_active_box()
-        if active_lang:
+        if active_box:
             suggestion = active_box.get_contents()
         else:
             suggestion = None
         if suggestion:
             self.master.clipboard_clear()
             self.master.clipboard_append(suggestion)
+            self.db.record_use(*self.get_entry()) #For ranking
+
+    def get_entry(self):
+        """ Get combination displayed in both boxes | None -> tuple """
+        error_message = 'get_entry must be overridden by subclass'
+        raise NotImplementedError(error_message)
 
     def save_entry(self):
         """ Save combination to database | None -> None """
@@ -365,15 +372,21 @@ class MainFrame(tk.Frame):
         """ NOT IMPLEMENTED """
         pass
 
+    def display_search_results(self, phrases):
+        """ Display found phrases in box_2 with their keys | list(str) -> None """
+        self.box_1.full_clear()
+        if self.box_2.display_list(phrases):
+            self.suggest_box_1()
+
     def print_tracker_variables(self):
         print('Key variables:')
         print(f'Box_1 - current_text: {self.key.current_text}')
         print(f'Box_1 - suggestion_text: {self.key.suggestion_text}')
-        print(f'Box_1 - suggestion_list: {self.key.suggestion_list}')
+        print(f'Box_1 - suggestions: {self.key.suggestions}')
         print(f'Box_1 - current_cursor: {self.key.current_cursor}')
         print(f'Box_2 - current_text: {self.phrase.current_text}')
         print(f'Box_2 - suggestion_text: {self.phrase.suggestion_text}')
-        print(f'Box_2 - suggestion_list: {self.phrase.suggestion_list}')
+        print(f'Box_2 - suggestions: {self.phrase.suggestions}')
         print(f'Box_2 - current_cursor: {self.phrase.current_cursor}')
             
     def bind_event_handlers(self):
@@ -512,6 +525,10 @@ class StandardMainFrame(MainFrame):
         )
         self.box_1.focus() #Focus on top text widget
 
+    def get_entry(self):
+        """ Get displayed keys and phrase | None -> tuple(list(str), str) """
+        return self.box_1.get_display_key_list(), self.box_2.get_contents()
+
     def save_entry(self):
         """ Save active key/phrase combination to db | None -> None """
         #Get key and phrase
@@ -522,6 +539,7 @@ class StandardMainFrame(MainFrame):
         #Save combination
         self.db.prepare_undo()
         self.db.save_entry(key_list, phrase)
+        self.db.record_use(key_list, phrase) #For ranking
         print(self.db)
         #Clear widgets after save
         self.box_1.full_clear()
@@ -642,6 +660,10 @@ class TranslationMainFrame(MainFrame):
         )
         self.box_1.focus() #Focus on key widget
 
+    def get_entry(self):
+        """ Get displayed language 1 and language 2 keys | None -> tuple(str, str) """
+        return self.box_1.get_contents(), self.box_2.get_contents()
+
     def save_entry(self):
         """ Save active lang1/lang2 combination to db | None -> None """
         #Get key and phrase
@@ -652,6 +674,7 @@ class TranslationMainFrame(MainFrame):
         #Save combination
         self.db.prepare_undo()
         self.db.save_entry(lang1_key, lang2_key)
+        self.db.record_use(lang1_key, lang2_key) #For ranking
         print(self.db)
         #Clear widgets after save
         self.box_1.full_clear()
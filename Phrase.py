@@ -42,6 +42,7 @@ class Phrase(AutoText):
         not_first_index()
         previous()
         display_phrase(list)
+        display_list(list)
     """
     
     def __init__(self, master):
@@ -63,7 +64,7 @@ class Phrase(AutoText):
         """ Get list of valid phrases for key list | list(str) -> None """
         if key_list and not key_list == ['']:
             print('key list', key_list)
-            phrase_list = self.db.get_phrase_list(key_list)
+            phrase_list = self.db.get_phrase_list(key_list, fuzzy=True)
             if phrase_list:
                 self.active_list = phrase_list
                 self.active_list_index = 0
@@ -119,26 +120,33 @@ class Phrase(AutoText):
             self.clear()
             return False
 
+    def display_list(self, phrase_list):
+        """ Display first phrase of list, others with Up/Down | list(str) -> bool """
+        self.full_clear()
+        if not phrase_list:
+            return False
+        self.active_list = phrase_list
+        self.active_list_index = 0
+        self.display_current()
+        return True
+
     def get_suggestion(self):
         """ Complete current input with valid phrase from db | None -> None """
         self.debug('get_suggestion Phrase')
         partial_phrase = self.current_text #Get partial phrase
         print(f'partial_phrase: {partial_phrase}, len: {len(partial_phrase)}')
-        if self.suggestion_list: #If suggestion list exists, keep it
-            suggestion_list = self.suggestion_list
-        else: #Otherwise get all phrases starting with partial_phrase
-            suggestion_list = self.db.valid_phrases(partial_phrase)
-            suggestion_list = [s for s in suggestion_list if not s == partial_phrase]
-        print('suggestion_list', suggestion_list)
-        if suggestion_list: #If current input can be completed with a valid phrase: 
-            suggestion = suggestion_list[0] #TODO: Rank suggestions
+        if not self.suggestions: #Get range of phrases starting with partial_phrase
+            self.suggestions = self.db.phrase_range(partial_phrase) #Typed text itself left out
+            if not self.suggestions: #Otherwise complete last word
+                self.suggestions = self.get_word_suggestions(partial_phrase)
+        print('suggestions', self.suggestions)
+        if self.suggestions: #If current input can be completed with a valid phrase: 
+            suggestion = self.db.ranker.top_of_range('rows', self.suggestions) #Most used
             print('suggestion', suggestion)
             #Save suggested chars
             self.suggestion_text = suggestion[len(partial_phrase):]
-            if self.suggestion_text:
-                self.suggestion_list = suggestion_list
-            else:
-                self.suggestion_list = []
+            if not self.suggestion_text:
+                self.suggestions = None
             self.update_display()
         self.debug('get_suggestion', out=True)
 
@@ -198,24 +206,25 @@ class Language1(Language):
         self.debug('get_suggestion lang1')
         partial_key = self.current_text #Get partial phrase
         print(f'partial_key: {partial_key}, len: {len(partial_key)}')
-        if self.suggestion_list: #If suggestion list exists, keep it
-            suggestion_list = self.suggestion_list
-        else: #Otherwise get all keys starting with partial_key
-            suggestion_list = self.db.valid_lang1_keys(partial_key)
-            suggestion_list = [s for s in suggestion_list if not s == partial_key]
-        print('suggestion_list', suggestion_list)
-        if suggestion_list: #If current input can be completed with a valid key: 
-            suggestion = suggestion_list[0] #TODO: Rank suggestions
+        if not self.suggestions: #Get range of keys starting with partial_key
+            self.suggestions = self.db.lang1_key_range(partial_key) #Typed text itself left out
+            if not self.suggestions: #Otherwise complete last word
+                self.suggestions = self.get_word_suggestions(partial_key)
+        print('suggestions', self.suggestions)
+        if self.suggestions: #If current input can be completed with a valid key: 
+            suggestion = self.db.ranker.top_of_range('columns', self.suggestions) #Most used
             print('suggestion', suggestion)
             #Save suggested chars
             self.suggestion_text = suggestion[len(partial_key):]
-            if self.suggestion_text:
-                self.suggestion_list = suggestion_list
-            else:
-                self.suggestion_list = []
+            if not self.suggestion_text:
+                self.suggestions = None
             self.update_display()
         self.debug('get_suggestion', out=True)
 
+    def get_language(self):
+        """ Language 1 of active language pair | None -> str """
+        return config.get_lang1()
+
     def get_saved_keys(self):
         """ Get lang2 match if any for current user input | None -> None """
         key = self.current_text
@@ -226,7 +235,7 @@ class Language1(Language):
 
     def get_matches(self, key):
         print('key', key)
-        matches = self.db.get_lang1_matches(key)
+        matches = self.db.get_lang1_matches(key, fuzzy=True)
         print('matches', matches)
         print(self.db)
         return matches
@@ -243,24 +252,25 @@ class Language2(Language):
         self.debug('get_suggestion lang2')
         partial_key = self.current_text #Get partial phrase
         print(f'partial_key: {partial_key}, len: {len(partial_key)}')
-        if self.suggestion_list: #If suggestion list exists, keep it
-            suggestion_list = self.suggestion_list
-        else: #Otherwise get all phrases starting with partial_key
-            suggestion_list = self.db.valid_lang2_keys(partial_key)
-            suggestion_list = [s for s in suggestion_list if not s == partial_key]
-        print('suggestion_list', suggestion_list)
-        if suggestion_list: #If current input can be completed with a valid phrase: 
-            suggestion = suggestion_list[0] #TODO: Rank suggestions
+        if not self.suggestions: #Get range of phrases starting with partial_key
+            self.suggestions = self.db.lang2_key_range(partial_key) #Typed text itself left out
+            if not self.suggestions: #Otherwise complete last word
+                self.suggestions = self.get_word_suggestions(partial_key)
+        print('suggestions', self.suggestions)
+        if self.suggestions: #If current input can be completed with a valid phrase: 
+            suggestion = self.db.ranker.top_of_range('rows', self.suggestions) #Most used
             print('suggestion', suggestion)
             #Save suggested chars
             self.suggestion_text = suggestion[len(partial_key):]
-            if self.suggestion_text:
-                self.suggestion_list = suggestion_list
-            else:
-                self.suggestion_list = []
+            if not self.suggestion_text:
+                self.suggestions = None
             self.update_display()
         self.debug('get_suggestion', out=True)
 
+    def get_language(self):
+        """ Language 2 of active language pair | None -> str """
+        return config.get_lang2()
+
     def get_saved_keys(self):
         """ Get lang1 match if any for current user input | None -> None """
         key = self.current_text
@@ -271,7 +281,7 @@ class Language2(Language):
 
     def get_matches(self, key):
         print('key', key)
-        matches = self.db.get_lang2_matches(key)
+        matches = self.db.get_lang2_matches(key, fuzzy=True)
         print('matches', matches)
         print(self.db)
         return matches
@@ -0,0 +1,169 @@
+""" Ranking of suggestions by how often and how recently they were used
+
+Each use of a key or phrase, when copied or saved, adds to its score, and
+scores halve every HALF_LIFE seconds. Decaying every score as time passes
+would touch them all, so a use at time t adds 2 ** ((t - epoch) / half_life)
+instead. All scores are then in the same unit at any time and compare
+without decaying. When weights grow too large, all scores are divided by
+the current weight and the epoch moves to the present.
+
+Names never used have no score and keep the order they are given in, so
+sorted completions stay sorted after the used ones.
+
+Scores are saved next to the database file (see Databases.Database).
+
+Constants:
+    HALF_LIFE
+    RESCALE
+    FORGET
+
+Classes:
+    Ranker
+"""
+
+import heapq
+import itertools
+import json
+import os
+import time
+
+HALF_LIFE = 30 * 24 * 3600 #Seconds for a score to halve
+RESCALE = 2.0 ** 64 #Weight above which scores are rescaled
+FORGET = 2.0 ** -10 #Decayed score below which a name is forgotten on save
+
+class Ranker():
+    """ Decayed usage scores of row and column names of a database
+
+    Args:
+        half_life (float): Seconds for a score to halve
+        clock (function): Current time in seconds
+
+    Attributes:
+        scores (dict): Name -> score for 'rows' and 'columns', as in stores
+        dirty (bool): Scores changed since last save
+
+    Methods:
+        get_weight() -> float
+        record(str, iterable(str))
+        get_score(str, str) -> float
+        top(str, iterable(str), opt:int) -> list(str)
+        rank(str, iterable(str)) -> list(str)
+        top_of_range(str, PrefixRange) -> str or None
+        get_state() -> dict
+        from_state(dict) -> Ranker @class
+        write_state(dict, Path) @static
+        save(Path)
+        load(Path) -> Ranker @class
+    """
+
+    def __init__(self, half_life=HALF_LIFE, clock=time.time):
+        self.half_life = half_life
+        self.clock = clock
+        self.epoch = clock() #Time when a use adds 1
+        self.scores = {'rows':{}, 'columns':{}}
+        self.dirty = False
+
+    def get_weight(self):
+        """ Score added by a use now, rescaling if too large | None -> float """
+        weight = 2.0 ** ((self.clock() - self.epoch) / self.half_life)
+        if weight > RESCALE:
+            for scores in self.scores.values():
+                for name in scores:
+                    scores[name] /= weight
+            self.epoch = self.clock()
+            weight = 1.0
+        return weight
+
+    def record(self, axis, names):
+        """ Add a use of each name | str, iterable(str) -> None """
+        weight = self.get_weight()
+        scores = self.scores[axis]
+        for name in names:
+            scores[name] = scores.get(name, 0.0) + weight
+        self.dirty = True
+
+    def get_score(self, axis, name):
+        """ Decayed number of uses of name | str, str -> float """
+        return self.scores[axis].get(name, 0.0) / self.get_weight()
+
+    def top(self, axis, names, k=1):
+        """ k best names, most used first | str, iterable(str), opt:int -> list(str)
+
+        Used names are picked with a heap of size k, in O(n log k). Names
+        never used follow in the order given.
+        """
+        scores = self.scores[axis]
+        names = list(names)
+        used = heapq.nlargest(k, (name for name in names if name in scores),
+                              key=scores.__getitem__)
+        if len(used) < k:
+            used.extend(itertools.islice((name for name in names if name not in scores),
+                                         k - len(used)))
+        return used
+
+    def rank(self, axis, names):
+        """ All names, most used first | str, iterable(str) -> list(str) """
+        names = list(names)
+        return self.top(axis, names, len(names))
+
+    def top_of_range(self, axis, names):
+        """ Most used name of a range, or its first | str, PrefixRange -> str or None
+
+        Completions can be most of an index, so names of the range are read
+        only until there are more than used names. Used names in the range
+        are then found by checking used names instead.
+        """
+        scores = self.scores[axis]
+        first = list(itertools.islice(names, len(scores) + 1))
+        if len(first) > len(scores):
+            used = [name for name in scores if name in names]
+        else:
+            used = [name for name in first if name in scores]
+        if used:
+            return max(used, key=scores.__getitem__)
+        return first[0] if first else None
+
+    def get_state(self):
+        """ Saved state of scores | None -> dict
+
+        Names whose score decayed below FORGET are left out.
+        """
+        weight = self.get_weight()
+        return {
+            'version': 1,
+            'half_life': self.half_life,
+            'epoch': self.epoch,
+            'scores': {axis: {name: score for name, score in scores.items()
+                              if score / weight >= FORGET}
+                       for axis, scores in self.scores.items()}
+        }
+
+    @classmethod
+    def from_state(cls, state, clock=time.time):
+        """ Ranker with saved state | dict, opt:function -> Ranker """
+        ranker = cls(state['half_life'], clock)
+        ranker.epoch = state['epoch']
+        ranker.scores = state['scores']
+        return ranker
+
+    @staticmethod
+    def write_state(state, filepath):
+        """ Write state, replacing file only once written | dict, Path -> None """
+        temporary_filepath = filepath.with_name(filepath.name + '.tmp')
+        with open(temporary_filepath, 'w', encoding='utf-8') as ranking_file:
+            json.dump(state, ranking_file, ensure_ascii=False)
+        os.replace(temporary_filepath, filepath)
+
+    def save(self, filepath):
+        """ Write scores to file | Path -> None """
+        self.write_state(self.get_state(), filepath)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, filepath):
+        """ Read scores saved in file, empty if none | Path -> Ranker """
+        try:
+            with open(filepath, 'r', encoding='utf-8') as ranking_file:
+                return cls.from_state(json.load(ranking_file))
+        except (FileNotFoundError, ValueError, KeyError):
+            return cls()
@@ -0,0 +1,129 @@
+""" Implements the Saver class
+
+Saving a database used to block the interface until the file was written.
+A Saver writes in a background thread instead. Each save only marks the
+database dirty, and a burst of saves is written once after a short idle
+delay. flush() writes pending changes right away and waits until they are
+on disk. All savers are flushed at exit.
+
+Classes: Saver
+"""
+
+import atexit
+import threading
+import time
+import weakref
+
+class Saver():
+    """ Debounced background writer for a database
+
+    The worker thread only runs while changes are pending.
+
+    Args:
+        write (function): Writes pending changes to disk, called by worker
+        delay (float): Seconds without changes before writing
+
+    Methods:
+        mark_dirty()
+        is_dirty() -> bool
+        flush(opt:bool)
+        run()
+        wait_for_idle() -> int or None
+        flush_all() @static
+    """
+
+    DELAY = 0.5 #Default idle delay in seconds
+    instances = weakref.WeakSet() #Savers flushed at exit
+
+    def __init__(self, write, delay=DELAY):
+        self.write = write
+        self.delay = delay
+        self.condition = threading.Condition()
+        self.version = 0 #Number of changes marked
+        self.durable_version = 0 #Number of changes written to disk
+        self.durable_time = None #Time of last write, from time.time()
+        self.last_change = 0 #Time of last change, from time.monotonic()
+        self.flush_version = 0 #Changes to write without waiting for delay
+        self.thread = None #Worker thread while changes are pending
+        self.error = None #Exception raised by last write if any
+        Saver.instances.add(self)
+
+    def mark_dirty(self):
+        """ Schedule write of changes made since last write | None -> None """
+        with self.condition:
+            self.version += 1
+            self.last_change = time.monotonic()
+            if not self.thread:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def is_dirty(self):
+        """ Check if changes are waiting to be written | None -> bool """
+        return self.durable_version < self.version
+
+    def flush(self, wait=True):
+        """ Write pending changes now and wait for them | opt:bool -> None
+
+        With wait False, the write starts without waiting for the delay
+        and flush returns right away.
+
+        Raises the exception of the failed write if changes couldn't be saved.
+        """
+        with self.condition:
+            version = self.version
+            self.flush_version = version
+            self.condition.notify_all()
+            while wait and self.durable_version < version and self.thread:
+                self.condition.wait()
+            if wait and self.durable_version < version and self.error:
+                raise self.error
+
+    def run(self):
+        """ Worker loop, writes until no change is pending | None -> None """
+        while True:
+            with self.condition:
+                version = self.wait_for_idle()
+            if version is None:
+                return
+            try:
+                self.write()
+            except Exception as error: #OSError, pickling errors
+                print(f'Saving failed: {error!r}')
+                with self.condition:
+                    self.error = error
+                    self.thread = None #Next change retries
+                    self.condition.notify_all()
+                return
+            with self.condition:
+                self.error = None
+                self.durable_version = version
+                self.durable_time = time.time()
+                self.condition.notify_all()
+
+    def wait_for_idle(self):
+        """ Wait for delay since last change | None -> int or None
+
+        Returns the version to write, or None after stopping the worker
+        if nothing is pending. Called with condition held.
+        """
+        while True:
+            if not self.is_dirty():
+                self.thread = None
+                self.condition.notify_all()
+                return None
+            remaining = self.last_change + self.delay - time.monotonic()
+            if self.durable_version < self.flush_version or remaining <= 0:
+                return self.version
+            self.condition.wait(remaining)
+
+    @staticmethod
+    def flush_all():
+        """ Flush every saver, used before loading and at exit | None -> None """
+        for saver in list(Saver.instances):
+            try:
+                saver.flush()
+            except Exception: #Already reported by worker
+                pass
+
+atexit.register(Saver.flush_all)
@@ -0,0 +1,1252 @@
+""" Storage engines for Key/Phrase databases
+
+The database classes in Databases.py implement the Key/Phrase logic.
+The storage classes in this module hold the data for those classes.
+
+A database is a set of links between rows and columns:
+    StandardDatabase: rows are phrases, columns are keys.
+    TranslationDatabase: rows are language 2 keys, columns are language 1 keys.
+
+Each phrase only has a few keys, so links are stored sparsely. Memory grows
+with the number of links instead of rows x columns.
+
+LinkStore keeps everything in memory and is pickled whole on each save.
+SQLiteStore keeps everything on disk and only writes changed rows.
+Both implement the same methods so the database classes can use either.
+
+A LinkStore can also be opened from a columnar file (see columnar.py).
+Saved names and links then stay on disk and only changes are kept in memory.
+
+Strings are only used at the API boundary. Internally, rows and columns are
+dense integer ids, and the changes tracked for undo are recorded by id.
+
+Classes:
+    StringPool
+    MappedStringPool
+    MappedLinks
+    Store
+    LinkStore
+    SQLiteStore
+"""
+
+import itertools
+import sqlite3
+from array import array
+from bisect import bisect_left
+import numpy as np
+import pandas as pd
+import columnar
+
+class StringPool():
+    """ Two-way mapping between strings and dense integer ids
+
+    Ids are handed out in insertion order and are never reused during a
+    session. A removed string leaves a None placeholder so that later ids
+    stay valid. Adding it again gives it a new id at the end, the same way
+    a new DataFrame row or column is appended at the end. Only undo gives
+    a removed id back to its string.
+    """
+
+    def __init__(self, names=None):
+        self.names = [] #Id -> string, None if removed
+        self.ids = {} #String -> id
+        if names:
+            for name in names:
+                self.add(name)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def get_id(self, name):
+        """ Get id of string | str -> int, raises KeyError """
+        return self.ids[name]
+
+    def get_name(self, name_id):
+        """ Get string for id | int -> str """
+        return self.names[name_id]
+
+    def capacity(self):
+        """ Total ids handed out including removed ones | None -> int """
+        return len(self.names)
+
+    def add(self, name):
+        """ Add string if missing and return its id | str -> int """
+        try:
+            return self.ids[name]
+        except KeyError:
+            name_id = len(self.names)
+            self.names.append(name)
+            self.ids[name] = name_id
+            return name_id
+
+    def remove(self, name):
+        """ Remove string and return its former id | str -> int """
+        name_id = self.ids.pop(name)
+        self.names[name_id] = None
+        return name_id
+
+    def restore(self, name_id, name):
+        """ Give removed id back to its string, used by undo | int, str -> None """
+        self.names[name_id] = name
+        self.ids[name] = name_id
+
+    def add_removed(self):
+        """ Hand out id of a string saved as removed | None -> int """
+        self.names.append(None)
+        return len(self.names) - 1
+
+    def live_ids(self):
+        """ Ids of all strings in pool in insertion order | None -> list(int) """
+        return [i for i, name in enumerate(self.names) if name is not None]
+
+    def live_names(self):
+        """ All strings in pool in insertion order | None -> list(str) """
+        return [name for name in self.names if name is not None]
+
+class MappedStringPool(StringPool):
+    """ StringPool whose saved strings stay in a memory-mapped file
+
+    Saved strings keep the ids they had in the file. Lookups by string use
+    a binary search over the ids sorted by string, so only the pages holding
+    the compared strings are read. New strings are kept in memory like
+    a StringPool, with ids starting after the saved ones.
+
+    Args:
+        blob (np.ndarray): UTF-8 strings one after the other
+        offsets (np.ndarray): string i is blob[offsets[i]:offsets[i+1]]
+        order (np.ndarray): ids sorted by string
+    """
+
+    def __init__(self, blob, offsets, order):
+        StringPool.__init__(self)
+        self.blob = blob
+        self.offsets = offsets
+        self.order = order
+        self.saved_count = len(offsets) - 1 #Strings in file
+        self.removed = set() #Ids of removed saved strings
+        self.revived = {} #Saved id -> string given back to an id saved as removed
+
+    def __len__(self):
+        return self.saved_count - len(self.removed) + len(self.ids)
+
+    def __contains__(self, name):
+        try:
+            self.get_id(name)
+            return True
+        except KeyError:
+            return False
+
+    def get_bytes(self, name_id):
+        """ Get UTF-8 bytes of saved string | int -> bytes """
+        return self.blob[self.offsets[name_id]:self.offsets[name_id+1]].tobytes()
+
+    def find_saved(self, name):
+        """ Binary search saved strings | str -> int or None """
+        encoded = name.encode('utf-8')
+        low, high = 0, self.saved_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.get_bytes(self.order[middle]) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.saved_count:
+            name_id = int(self.order[low])
+            if self.get_bytes(name_id) == encoded:
+                return name_id
+        return None
+
+    def get_id(self, name):
+        """ Get id of string | str -> int, raises KeyError """
+        try:
+            return self.ids[name]
+        except KeyError:
+            name_id = self.find_saved(name)
+            if name_id is None or name_id in self.removed:
+                raise
+            return name_id
+
+    def get_name(self, name_id):
+        """ Get string for id | int -> str """
+        if name_id < self.saved_count:
+            if name_id in self.removed:
+                return None
+            if name_id in self.revived:
+                return self.revived[name_id]
+            return self.get_bytes(name_id).decode('utf-8')
+        return self.names[name_id - self.saved_count]
+
+    def capacity(self):
+        """ Total ids handed out including removed ones | None -> int """
+        return self.saved_count + len(self.names)
+
+    def add(self, name):
+        """ Add string if missing and return its id | str -> int """
+        try:
+            return self.get_id(name)
+        except KeyError:
+            name_id = self.capacity()
+            self.names.append(name)
+            self.ids[name] = name_id
+            return name_id
+
+    def remove(self, name):
+        """ Remove string and return its former id | str -> int """
+        name_id = self.get_id(name)
+        if name_id < self.saved_count:
+            self.removed.add(name_id)
+            self.ids.pop(name, None) #If revived
+        else:
+            del self.ids[name]
+            self.names[name_id - self.saved_count] = None
+        return name_id
+
+    def restore(self, name_id, name):
+        """ Give removed id back to its string, used by undo | int, str -> None """
+        if name_id < self.saved_count:
+            self.removed.discard(name_id)
+            if not self.get_bytes(name_id) == name.encode('utf-8'): #Saved as removed
+                self.revived[name_id] = name
+                self.ids[name] = name_id
+        else:
+            self.names[name_id - self.saved_count] = name
+            self.ids[name] = name_id
+
+    def live_ids(self):
+        """ Ids of all strings in pool in insertion order | None -> list(int) """
+        saved_ids = [i for i in range(self.saved_count) if i not in self.removed]
+        return saved_ids + [i + self.saved_count for i, name in enumerate(self.names)
+                            if name is not None]
+
+    def live_names(self):
+        """ All strings in pool in insertion order | None -> list(str) """
+        return [self.get_name(name_id) for name_id in self.live_ids()]
+
+class MappedLinks():
+    """ Link lists of rows or columns whose saved part stays in a mapped file
+
+    Behaves like the list of link tuples or arrays in a LinkStore. Saved
+    links are read from the file when first accessed. Changed and new link
+    lists are kept in memory.
+
+    Args:
+        offsets (np.ndarray): links of i are values[offsets[i]:offsets[i+1]]
+        values (np.ndarray): ids of linked rows or columns
+        convert (type): tuple for row links, array for column links
+    """
+
+    def __init__(self, offsets, values, convert):
+        self.offsets = offsets
+        self.values = values
+        self.convert = convert
+        self.length = len(offsets) - 1
+        self.saved_count = self.length
+        self.changed = {} #Id -> links read or changed since file was saved
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        try:
+            return self.changed[index]
+        except KeyError:
+            if not 0 <= index < self.saved_count:
+                raise IndexError(index)
+            links = self.values[self.offsets[index]:self.offsets[index+1]].tolist()
+            if self.convert is tuple:
+                return tuple(links) #Immutable, no need to keep it
+            links = self.convert('q', links)
+            self.changed[index] = links #Changed in place by LinkStore
+            return links
+
+    def __setitem__(self, index, links):
+        self.changed[index] = links
+
+    def append(self, links):
+        self.changed[self.length] = links
+        self.length += 1
+
+class Store():
+    """ Undo tracking shared by storage classes
+
+    While changes is a list, every change is appended to it as a tuple of
+    ids, starting with a code:
+        ('r', row_id) row added    ('R', row_id, name) row removed
+        ('c', column_id) column added    ('C', column_id, name) column removed
+        ('l', row_id, column_id) link added
+        ('u', row_id, column_id) link removed
+    A removed row or column has no links left, they are removed first.
+
+    Indexes of row or column names attached with attach_index are told
+    about every name added or removed, including by undo and journal
+    replay (see Indexes.py). version counts these changes, so results
+    computed from names can be kept until it changes.
+    """
+
+    #Change code -> method reverting the change
+    REVERT_METHODS = {
+        'r':'kill_row',
+        'c':'kill_column',
+        'l':'unlink',
+        'u':'link',
+        'R':'revive_row',
+        'C':'revive_column'
+    }
+
+    changes = None #Changes since undo point, None if not tracking
+    version = 0 #Names added or removed since opened
+
+    def track(self, *change):
+        """ Track change for undo if tracking | tuple -> None """
+        if self.changes is not None:
+            self.changes.append(change)
+
+    def revert(self, changes):
+        """ Revert tracked changes | list(tuple) -> list(tuple)
+
+        Returns the changes made by reverting, reverting them redoes.
+        """
+        tracked, self.changes = self.changes, []
+        for code, *change in reversed(changes):
+            getattr(self, self.REVERT_METHODS[code])(*change)
+        reverted, self.changes = self.changes, tracked
+        return reverted
+
+    def attach_index(self, axis, index):
+        """ Keep index up to date with names of 'rows' or 'columns'
+
+        str, Indexes.NameIndex -> None
+        """
+        self.indexes[axis].append(index)
+
+    def update_indexes(self, axis, method, name):
+        """ Call 'add' or 'remove' on indexes of axis | str, str, str -> None """
+        self.version += 1
+        for index in self.indexes[axis]:
+            getattr(index, method)(name)
+
+class LinkStore(Store):
+    """ Sparse storage of row/column links
+
+    Every row keeps a sorted tuple of its column ids (CSR style) and every
+    column keeps a sorted array of its row ids (CSC style). Both directions
+    are needed: phrase -> keys for get_matching_keys and key -> phrases for
+    get_phrase_list.
+
+    Rows and columns with no links are allowed, like all False rows and
+    columns in a DataFrame.
+
+    When records is a list, every change is also recorded there by name so
+    it can be written to a journal and replayed later (see Journal.py).
+    A row or column given back its id by undo is recorded with that id,
+    so replaying keeps the order of rows and columns.
+
+    Columns linked to many rows also get a packed bitmap of their row ids,
+    built when first queried and dropped when the column changes. Queries
+    on such columns are a vectorized AND of the bitmaps.
+    """
+
+    #Journal record codes -> method replaying the change
+    RECORD_METHODS = {
+        'r':'add_row',
+        'c':'add_column',
+        'l':'link_names',
+        'u':'unlink_names',
+        'R':'remove_row',
+        'C':'remove_column'
+    }
+    #Journal record codes with an id -> method replaying the change
+    REVIVE_METHODS = {
+        'r':'revive_row',
+        'c':'revive_column'
+    }
+
+    #Columns linked to at least 1 row in BITMAP_DENSITY use bitmaps
+    BITMAP_DENSITY = 256
+
+    def __init__(self):
+        self.rows = StringPool() #Phrases or language 2 keys
+        self.columns = StringPool() #Keys or language 1 keys
+        self.row_links = [] #Row id -> sorted tuple of column ids
+        self.column_links = [] #Column id -> sorted array of row ids
+        self.links = 0 #Total number of row/column links
+        self.records = None #Changes not yet journaled, None if not journaling
+        self.generation = 0 #Last journal generation included in saved state
+        self.bitmaps = {} #Column id -> packed uint64 bitmap of row ids
+        self.indexes = {'rows':[], 'columns':[]} #Attached name indexes
+
+    def __repr__(self):
+        return (f'LinkStore({len(self.rows)} rows, {len(self.columns)} columns, '
+                f'{self.links} links)')
+
+    @classmethod
+    def load(cls, filepath):
+        """ Load store from pickle file | Path -> LinkStore
+
+        Raises FileNotFoundError if there is no saved store.
+        """
+        saved = pd.read_pickle(filepath)
+        if isinstance(saved, pd.DataFrame): #Saved before sparse storage
+            print('Converting saved key dataframe')
+            return cls.from_frame(saved)
+        return cls.from_state(saved)
+
+    @classmethod
+    def open_columnar(cls, filepath):
+        """ Open store from columnar file without loading it | Path -> LinkStore """
+        arrays = columnar.read(filepath)
+        store = cls()
+        store.rows = MappedStringPool(arrays['row_blob'],
+                                      arrays['row_name_offsets'],
+                                      arrays['row_order'])
+        store.columns = MappedStringPool(arrays['column_blob'],
+                                         arrays['column_name_offsets'],
+                                         arrays['column_order'])
+        if 'row_removed' in arrays: #Not in files written before ids were kept
+            store.rows.removed = set(arrays['row_removed'].tolist())
+            store.columns.removed = set(arrays['column_removed'].tolist())
+        store.row_links = MappedLinks(arrays['row_link_offsets'],
+                                      arrays['row_links'], tuple)
+        store.column_links = MappedLinks(arrays['column_link_offsets'],
+                                         arrays['column_links'], array)
+        store.links = len(arrays['row_links'])
+        store.generation = arrays['generation']
+        return store
+
+    def save(self, filepath):
+        """ Write whole store to pickle file | Path -> None """
+        pd.to_pickle(self.get_state(), filepath)
+
+    def close(self):
+        """ Release resources before file is replaced | None -> None """
+        pass
+
+    def record(self, *change):
+        """ Record change for journal if journaling | str, str... -> None """
+        if self.records is not None:
+            self.records.append(change)
+
+    def take_records(self):
+        """ Get and clear changes recorded since last call | None -> list """
+        records = self.records
+        self.records = []
+        return records
+
+    def replay(self, records):
+        """ Apply changes read from a journal | list(list(str)) -> None """
+        for code, *names in records:
+            try:
+                if len(names) == 2 and code in self.REVIVE_METHODS: #Undone removal
+                    name, name_id = names
+                    getattr(self, self.REVIVE_METHODS[code])(name_id, name)
+                else:
+                    getattr(self, self.RECORD_METHODS[code])(*names)
+            except KeyError: #Already removed
+                pass
+
+    def is_empty(self):
+        """ Check if store has no rows or no columns | None -> bool """
+        return not self.rows or not self.columns
+
+    def row_names(self):
+        """ Row names in insertion order | None -> list(str) """
+        return self.rows.live_names()
+
+    def column_names(self):
+        """ Column names in insertion order | None -> list(str) """
+        return self.columns.live_names()
+
+    def has_row(self, name):
+        return name in self.rows
+
+    def has_column(self, name):
+        return name in self.columns
+
+    def add_row(self, name):
+        """ Add row if missing and return its id | str -> int """
+        row_id = self.rows.add(name)
+        if row_id == len(self.row_links):
+            self.row_links.append(())
+            self.update_indexes('rows', 'add', name)
+            self.record('r', name)
+            self.track('r', row_id)
+        return row_id
+
+    def add_column(self, name):
+        """ Add column if missing and return its id | str -> int """
+        column_id = self.columns.add(name)
+        if column_id == len(self.column_links):
+            self.column_links.append(array('q'))
+            self.update_indexes('columns', 'add', name)
+            self.record('c', name)
+            self.track('c', column_id)
+        return column_id
+
+    def revive_row(self, row_id, name):
+        """ Give removed row its id back, used by undo | int, str -> None """
+        self.rows.restore(row_id, name)
+        self.update_indexes('rows', 'add', name)
+        self.record('r', name, row_id)
+        self.track('r', row_id)
+
+    def revive_column(self, column_id, name):
+        """ Give removed column its id back, used by undo | int, str -> None """
+        self.columns.restore(column_id, name)
+        self.update_indexes('columns', 'add', name)
+        self.record('c', name, column_id)
+        self.track('c', column_id)
+
+    def kill_row(self, row_id):
+        """ Remove row without links by id | int -> None """
+        name = self.rows.get_name(row_id)
+        self.rows.remove(name)
+        self.update_indexes('rows', 'remove', name)
+        self.record('R', name)
+        self.track('R', row_id, name)
+
+    def kill_column(self, column_id):
+        """ Remove column without links by id | int -> None """
+        name = self.columns.get_name(column_id)
+        self.columns.remove(name)
+        self.bitmaps.pop(column_id, None)
+        self.update_indexes('columns', 'remove', name)
+        self.record('C', name)
+        self.track('C', column_id, name)
+
+    def link(self, row_id, column_id):
+        """ Link row and column | int, int -> None """
+        row = self.row_links[row_id]
+        index = bisect_left(row, column_id)
+        if index < len(row) and row[index] == column_id:
+            return
+        self.row_links[row_id] = row[:index] + (column_id,) + row[index:]
+        column = self.column_links[column_id]
+        column.insert(bisect_left(column, row_id), row_id)
+        self.bitmaps.pop(column_id, None)
+        self.links += 1
+        self.record('l', self.rows.get_name(row_id), self.columns.get_name(column_id))
+        self.track('l', row_id, column_id)
+
+    def unlink(self, row_id, column_id):
+        """ Remove link between row and column if any | int, int -> None """
+        row = self.row_links[row_id]
+        index = bisect_left(row, column_id)
+        if index == len(row) or not row[index] == column_id:
+            return
+        self.row_links[row_id] = row[:index] + row[index+1:]
+        column = self.column_links[column_id]
+        del column[bisect_left(column, row_id)]
+        self.bitmaps.pop(column_id, None)
+        self.links -= 1
+        self.record('u', self.rows.get_name(row_id), self.columns.get_name(column_id))
+        self.track('u', row_id, column_id)
+
+    def set_row(self, name, column_names):
+        """ Replace links of row, adding row and columns if missing
+
+        str, list(str) -> None
+        """
+        row_id = self.add_row(name)
+        for column_id in self.row_links[row_id]:
+            self.unlink(row_id, column_id)
+        column_ids = [self.add_column(column) for column in column_names]
+        for column_id in column_ids:
+            self.link(row_id, column_id)
+
+    def link_names(self, row_name, column_name):
+        """ Link row and column by name, adding if missing | str, str -> None """
+        self.link(self.add_row(row_name), self.add_column(column_name))
+
+    def set_rows(self, entries):
+        """ Replace links of many rows | iterable(tuple(str, list(str))) -> None
+
+        Same result as set_row for each entry. A row new to the store gets
+        the largest id, so it is added at the end of each of its column
+        arrays without searching, and its tuple is built once.
+        """
+        for name, column_names in entries:
+            if name in self.rows:
+                self.set_row(name, column_names)
+                continue
+            row_id = self.add_row(name)
+            column_ids = [self.add_column(column) for column in column_names]
+            column_ids = sorted(set(column_ids))
+            self.row_links[row_id] = tuple(column_ids)
+            for column_id in column_ids:
+                self.column_links[column_id].append(row_id)
+                self.bitmaps.pop(column_id, None)
+                self.record('l', name, self.columns.get_name(column_id))
+                self.track('l', row_id, column_id)
+            self.links += len(column_ids)
+
+    def unlink_names(self, row_name, column_name, prune=False):
+        """ Unlink row and column by name if both exist | str, str, opt:bool -> None
+
+        With prune True, the row and column are removed if left without links.
+        """
+        try:
+            row_id = self.rows.get_id(row_name)
+            column_id = self.columns.get_id(column_name)
+        except KeyError:
+            return
+        self.unlink(row_id, column_id)
+        if prune:
+            self.prune_rows([row_id])
+            self.prune_columns([column_id])
+
+    def remove_row(self, name, prune=False):
+        """ Remove row and its links | str, opt:bool -> None, raises KeyError
+
+        With prune True, columns left without links are removed too.
+        Only the columns of the row are checked.
+        """
+        row_id = self.rows.get_id(name)
+        column_ids = self.row_links[row_id]
+        for column_id in column_ids:
+            column = self.column_links[column_id]
+            del column[bisect_left(column, row_id)]
+            self.bitmaps.pop(column_id, None)
+            self.track('u', row_id, column_id)
+        self.links -= len(column_ids)
+        self.row_links[row_id] = ()
+        self.kill_row(row_id)
+        if prune:
+            self.prune_columns(column_ids)
+
+    def remove_column(self, name):
+        """ Remove column and its links | str -> None, raises KeyError """
+        column_id = self.columns.get_id(name)
+        for row_id in reversed(self.column_links[column_id]): #Undo relinks in order
+            row = self.row_links[row_id]
+            index = bisect_left(row, column_id)
+            self.row_links[row_id] = row[:index] + row[index+1:]
+            self.track('u', row_id, column_id)
+        self.links -= len(self.column_links[column_id])
+        self.column_links[column_id] = array('q')
+        self.kill_column(column_id)
+
+    def prune_columns(self, column_ids):
+        """ Remove given columns if they have no links | iterable(int) -> None """
+        for column_id in column_ids:
+            if not self.column_links[column_id]:
+                self.kill_column(column_id)
+
+    def prune_rows(self, row_ids):
+        """ Remove given rows if they have no links | iterable(int) -> None """
+        for row_id in row_ids:
+            if not self.row_links[row_id]:
+                self.kill_row(row_id)
+
+    def remove_empty_columns(self):
+        """ Remove all columns without links | None -> None """
+        for column_id in self.columns.live_ids():
+            if not self.column_links[column_id]:
+                self.remove_column(self.columns.get_name(column_id))
+
+    def remove_empty_rows(self):
+        """ Remove all rows without links | None -> None """
+        for row_id in self.rows.live_ids():
+            if not self.row_links[row_id]:
+                self.remove_row(self.rows.get_name(row_id))
+
+    def rows_with_all(self, column_names):
+        """ Rows linked to every column | list(str) -> list(str)
+
+        Raises KeyError if a column doesn't exist.
+        """
+        return [self.rows.get_name(row_id)
+                for row_id in self.row_ids_with_all(column_names)]
+
+    def count_rows_with_all(self, column_names):
+        """ Number of rows linked to every column | list(str) -> int
+
+        Raises KeyError if a column doesn't exist.
+        """
+        column_ids = {self.columns.get_id(name) for name in column_names}
+        if self.use_bitmaps(column_ids):
+            return int(self.popcount(self.bitmap_and(column_ids)))
+        return len(self.row_ids_with_all(column_names))
+
+    def row_ids_with_all(self, column_names):
+        """ Ids of rows linked to every column | list(str) -> sequence(int)
+
+        Raises KeyError if a column doesn't exist.
+
+        Dense columns are combined with a vectorized AND of their bitmaps.
+        Otherwise the sorted row ids of each column are intersected, starting
+        with the column with the fewest rows, so cost follows the size of
+        the smallest column rather than the number of rows.
+        """
+        column_ids = {self.columns.get_id(name) for name in column_names}
+        if self.use_bitmaps(column_ids):
+            return self.bitmap_rows(self.bitmap_and(column_ids))
+        postings = sorted((self.column_links[i] for i in column_ids), key=len)
+        row_ids = postings[0]
+        for posting in postings[1:]:
+            if not row_ids:
+                break
+            row_ids = self.intersect(row_ids, posting)
+        return row_ids
+
+    @staticmethod
+    def intersect(small, large):
+        """ Ids in both sorted sequences | sequence, sequence -> list(int)
+
+        Each id of small is found in large by a binary search starting
+        after the previous match: len(small) * log(len(large)) steps.
+        """
+        result = []
+        low = 0
+        for row_id in small:
+            low = bisect_left(large, row_id, low)
+            if low == len(large):
+                break
+            if large[low] == row_id:
+                result.append(row_id)
+        return result
+
+    def use_bitmaps(self, column_ids):
+        """ Check if all columns are dense enough for bitmaps | set(int) -> bool """
+        minimum = self.rows.capacity() / self.BITMAP_DENSITY
+        return len(column_ids) > 1 and all(len(self.column_links[i]) >= minimum
+                                           for i in column_ids)
+
+    def get_bitmap(self, column_id):
+        """ Packed bitmap of rows linked to column | int -> np.ndarray(uint64)
+
+        Bit i of word j is set if row 64 * j + i is linked.
+        """
+        try:
+            return self.bitmaps[column_id]
+        except KeyError:
+            row_ids = np.asarray(self.column_links[column_id], dtype=np.int64)
+            bits = np.zeros(-(-self.rows.capacity() // 64) * 64, dtype=bool)
+            bits[row_ids] = True
+            bitmap = np.packbits(bits, bitorder='little').view(np.uint64)
+            self.bitmaps[column_id] = bitmap
+            return bitmap
+
+    def bitmap_and(self, column_ids):
+        """ Bitmap of rows linked to every column | set(int) -> np.ndarray """
+        bitmaps = [self.get_bitmap(column_id) for column_id in column_ids]
+        length = min(len(bitmap) for bitmap in bitmaps) #Rows added since are unlinked
+        result = bitmaps[0][:length].copy()
+        for bitmap in bitmaps[1:]:
+            np.bitwise_and(result, bitmap[:length], out=result)
+        return result
+
+    @staticmethod
+    def bitmap_rows(bitmap):
+        """ Sorted ids of rows set in bitmap | np.ndarray -> list(int) """
+        words = np.flatnonzero(bitmap)
+        bits = np.unpackbits(bitmap[words].view(np.uint8), bitorder='little')
+        positions, offsets = np.nonzero(bits.reshape(-1, 64))
+        return (words[positions] * 64 + offsets).tolist()
+
+    @staticmethod
+    def popcount(bitmap):
+        """ Number of bits set in bitmap | np.ndarray -> int """
+        if hasattr(np, 'bitwise_count'): #numpy 2.0 and later
+            return np.bitwise_count(bitmap).sum()
+        return np.unpackbits(bitmap.view(np.uint8)).sum()
+
+    def columns_of_row(self, name):
+        """ Columns linked to row | str -> list(str), raises KeyError """
+        row_id = self.rows.get_id(name)
+        return [self.columns.get_name(i) for i in self.row_links[row_id]]
+
+    def rows_of_column(self, name):
+        """ Rows linked to column | str -> list(str), raises KeyError """
+        column_id = self.columns.get_id(name)
+        return [self.rows.get_name(i) for i in self.column_links[column_id]]
+
+    def iter_rows(self):
+        """ Rows and their linked columns, read lazily in insertion order
+
+        None -> iterator(tuple(str, list(str)))
+        """
+        for row_id in range(self.rows.capacity()):
+            name = self.rows.get_name(row_id)
+            if name is not None:
+                yield name, [self.columns.get_name(i) for i in self.row_links[row_id]]
+
+    def to_frame(self):
+        """ Dense boolean DataFrame view of store | None -> pd.DataFrame
+
+        Only meant for display and tests, memory is rows x columns.
+        """
+        if not self.rows and not self.columns:
+            return pd.DataFrame()
+        row_ids = self.rows.live_ids()
+        column_ids = self.columns.live_ids()
+        row_position = {row_id:i for i, row_id in enumerate(row_ids)}
+        column_position = {column_id:i for i, column_id in enumerate(column_ids)}
+        values = np.zeros((len(row_ids), len(column_ids)), dtype=bool)
+        for row_id in row_ids:
+            for column_id in self.row_links[row_id]:
+                values[row_position[row_id], column_position[column_id]] = True
+        return pd.DataFrame(values,
+                            index=self.rows.live_names(),
+                            columns=self.columns.live_names())
+
+    @classmethod
+    def from_frame(cls, frame):
+        """ Create store from dense boolean DataFrame | pd.DataFrame -> LinkStore
+
+        Used to convert databases saved before sparse storage.
+        """
+        store = cls()
+        for column in frame.columns:
+            store.add_column(column)
+        for row in frame.index:
+            store.add_row(row)
+        row_positions, column_positions = np.nonzero(frame.to_numpy(dtype=bool))
+        for row_id, column_id in zip(row_positions.tolist(),
+                                     column_positions.tolist()):
+            store.link(row_id, column_id)
+        return store
+
+    def get_state(self):
+        """ Compact picklable state of store | None -> dict
+
+        Ids are kept, removed rows and columns are saved as None names, so
+        ids recorded in a journal after a checkpoint stay valid on replay.
+        Links are stored as CSR arrays: the column ids of row i are
+        row_links[row_offsets[i]:row_offsets[i+1]].
+        """
+        rows = [self.rows.get_name(row_id) for row_id in range(self.rows.capacity())]
+        columns = [self.columns.get_name(column_id)
+                   for column_id in range(self.columns.capacity())]
+        row_offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        row_links = np.empty(self.links, dtype=np.int64)
+        position = 0
+        for row_id in range(len(rows)):
+            links = self.row_links[row_id]
+            row_links[position:position+len(links)] = links
+            position += len(links)
+            row_offsets[row_id+1] = position
+        return {
+            'version': 2,
+            'generation': self.generation,
+            'rows': rows,
+            'columns': columns,
+            'row_offsets': row_offsets,
+            'row_links': row_links,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """ Create store from state saved by get_state | dict -> LinkStore """
+        store = cls()
+        for column in state['columns']:
+            if column is None: #Removed, id kept
+                store.columns.add_removed()
+                store.column_links.append(array('q'))
+            else:
+                store.add_column(column)
+        row_offsets = state['row_offsets'].tolist()
+        row_links = state['row_links'].tolist()
+        for row_id, row in enumerate(state['rows']):
+            if row is None: #Removed, id kept
+                store.rows.add_removed()
+                store.row_links.append(())
+                continue
+            store.add_row(row)
+            links = tuple(row_links[row_offsets[row_id]:row_offsets[row_id+1]])
+            store.row_links[row_id] = links
+            for column_id in links:
+                store.column_links[column_id].append(row_id)
+        store.links = len(row_links)
+        store.generation = state.get('generation', 0)
+        return store
+
+class SQLiteStore(Store):
+    """ SQLite storage of row/column links
+
+    Table names follow the standard database: phrases are rows and keys are
+    columns. In a translation database, phrases hold language 2 keys and keys
+    hold language 1 keys.
+
+    Each change is a single row insert or delete in the current transaction.
+    Calling save commits the transaction, so a save only writes changed rows.
+    Databases commit from their saver thread, holding the database lock.
+
+    Ids come from SQLite and order rows and columns by insertion, the same
+    way as LinkStore.
+
+    Row, column and link counts are read once on opening and kept by the
+    methods changing the tables, so checking if the store is empty on each
+    save doesn't scan them.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS phrases (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS keys (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS links (
+            phrase_id INTEGER NOT NULL REFERENCES phrases(id) ON DELETE CASCADE,
+            key_id INTEGER NOT NULL REFERENCES keys(id) ON DELETE CASCADE,
+            PRIMARY KEY (phrase_id, key_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS links_by_key ON links (key_id, phrase_id);
+    """
+
+    AXES = {'phrases':'rows', 'keys':'columns'} #Table -> axis of indexes
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        #Commits are made by the saver thread of the database, see Saver.py
+        self.connection = sqlite3.connect(str(filepath), check_same_thread=False)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.executescript(self.SCHEMA)
+        self.indexes = {'rows':[], 'columns':[]} #Attached name indexes
+        self.counts = {} #Table -> number of rows
+        self.recount()
+
+    def __repr__(self):
+        return (f'SQLiteStore({self.counts["phrases"]} rows, '
+                f'{self.counts["keys"]} columns, {self.links} links)')
+
+    def save(self, filepath=None):
+        """ Commit changes since last save | opt:Path -> None """
+        self.connection.commit()
+
+    def close(self):
+        """ Close connection before file is replaced | None -> None """
+        self.connection.close()
+
+    def count(self, table):
+        """ Count rows of table | str -> int """
+        return self.connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    def recount(self):
+        """ Read counts of all tables, after opening or bulk inserts | None -> None """
+        for table in ('phrases', 'keys', 'links'):
+            self.counts[table] = self.count(table)
+
+    @property
+    def links(self):
+        """ Total number of row/column links | None -> int """
+        return self.counts['links']
+
+    def query_names(self, query, parameters=()):
+        """ Run query returning names | str, tuple -> list(str) """
+        return [name for (name,) in self.connection.execute(query, parameters)]
+
+    def get_id(self, table, name):
+        """ Get id of name in table | str, str -> int, raises KeyError """
+        result = self.connection.execute(f'SELECT id FROM {table} WHERE name = ?',
+                                         (name,)).fetchone()
+        if result is None:
+            raise KeyError(name)
+        return result[0]
+
+    def insert_name(self, table, name, name_id=None):
+        """ Insert name in table and return its id | str, str, opt:int -> int """
+        cursor = self.connection.execute(
+            f'INSERT INTO {table} (id, name) VALUES (?, ?)', (name_id, name))
+        self.counts[table] += 1
+        self.update_indexes(self.AXES[table], 'add', name)
+        return cursor.lastrowid
+
+    def delete_name(self, table, name_id):
+        """ Delete name from table and return it | str, int -> str """
+        name = self.connection.execute(f'SELECT name FROM {table} WHERE id = ?',
+                                       (name_id,)).fetchone()[0]
+        self.connection.execute(f'DELETE FROM {table} WHERE id = ?', (name_id,))
+        self.counts[table] -= 1
+        self.update_indexes(self.AXES[table], 'remove', name)
+        return name
+
+    def is_empty(self):
+        """ Check if store has no rows or no columns | None -> bool """
+        return not self.counts['phrases'] or not self.counts['keys']
+
+    def row_names(self):
+        """ Row names in insertion order | None -> list(str) """
+        return self.query_names('SELECT name FROM phrases ORDER BY id')
+
+    def column_names(self):
+        """ Column names in insertion order | None -> list(str) """
+        return self.query_names('SELECT name FROM keys ORDER BY id')
+
+    def has_row(self, name):
+        try:
+            self.get_id('phrases', name)
+            return True
+        except KeyError:
+            return False
+
+    def has_column(self, name):
+        try:
+            self.get_id('keys', name)
+            return True
+        except KeyError:
+            return False
+
+    def add_row(self, name):
+        """ Add row if missing and return its id | str -> int """
+        try:
+            return self.get_id('phrases', name)
+        except KeyError:
+            row_id = self.insert_name('phrases', name)
+            self.track('r', row_id)
+            return row_id
+
+    def add_column(self, name):
+        """ Add column if missing and return its id | str -> int """
+        try:
+            return self.get_id('keys', name)
+        except KeyError:
+            column_id = self.insert_name('keys', name)
+            self.track('c', column_id)
+            return column_id
+
+    def revive_row(self, row_id, name):
+        """ Give removed row its id back, used by undo | int, str -> None """
+        self.insert_name('phrases', name, row_id)
+        self.track('r', row_id)
+
+    def revive_column(self, column_id, name):
+        """ Give removed column its id back, used by undo | int, str -> None """
+        self.insert_name('keys', name, column_id)
+        self.track('c', column_id)
+
+    def kill_row(self, row_id):
+        """ Remove row without links by id | int -> None """
+        self.track('R', row_id, self.delete_name('phrases', row_id))
+
+    def kill_column(self, column_id):
+        """ Remove column without links by id | int -> None """
+        self.track('C', column_id, self.delete_name('keys', column_id))
+
+    def link(self, row_id, column_id):
+        """ Link row and column | int, int -> None """
+        cursor = self.connection.execute(
+            'INSERT OR IGNORE INTO links (phrase_id, key_id) VALUES (?, ?)',
+            (row_id, column_id))
+        if cursor.rowcount:
+            self.counts['links'] += 1
+            self.track('l', row_id, column_id)
+
+    def unlink(self, row_id, column_id):
+        """ Remove link between row and column if any | int, int -> None """
+        cursor = self.connection.execute(
+            'DELETE FROM links WHERE phrase_id = ? AND key_id = ?',
+            (row_id, column_id))
+        if cursor.rowcount:
+            self.counts['links'] -= 1
+            self.track('u', row_id, column_id)
+
+    def column_ids_of_row(self, row_id):
+        """ Ids of columns linked to row | int -> list(int) """
+        return [column_id for (column_id,) in self.connection.execute(
+            'SELECT key_id FROM links WHERE phrase_id = ? ORDER BY key_id',
+            (row_id,))]
+
+    def set_row(self, name, column_names):
+        """ Replace links of row, adding row and columns if missing
+
+        str, list(str) -> None
+        """
+        row_id = self.add_row(name)
+        for column_id in self.column_ids_of_row(row_id):
+            self.unlink(row_id, column_id)
+        column_ids = [self.add_column(column) for column in column_names]
+        for column_id in column_ids:
+            self.link(row_id, column_id)
+
+    def link_names(self, row_name, column_name):
+        """ Link row and column by name, adding if missing | str, str -> None """
+        self.link(self.add_row(row_name), self.add_column(column_name))
+
+    def set_rows(self, entries):
+        """ Replace links of many rows | iterable(tuple(str, list(str))) -> None
+
+        Same result as set_row for each entry, in the current transaction.
+        """
+        for name, column_names in entries:
+            self.set_row(name, column_names)
+
+    def unlink_names(self, row_name, column_name, prune=False):
+        """ Unlink row and column by name if both exist | str, str, opt:bool -> None
+
+        With prune True, the row and column are removed if left without links.
+        """
+        try:
+            row_id = self.get_id('phrases', row_name)
+            column_id = self.get_id('keys', column_name)
+        except KeyError:
+            return
+        self.unlink(row_id, column_id)
+        if prune:
+            self.prune_rows([row_id])
+            self.prune_columns([column_id])
+
+    def remove_row(self, name, prune=False):
+        """ Remove row and its links | str, opt:bool -> None, raises KeyError
+
+        With prune True, columns left without links are removed too.
+        Only the columns of the row are checked.
+        """
+        row_id = self.get_id('phrases', name)
+        column_ids = self.column_ids_of_row(row_id)
+        for column_id in column_ids:
+            self.unlink(row_id, column_id)
+        self.kill_row(row_id)
+        if prune:
+            self.prune_columns(column_ids)
+
+    def remove_column(self, name):
+        """ Remove column and its links | str -> None, raises KeyError """
+        column_id = self.get_id('keys', name)
+        if self.changes is not None:
+            for (row_id,) in self.connection.execute(
+                    'SELECT phrase_id FROM links WHERE key_id = ? '
+                    'ORDER BY phrase_id DESC', (column_id,)):
+                self.track('u', row_id, column_id)
+        cursor = self.connection.execute('DELETE FROM links WHERE key_id = ?',
+                                         (column_id,))
+        self.counts['links'] -= cursor.rowcount
+        self.kill_column(column_id)
+
+    def is_linked(self, column, name_id):
+        """ Check if row or column has links, read from index | str, int -> bool """
+        query = f'SELECT EXISTS (SELECT 1 FROM links WHERE {column} = ?)'
+        return bool(self.connection.execute(query, (name_id,)).fetchone()[0])
+
+    def prune_columns(self, column_ids):
+        """ Remove given columns if they have no links | iterable(int) -> None """
+        for column_id in column_ids:
+            if not self.is_linked('key_id', column_id):
+                self.kill_column(column_id)
+
+    def prune_rows(self, row_ids):
+        """ Remove given rows if they have no links | iterable(int) -> None """
+        for row_id in row_ids:
+            if not self.is_linked('phrase_id', row_id):
+                self.kill_row(row_id)
+
+    def remove_empty_columns(self):
+        """ Remove all columns without links | None -> None """
+        for (column_id,) in self.connection.execute(
+                'SELECT id FROM keys WHERE id NOT IN (SELECT key_id FROM links)'
+                ).fetchall():
+            self.kill_column(column_id)
+
+    def remove_empty_rows(self):
+        """ Remove all rows without links | None -> None """
+        for (row_id,) in self.connection.execute(
+                'SELECT id FROM phrases WHERE id NOT IN (SELECT phrase_id FROM links)'
+                ).fetchall():
+            self.kill_row(row_id)
+
+    def rows_with_all(self, column_names):
+        """ Rows linked to every column | list(str) -> list(str)
+
+        Raises KeyError if a column doesn't exist.
+
+        Scans the phrases of the key with the fewest phrases and looks up
+        the other keys of each one in the primary key.
+        """
+        column_ids = {self.get_id('keys', name) for name in column_names}
+        column_ids = sorted(column_ids, key=self.count_links)
+        conditions = ''.join(' AND EXISTS (SELECT 1 FROM links AS other '
+                             'WHERE other.phrase_id = first.phrase_id '
+                             'AND other.key_id = ?)' for _ in column_ids[1:])
+        return self.query_names(
+            'SELECT phrases.name FROM links AS first '
+            'JOIN phrases ON phrases.id = first.phrase_id '
+            f'WHERE first.key_id = ?{conditions} '
+            'ORDER BY first.phrase_id', column_ids)
+
+    def count_rows_with_all(self, column_names):
+        """ Number of rows linked to every column | list(str) -> int
+
+        Raises KeyError if a column doesn't exist.
+        """
+        return len(self.rows_with_all(column_names))
+
+    def count_links(self, column_id):
+        """ Number of phrases linked to key, read from index | int -> int """
+        query = 'SELECT COUNT(*) FROM links WHERE key_id = ?'
+        return self.connection.execute(query, (column_id,)).fetchone()[0]
+
+    def columns_of_row(self, name):
+        """ Columns linked to row | str -> list(str), raises KeyError """
+        row_id = self.get_id('phrases', name)
+        return self.query_names(
+            'SELECT keys.name FROM links JOIN keys ON keys.id = links.key_id '
+            'WHERE links.phrase_id = ? ORDER BY links.key_id', (row_id,))
+
+    def rows_of_column(self, name):
+        """ Rows linked to column | str -> list(str), raises KeyError """
+        column_id = self.get_id('keys', name)
+        return self.query_names(
+            'SELECT phrases.name FROM links '
+            'JOIN phrases ON phrases.id = links.phrase_id '
+            'WHERE links.key_id = ? ORDER BY links.phrase_id', (column_id,))
+
+    def iter_rows(self):
+        """ Rows and their linked columns, read lazily in insertion order
+
+        None -> iterator(tuple(str, list(str)))
+        """
+        cursor = self.connection.execute(
+            'SELECT phrases.id, phrases.name, keys.name FROM phrases '
+            'LEFT JOIN links ON links.phrase_id = phrases.id '
+            'LEFT JOIN keys ON keys.id = links.key_id '
+            'ORDER BY phrases.id, links.key_id')
+        for (row_id, name), links in itertools.groupby(
+                cursor, key=lambda link: link[:2]):
+            yield name, [column for _, _, column in links if column is not None]
+
+    def to_frame(self):
+        """ Dense boolean DataFrame view of store | None -> pd.DataFrame
+
+        Only meant for display and tests, memory is rows x columns.
+        """
+        return self.to_link_store().to_frame()
+
+    def to_link_store(self):
+        """ Copy of store contents in memory | None -> LinkStore """
+        store = LinkStore()
+        column_ids = {}
+        for column_id, name in self.connection.execute(
+                'SELECT id, name FROM keys ORDER BY id'):
+            column_ids[column_id] = store.add_column(name)
+        row_ids = {}
+        for row_id, name in self.connection.execute(
+                'SELECT id, name FROM phrases ORDER BY id'):
+            row_ids[row_id] = store.add_row(name)
+        for row_id, column_id in self.connection.execute(
+                'SELECT phrase_id, key_id FROM links'):
+            store.link(row_ids[row_id], column_ids[column_id])
+        return store
+
+    def import_state(self, state):
+        """ Add contents saved by LinkStore.get_state to empty store | dict -> None
+
+        Used to convert a pickled database the first time SQLite is used.
+        """
+        self.connection.executemany('INSERT INTO keys (id, name) VALUES (?, ?)',
+                                    [(column_id, name) for column_id, name
+                                     in enumerate(state['columns'], start=1) if name])
+        self.connection.executemany('INSERT INTO phrases (id, name) VALUES (?, ?)',
+                                    [(row_id, name) for row_id, name
+                                     in enumerate(state['rows'], start=1) if name])
+        offsets = state['row_offsets']
+        row_ids = np.repeat(np.arange(1, len(state['rows']) + 1), np.diff(offsets))
+        self.connection.executemany(
+            'INSERT INTO links (phrase_id, key_id) VALUES (?, ?)',
+            zip(row_ids.tolist(), (state['row_links'] + 1).tolist()))
+        self.connection.commit()
+        self.recount()
@@ -0,0 +1,87 @@
+""" Implements the SuggestionCache class
+
+Deleting a character and typing it again asks the database for the
+completions of prefixes it has just completed. A SuggestionCache keeps the
+most recently used completions by database, field and normalized prefix,
+so prefixes differing only in case or accents share an entry when the
+index ignores them.
+
+Completions only depend on stored names, so every entry is valid until a
+name is added or removed. The store counts these changes (see
+Storage.Store.version). The cache is emptied the first time it is used
+with a new version, and never returns completions older than the names.
+
+Classes: SuggestionCache
+"""
+
+from collections import OrderedDict
+
+class SuggestionCache():
+    """ Bounded least recently used cache of completions
+
+    Args:
+        size (int): Most entries kept, least recently used dropped first
+
+    Attributes:
+        hits (int): Lookups answered from cache
+        misses (int): Lookups computed, including after a version change
+        invalidations (int): Times emptied by a version change
+
+    Methods:
+        get(tuple, int, function) -> object
+        clear()
+        get_stats() -> dict
+    """
+
+    SIZE = 256 #Default number of entries
+
+    def __init__(self, size=SIZE):
+        self.size = size
+        self.entries = OrderedDict() #Key -> completions, least recent first
+        self.version = None #Store version of entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, version, compute):
+        """ Cached completions of key, computed if missing or changed
+
+        tuple, int, function -> object
+
+        key is (database, field, normalized prefix). compute takes no
+        arguments and is only called on a miss.
+        """
+        if not version == self.version:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self.version = version
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        value = self.entries[key] = compute()
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """ Drop all entries and reset statistics | None -> None """
+        self.entries.clear()
+        self.hits = self.misses = self.invalidations = 0
+
+    def get_stats(self):
+        """ Hit rate and counts, for the debug menu | None -> dict """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'size': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
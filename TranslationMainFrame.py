@@ -254,6 +254,8 @@ class TranslationMainFrame(tk.Frame):
         if translation:
             self.master.clipboard_clear()
             self.master.clipboard_append(translation)
+            self.db.record_use(self.lang1.get_contents(),
+                               self.lang2.get_contents()) #For ranking
         
     def save_entry(self):
         """ Save active key/phrase combination to db | None -> None """
@@ -265,6 +267,7 @@ class TranslationMainFrame(tk.Frame):
         #Save combination
         self.db.prepare_undo()
         self.db.save_entry(lang1_key, lang2_key)
+        self.db.record_use(lang1_key, lang2_key) #For ranking
         print(self.db)
         #Clear widgets after save
         self.lang1.full_clear()
@@ -322,7 +325,7 @@ class TranslationMainFrame(tk.Frame):
         print(f'display_text = {self.key.get_contents()}')
         print(f'display_cursor = {self.key.get_cursor()}')
         print(f'suggestion_text = {self.key.suggestion_text}')
-        print(f'suggestion_list = {self.key.suggestion_list}')
+        print(f'suggestions = {self.key.suggestions}')
         
     def handle_lang1_key_release(self, event):
         """ Key release manager for key widget | tk.Event -> None """
@@ -368,11 +371,11 @@ class TranslationMainFrame(tk.Frame):
         print('Key variables:')
         print(f'Key - current_text: {self.key.current_text}')
         print(f'Key - current_text: {self.key.suggestion_text}')
-        print(f'Key - current_text: {self.key.suggestion_list}')
+        print(f'Key - current_text: {self.key.suggestions}')
         print(f'Key - current_text: {self.key.current_cursor}')
         print(f'Phrase - current_text: {self.phrase.current_text}')
         print(f'Phrase - current_text: {self.phrase.suggestion_text}')
-        print(f'Phrase - current_text: {self.phrase.suggestion_list}')
+        print(f'Phrase - current_text: {self.phrase.suggestions}')
         print(f'Phrase - current_text: {self.phrase.current_cursor}')
             
     def bind_event_handlers(self):
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+
+""" Compact word dictionaries for completing words inside phrases
+
+A word list such as language/mots.txt is built offline into a DAWG
+(directed acyclic word graph): a trie whose identical subtrees are merged,
+so words sharing an ending like '-issables' share its states. The graph is
+written as a flat array of 32 bit edges that is memory-mapped when opened.
+Opening a dictionary only reads its header, and the operating system loads
+pages of edges as completions walk them.
+
+Layout:
+    MAGIC (8 bytes)
+    root state, edge count, word count, 0 (4 bytes each, little-endian)
+    edges, 2 unsigned 32 bit integers each:
+        label: character code point, FINAL and LAST flags
+        target: first edge of the state reached, 0 if it has no edges
+
+A state is the run of edges from its first edge to the edge flagged LAST,
+sorted by character. FINAL marks an edge ending a word. Edge 0 is unused,
+so target 0 can mean no edges.
+
+Build from the console, for example:
+    python WordDictionary.py language/mots.txt language/mots.dawg
+
+Only the French dictionary is shipped. Another language gets word
+completion once a dictionary is built for it and set in its config
+language dict.
+
+Constants:
+    MAGIC
+    FINAL
+    LAST
+    CHARACTER
+    COMPLETIONS
+
+Classes:
+    WordDictionary
+
+Functions:
+    build(iterable(str)) -> tuple(array, int, int)
+    write(iterable(str), Path) -> int
+    get_dictionary(str) -> WordDictionary or None
+    main()
+"""
+
+import argparse
+import itertools
+import mmap
+import pathlib
+import sys
+import time
+from array import array
+import config
+from Indexes import shared_length
+from text_utilities import fold_accents
+
+MAGIC = b'KPDAWG01'
+FINAL = 1 << 31 #Edge ends a word
+LAST = 1 << 30 #Last edge of its state
+CHARACTER = (1 << 21) - 1 #Code point bits of label
+COMPLETIONS = 10 #Words returned by complete
+
+class Node():
+    """ State of the graph while building | None -> None """
+
+    __slots__ = ('final', 'edges')
+
+    def __init__(self):
+        self.final = False
+        self.edges = {} #Character -> Node, in sorted order
+
+    def signature(self):
+        """ Equal for states with equal subtrees once children merged | None -> tuple """
+        return (self.final,) + tuple((character, id(child))
+                                     for character, child in self.edges.items())
+
+def merge(unchecked, register, depth):
+    """ Merge states deeper than depth with equal registered states
+
+    list(tuple), dict, int -> None
+
+    States are merged bottom up once no more words can be added below them,
+    which happens when a sorted word stops sharing their prefix.
+    """
+    while len(unchecked) > depth:
+        parent, character, child = unchecked.pop()
+        signature = child.signature()
+        if signature in register:
+            parent.edges[character] = register[signature]
+        else:
+            register[signature] = child
+
+def build(words):
+    """ Minimal graph of words as an edge array | iterable(str) -> tuple(array, int, int)
+
+    Returns edges, root state and word count. Words are sorted, so the
+    graph is minimized as it grows (Daciuk et al. incremental algorithm)
+    and never holds the whole trie.
+    """
+    root = Node()
+    register = {}
+    unchecked = [] #Path of last word: (parent, character, child)
+    previous = ''
+    count = 0
+    for word in sorted(set(words)):
+        if not word:
+            continue
+        shared = shared_length(previous, word)
+        merge(unchecked, register, shared)
+        node = unchecked[-1][2] if unchecked else root
+        for character in word[shared:]:
+            child = Node()
+            node.edges[character] = child
+            unchecked.append((node, character, child))
+            node = child
+        node.final = True
+        previous = word
+        count += 1
+    merge(unchecked, register, 0)
+    edges = array('I', [0, 0])
+    offsets = {} #id(Node) -> first edge
+    def place(node):
+        if not node.edges:
+            return 0
+        if id(node) not in offsets:
+            targets = [place(child) for child in node.edges.values()]
+            offsets[id(node)] = len(edges) // 2
+            for number, (character, child) in enumerate(node.edges.items()):
+                label = ord(character)
+                if child.final:
+                    label |= FINAL
+                if number == len(targets) - 1:
+                    label |= LAST
+                edges.extend((label, targets[number]))
+        return offsets[id(node)]
+    return edges, place(root), count
+
+def write(words, filepath):
+    """ Build dictionary file from words | iterable(str), Path -> int
+
+    Returns number of words.
+    """
+    edges, root, count = build(words)
+    header = array('I', [root, len(edges) // 2, count, 0])
+    if sys.byteorder == 'big':
+        header.byteswap()
+        edges.byteswap()
+    with open(filepath, 'wb') as dictionary_file:
+        dictionary_file.write(MAGIC)
+        dictionary_file.write(header.tobytes())
+        dictionary_file.write(edges.tobytes())
+    return count
+
+class WordDictionary():
+    """ Word dictionary file opened for completion
+
+    Args:
+        filepath (Path): File written by write
+
+    Attributes:
+        root (int): First edge of root state
+        word_count (int): Number of words
+
+    Methods:
+        walk(str) -> tuple(int, bool) or None
+        walk_folded(str) -> list(tuple(int, bool, str))
+        iter_words(int, str) -> iterator(str)
+        complete(str, opt:int, opt:bool) -> list(str)
+    """
+
+    def __init__(self, filepath):
+        with open(filepath, 'rb') as dictionary_file:
+            if not dictionary_file.read(len(MAGIC)) == MAGIC:
+                raise ValueError(f'{filepath} is not a word dictionary file')
+            self.buffer = mmap.mmap(dictionary_file.fileno(), 0, access=mmap.ACCESS_READ)
+        values = memoryview(self.buffer)[len(MAGIC):].cast('I')
+        if sys.byteorder == 'big': #Copied, files are little-endian
+            values = array('I', values)
+            values.byteswap()
+        self.root, _, self.word_count, _ = values[:4]
+        self.edges = values[4:]
+
+    def __contains__(self, word):
+        found = self.walk(word) if word else None
+        return bool(found and found[1])
+
+    def walk(self, prefix):
+        """ State reached by prefix and if prefix is a word
+
+        str -> tuple(int, bool) or None
+
+        Returns None if no word starts with prefix.
+        """
+        edges = self.edges
+        state, final = self.root, False
+        for character in prefix:
+            code = ord(character)
+            edge = state
+            while edge: #Edges of state until LAST
+                label = edges[2*edge]
+                if label & CHARACTER == code:
+                    break
+                edge = 0 if label & LAST else edge + 1
+            if not edge:
+                return None
+            state, final = edges[2*edge+1], bool(label & FINAL)
+        return state, final
+
+    def walk_folded(self, prefix):
+        """ States reached by prefix ignoring accents
+
+        str -> list(tuple(int, bool, str))
+
+        Returns state, if it is a word and spelling in dictionary for each
+        spelling of prefix, in code point order. 'ete' reaches 'été'.
+        """
+        edges = self.edges
+        found = [(self.root, False, '')]
+        for character in fold_accents(prefix):
+            reached = []
+            for state, _, spelling in found:
+                edge = state
+                while edge: #Edges of state until LAST
+                    label = edges[2*edge]
+                    other = chr(label & CHARACTER)
+                    if other == character or fold_accents(other) == character:
+                        reached.append((edges[2*edge+1], bool(label & FINAL),
+                                        spelling + other))
+                    edge = 0 if label & LAST else edge + 1
+            found = reached
+        return found
+
+    def iter_words(self, state, prefix):
+        """ Words after state, in code point order, lazily | int, str -> iterator(str) """
+        edges = self.edges
+        edge = state
+        while edge:
+            label = edges[2*edge]
+            word = prefix + chr(label & CHARACTER)
+            if label & FINAL:
+                yield word
+            yield from self.iter_words(edges[2*edge+1], word)
+            edge = 0 if label & LAST else edge + 1
+
+    def complete(self, prefix, limit=COMPLETIONS, fold=False):
+        """ First words starting with prefix | str, opt:int, opt:bool -> list(str)
+
+        prefix itself is included if it is a word. If fold, accents are
+        ignored and words are given as spelled in dictionary.
+        """
+        if fold:
+            heads = self.walk_folded(prefix)
+        else:
+            found = self.walk(prefix)
+            heads = [found + (prefix,)] if found else []
+        #Spellings of prefix are sorted, so are their words one after another
+        words = itertools.chain.from_iterable(
+            itertools.chain([spelling] if final else [], self.iter_words(state, spelling))
+            for state, final, spelling in heads)
+        return list(itertools.islice(words, limit))
+
+#Open dictionaries by supported language, None if a language has none
+dictionaries = {}
+
+def get_dictionary(language):
+    """ Word dictionary of language, opened once | str -> WordDictionary or None
+
+    language is a supported language or a language of a db pair, like
+    'anglais'. Dictionaries are set in config language dicts and built
+    with main.
+    """
+    language = config.get_supported_language(language)
+    if language not in dictionaries:
+        filepath = config.LANGUAGE_DICT.get(language, {}).get('dictionary')
+        if filepath and pathlib.Path(filepath).exists():
+            dictionaries[language] = WordDictionary(filepath)
+        else:
+            dictionaries[language] = None
+    return dictionaries[language]
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build word dictionary file from word list')
+    parser.add_argument('words', type=pathlib.Path, help='Word list, one per line')
+    parser.add_argument('output', type=pathlib.Path)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    with open(args.words, 'r', encoding='utf-8') as word_file:
+        count = write((line.strip() for line in word_file), args.output)
+    print(f'Wrote {count} words to {args.output} ({args.output.stat().st_size} bytes) '
+          f'in {time.perf_counter() - start:.1f} s')
+
+if __name__ == '__main__':
+    main()
@@ -8,11 +8,11 @@ database states that are deleted at session end.
 """
 
 import atexit
-import shutil
 import json
 from pathlib import Path
 from datetime import date
 import config
+from Journal import Journal
 
 DEFAULT_DATES = {
     'day': None, #Time of last daily backup (1 day)
@@ -82,61 +82,51 @@ def new_year():
         return True
     return False
 
+def copy_database(period):
+    """ Copy database file and its journal to backup for period | str -> None """
+    backup_filepath = config.get_backup_path() / (
+        config.get_db_name() + '_' + period + config.get_db_extension())
+    print(f'saving {backup_filepath}')
+    Journal.copy_files(config.get_full_db_path(), backup_filepath)
+
 def daily_backup():
     """ Performs daily backup | None -> None """
     print('daily backup in progress')
-    db_filepath = config.get_full_db_path()
-    backup_path = config.get_backup_path()
-    db_name = config.get_db_name()
-    backup_filepath = backup_path / (db_name + '_daily.pickle')
-    print(f'saving {backup_filepath}')
-    shutil.copy(db_filepath, backup_filepath)
+    copy_database('daily')
     backup_date_dict['day'] = date.today()
     save_backup_dates()
 
 def weekly_backup():
     """ Performs weekly backup | None -> None """
     print('weekly backup in progress')
-    db_filepath = config.get_full_db_path()
-    backup_path = config.get_backup_path()
-    db_name = config.get_db_name()
-    backup_filepath = backup_path / (db_name + '_weekly.pickle')
-    print(f'saving {backup_filepath}')
-    shutil.copy(db_filepath, backup_filepath)
+    copy_database('weekly')
     backup_date_dict['week'] = date.today()
     save_backup_dates()
     
 def monthly_backup():
     """ Performs monthly backup | None -> None """
     print('monthly backup in progress')
-    db_filepath = config.get_full_db_path()
-    backup_path = config.get_backup_path()
-    db_name = config.get_db_name()
-    backup_filepath = backup_path / (db_name + '_monthly.pickle')
-    print(f'saving {backup_filepath}')
-    shutil.copy(db_filepath, backup_filepath)
+    copy_database('monthly')
     backup_date_dict['month'] = date.today()
     save_backup_dates()
     
 def yearly_backup():
     """ Performs yearly backup | None -> None """
     print('yearly backup in progress')
-    db_filepath = config.get_full_db_path()
-    backup_path = config.get_backup_path()
-    db_name = config.get_db_name()
-    backup_filepath = backup_path / (db_name + '_yearly.pickle')
-    print(f'saving {backup_filepath}')
-    shutil.copy(db_filepath, backup_filepath)
+    copy_database('yearly')
     backup_date_dict['year'] = date.today()
     save_backup_dates()
     
 def backup():
-    """ Performs all backups if needed | None -> None """
-    if new_day():
-        daily_backup()
-    if new_week():
-        weekly_backup()
-    if new_month():
-        monthly_backup()
-    if new_year():
-        yearly_backup()
+    """ Performs all backups if needed | None -> None
+
+    The active database is checkpointed first, so the copies include
+    changes still in its journal or waiting to be saved.
+    """
+    due = [backup_function for is_due, backup_function in [
+        (new_day, daily_backup), (new_week, weekly_backup),
+        (new_month, monthly_backup), (new_year, yearly_backup)] if is_due()]
+    if due and config.active_objects['db']:
+        config.active_objects['db'].checkpoint()
+    for backup_function in due:
+        backup_function()
@@ -0,0 +1,90 @@
+""" Database build benchmark
+
+Times building databases of increasing size with the same random entries
+as generate_test_db. If inserting a new key or phrase is amortized O(1),
+the time per entry stays flat as the database grows. The benchmark fails
+if it grows more than MAX_GROWTH times from the smallest to the largest size.
+
+Usage: python benchmark.py [--sizes 25000 50000 100000] [--storage pickle]
+                           [--max-growth 2]
+"""
+
+import argparse
+import contextlib
+import io
+import pathlib
+import random
+import sys
+import tempfile
+import time
+import config
+from Databases import Database, StandardDatabase
+
+MAX_GROWTH = 2.0 #Most time per entry may grow over all sizes if linear
+
+def generate_entries(word_list, size):
+    """ Random key lists and phrases | list(str), int -> list(tuple) """
+    return [(Database.generate_key_list(word_list),
+             Database.generate_phrase(word_list)) for i in range(size)]
+
+def time_build(entries, folder):
+    """ Seconds taken to save entries in a new database | list, Path -> float """
+    class BenchmarkDatabase(StandardDatabase):
+        def get_filepath(self):
+            return folder / ('benchmark' + config.get_db_extension())
+    with contextlib.redirect_stdout(io.StringIO()): #save_entry prints
+        test_db = BenchmarkDatabase()
+        start = time.perf_counter()
+        for key_list, phrase in entries:
+            test_db.save_entry(key_list, phrase)
+        elapsed = time.perf_counter() - start
+        test_db.flush()
+        if test_db.journal:
+            test_db.journal.wait()
+        test_db.store.close()
+    return elapsed
+
+@contextlib.contextmanager
+def scratch_config(storage, folder):
+    """ Set storage format and database folder while benchmarking | str, Path -> None
+
+    config is saved at exit, so the user's settings are restored after.
+    """
+    saved = {key: config.config_dict[key] for key in ['storage', 'db_path']}
+    config.set_storage(storage)
+    config.config_dict['db_path'] = str(folder)
+    try:
+        yield
+    finally:
+        config.config_dict.update(saved)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        default=[12500, 25000, 50000, 100000])
+    parser.add_argument('--storage', default=config.get_storage(),
+                        choices=list(config.STORAGE_EXTENSIONS))
+    parser.add_argument('--max-growth', type=float, default=MAX_GROWTH)
+    args = parser.parse_args()
+    random.seed(0)
+    with open('language/mots.txt', 'r') as f:
+        word_list = f.read().splitlines()
+    print(f'{"entries":>8} {"seconds":>8} {"us/entry":>9}')
+    per_entry = []
+    for size in args.sizes:
+        entries = generate_entries(word_list, size)
+        with tempfile.TemporaryDirectory() as folder:
+            with scratch_config(args.storage, folder):
+                elapsed = time_build(entries, pathlib.Path(folder))
+        per_entry.append(elapsed / size)
+        print(f'{size:>8} {elapsed:>8.2f} {per_entry[-1] * 1e6:>9.1f}')
+    #Linear build: time per entry grows much slower than size
+    growth = per_entry[-1] / per_entry[0]
+    print(f'Time per entry grew {growth:.2f}x '
+          f'while size grew {args.sizes[-1] / args.sizes[0]:.0f}x')
+    if growth > args.max_growth:
+        sys.exit(f'FAILED: time per entry grew more than {args.max_growth:g}x, '
+                 f'build is not linear')
+
+if __name__ == '__main__':
+    main()
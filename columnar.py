@@ -0,0 +1,109 @@
+""" Columnar database file format
+
+A columnar file holds the state of a LinkStore as flat numpy arrays that
+are opened with np.memmap. Opening a file only reads its header, and the
+operating system loads pages of the arrays as queries touch them.
+
+Layout:
+    MAGIC (8 bytes)
+    header length (8 bytes, little-endian)
+    header (JSON): generation and dtype, offset and length of each array
+    arrays, each starting on a 64 byte boundary
+
+Arrays, for rows (phrases) and columns (keys):
+    row_blob, column_blob: UTF-8 names one after the other
+    row_name_offsets, column_name_offsets: name i is blob[offsets[i]:offsets[i+1]]
+    row_order, column_order: ids sorted by name, for binary search
+    row_removed, column_removed: ids of removed names, saved empty so
+        that later ids stay valid
+    row_link_offsets, row_links: column ids of each row (CSR)
+    column_link_offsets, column_links: row ids of each column (CSC)
+
+The file is never modified in place. Changes go to a journal and a
+checkpoint writes a new file (see Journal.py).
+
+Functions:
+    write(dict, Path)
+    read(Path) -> dict
+"""
+
+import json
+import numpy as np
+
+MAGIC = b'KPCOLS01'
+ALIGNMENT = 64
+
+def encode_names(names):
+    """ Pack names into a blob, offsets and sorted order | list(str) -> tuple
+
+    Removed names (None) are packed empty.
+    """
+    encoded = [name.encode('utf-8') if name is not None else b'' for name in names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(name) for name in encoded], out=offsets[1:])
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    order = np.array(sorted(range(len(encoded)), key=encoded.__getitem__),
+                     dtype=np.int64)
+    return blob, offsets, order
+
+def transpose_links(row_offsets, row_links, column_count):
+    """ Convert CSR row links to CSC column links | array, array, int -> tuple """
+    row_ids = np.repeat(np.arange(len(row_offsets) - 1), np.diff(row_offsets))
+    order = np.argsort(row_links, kind='stable') #Keeps row ids sorted
+    column_links = row_ids[order]
+    column_offsets = np.zeros(column_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(row_links, minlength=column_count), out=column_offsets[1:])
+    return column_offsets, column_links
+
+def write(state, filepath):
+    """ Write state saved by LinkStore.get_state to file | dict, Path -> None """
+    arrays = {}
+    (arrays['row_blob'], arrays['row_name_offsets'],
+     arrays['row_order']) = encode_names(state['rows'])
+    (arrays['column_blob'], arrays['column_name_offsets'],
+     arrays['column_order']) = encode_names(state['columns'])
+    for axis in ['row', 'column']:
+        arrays[axis + '_removed'] = np.array(
+            [name_id for name_id, name in enumerate(state[axis + 's']) if name is None],
+            dtype=np.int64)
+    arrays['row_link_offsets'] = state['row_offsets'].astype(np.int64)
+    arrays['row_links'] = state['row_links'].astype(np.int64)
+    (arrays['column_link_offsets'],
+     arrays['column_links']) = transpose_links(arrays['row_link_offsets'],
+                                               arrays['row_links'],
+                                               len(state['columns']))
+    header = {'generation':state.get('generation', 0), 'arrays':{}}
+    position = 0
+    for name, values in arrays.items():
+        header['arrays'][name] = [values.dtype.str, position, len(values)]
+        position += -(-values.nbytes // ALIGNMENT) * ALIGNMENT
+    header_bytes = json.dumps(header).encode('utf-8')
+    start = -(-(len(MAGIC) + 8 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+    with open(filepath, 'wb') as columnar_file:
+        columnar_file.write(MAGIC)
+        columnar_file.write(len(header_bytes).to_bytes(8, 'little'))
+        columnar_file.write(header_bytes)
+        for name, values in arrays.items():
+            columnar_file.seek(start + header['arrays'][name][1])
+            columnar_file.write(values.tobytes())
+        columnar_file.truncate(start + position)
+
+def read(filepath):
+    """ Open arrays of columnar file without loading them | Path -> dict
+
+    Returns the generation and one np.memmap per array.
+    """
+    with open(filepath, 'rb') as columnar_file:
+        if not columnar_file.read(len(MAGIC)) == MAGIC:
+            raise ValueError(f'{filepath} is not a columnar database file')
+        header_length = int.from_bytes(columnar_file.read(8), 'little')
+        header = json.loads(columnar_file.read(header_length))
+    start = -(-(len(MAGIC) + 8 + header_length) // ALIGNMENT) * ALIGNMENT
+    result = {'generation':header['generation']}
+    for name, (dtype, offset, length) in header['arrays'].items():
+        if length: #np.memmap can't map zero bytes
+            result[name] = np.memmap(filepath, dtype=np.dtype(dtype), mode='r',
+                                     offset=start + offset, shape=(length,))
+        else:
+            result[name] = np.empty(0, dtype=np.dtype(dtype))
+    return result
@@ -6,9 +6,11 @@ Stores and manages variables related to user configuration.
 
 Constants:
     DEFAULT_CONFIG
+    STORAGE_EXTENSIONS
     FRENCH_DICT
     ENGLISH_DICT
     LANGUAGE_DICT
+    LANGUAGE_NAMES
 
 Variables:
     active_objects
@@ -26,6 +28,13 @@ Functions:
     hide_buttons()
     get_config()
     get_languages()
+    get_supported_language(str)
+    get_storage()
+    set_storage(str)
+    get_db_extension()
+    get_journal()
+    get_fold_accents()
+    set_fold_accents(bool)
 """
 
 import atexit
@@ -35,6 +44,7 @@ import json
 from json.decoder import JSONDecodeError
 from tkinter import filedialog
 import utilities
+from text_utilities import fold_accents
 
 #Default configuration on first execution or config reset
 DEFAULT_CONFIG = {
@@ -45,6 +55,9 @@ DEFAULT_CONFIG = {
     'language':'Français', #Current app interface language
     'mode':'put', #'get' entry from db or 'put' entry in db
     'db':'def', #Database implementation to use - only for testing
+    'storage':'pickle', #Database storage format ('pickle', 'sqlite' or 'columnar')
+    'journal':True, #Append changes to a journal instead of rewriting pickle
+    'fold_accents':False, #Find keys, phrases and words typed without accents
     'db_path':None, #Database save path
     'backup_path':None, #Database backup path
     'session_path':None, #Session save path
@@ -55,6 +68,13 @@ DEFAULT_CONFIG = {
     'debug':False #Print debug information - only for testing
 }
 
+#Database file extension for each storage format
+STORAGE_EXTENSIONS = {
+    'pickle':'.pickle', #Whole database rewritten on each save
+    'sqlite':'.sqlite', #Only changed rows written on each save
+    'columnar':'.columnar' #Memory-mapped on open, changes journaled
+}
+
 #Word equivalents in each supported language
 FRENCH_DICT = {
     'key':'Clé',
@@ -71,7 +91,14 @@ FRENCH_DICT = {
     'display':'Affichage',
     'title':'Phrase/Clé',
     'tutorial':'language/tutorial_FR.txt',
-    'db':'Base de donnée'
+    'db':'Base de donnée',
+    'import':'Importer...',
+    'export':'Exporter...',
+    'search':'Rechercher des mots...',
+    'search_text':'Rechercher du texte...',
+    'ignore_accents':'Ignorer les accents',
+    'match_accents':'Respecter les accents',
+    'dictionary':'language/mots.dawg' #Built from mots.txt by WordDictionary.py
 }
 ENGLISH_DICT = {
     'key':'Key',
@@ -88,13 +115,26 @@ ENGLISH_DICT = {
     'display':'Display',
     'title':'Key/Phrase',
     'tutorial':'language/tutorial_EN.txt',
-    'db':'Database'
+    'db':'Database',
+    'import':'Import...',
+    'export':'Export...',
+    'search':'Search words...',
+    'search_text':'Search text...',
+    'ignore_accents':'Ignore accents',
+    'match_accents':'Match accents'
 }
 #Supported languages
 LANGUAGE_DICT = {
     'Français':FRENCH_DICT,
     'English':ENGLISH_DICT
 }
+#Supported language of each language name in db pairs, lowercase without accents
+LANGUAGE_NAMES = {
+    'francais':'Français',
+    'french':'Français',
+    'anglais':'English',
+    'english':'English'
+}
 
 #Holds references to common-use objects while app is active
 active_objects = { 
@@ -106,7 +146,8 @@ def load_config():
     """ Loads config from disk or return default setting | None -> dict """
     try:
         with open('config/config.json', 'r') as config_file:
-            config_dict = json.load(config_file)
+            #Settings added since config was saved get their default value
+            config_dict = {**DEFAULT_CONFIG, **json.load(config_file)}
             print('Loading saved configuration:', config_dict)
     except Exception: #ValueError, FileNotFoundError
         print('Config not found, loading default:', DEFAULT_CONFIG)
@@ -155,6 +196,30 @@ def set_db_type(setting):
     """ Set db type ('standard' or 'translation') | str -> None """
     config_dict['db_type'] = setting
     
+def get_storage():
+    """ Get database storage format from config_dict | None -> str """
+    return config_dict['storage']
+
+def set_storage(storage):
+    """ Set database storage format ('pickle', 'sqlite' or 'columnar') | str -> None """
+    config_dict['storage'] = storage
+
+def get_db_extension():
+    """ Get database file extension for storage format | None -> str """
+    return STORAGE_EXTENSIONS[get_storage()]
+
+def get_journal():
+    """ Get journal mode bool for pickle storage | None -> bool """
+    return config_dict['journal']
+
+def get_fold_accents():
+    """ Get accent folding bool for key and phrase lookups | None -> bool """
+    return config_dict['fold_accents']
+
+def set_fold_accents(setting):
+    """ Set accent folding for key and phrase lookups | bool -> None """
+    config_dict['fold_accents'] = setting
+
 def get_lang1():
     """ Get language 1 from active language pair | None -> bool """
     return config_dict['language_pair'][0]
@@ -232,6 +297,13 @@ def get_languages():
     """ Alphabetical list of supported languages | None -> list(str) """
     return sorted([key for key in LANGUAGE_DICT])
 
+def get_supported_language(name):
+    """ Supported language named in a db pair, None if not | str -> str
+
+    Pair names come from db file stems, like 'français' or 'anglais'.
+    """
+    return LANGUAGE_NAMES.get(fold_accents(name).lower())
+
 def set_db_path(path=None):
     """ Set db save folder, creating if necessary | optional:Path -> None """
     db_path = utilities.create_db_dir(path)
@@ -263,7 +335,7 @@ def get_full_db_path():
     """ Returns full path to db including filename | None -> str """
     folder = get_db_path()
     db_name = get_db_name()
-    file_name = db_name + '.pickle'
+    file_name = db_name + get_db_extension()
     return folder / file_name
 
 def first_upper(string, sep = '_'):
@@ -282,7 +354,8 @@ def get_db_labels():
     """ Returns list of all database labels | None -> list(str) """
     standard_label = get_standard_label()
     db_path = get_db_path()    
-    db_names = [db.stem for db in db_path.iterdir() if db.suffix == '.pickle']
+    extension = get_db_extension()
+    db_names = [db.stem for db in db_path.iterdir() if db.suffix == extension]
     db_labels = [to_label(name) for name in db_names if not name == 'standard']
     db_labels = [standard_label] + db_labels
     return db_labels
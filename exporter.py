@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+
+""" Bulk export of entries to CSV, TSV, JSONL and Parquet files
+
+Entries are read lazily from the database storage and written in chunks,
+so memory use doesn't depend on database size. Files use the formats read
+by importer.py, with a header row, so an export can be imported into
+another database. Parquet files hold the same columns, with keys stored as
+a list of strings. Parquet export needs pyarrow, which is optional.
+
+Run from the console to export the active database, or another database
+with --standard or --languages:
+    python exporter.py glossary.parquet --languages Français English
+
+Constants:
+    CHUNK_SIZE
+
+Functions:
+    get_header(Database) -> list(str)
+    to_row(Database, tuple) -> list
+    iter_chunks(Database, opt:int) -> iterator(list)
+    write_csv(Database, Path, iterator(list), opt:str) -> iterator(int)
+    write_jsonl(Database, Path, iterator(list)) -> iterator(int)
+    write_parquet(Database, Path, iterator(list)) -> iterator(int)
+    print_progress(int, float)
+    export_file(Database, Path, opt:int, opt:function) -> int
+    export_dialog()
+    main()
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import pathlib
+import time
+from tkinter import filedialog
+import config
+from Databases import TranslationDatabase
+import importer
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError: #Parquet export is optional
+    pyarrow = None
+
+CHUNK_SIZE = 10000 #Entries written together
+
+def get_header(db):
+    """ Column names of exported rows | Database -> list(str) """
+    return importer.HEADERS[isinstance(db, TranslationDatabase)]
+
+def to_row(db, entry):
+    """ Convert save_entries argument to file row | Database, tuple -> list """
+    if isinstance(db, TranslationDatabase):
+        return list(entry)
+    key_list, phrase = entry
+    return [list(key_list), phrase]
+
+def iter_chunks(db, chunk_size=CHUNK_SIZE):
+    """ Read rows of db lazily in chunks | Database, opt:int -> iterator(list) """
+    rows = (to_row(db, entry) for entry in db.iter_entries())
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def write_csv(db, filepath, chunks, delimiter=','):
+    """ Write chunks to CSV file, yielding rows written after each chunk
+
+    Database, Path, iterator(list), opt:str -> iterator(int)
+    """
+    standard = not isinstance(db, TranslationDatabase)
+    total = 0
+    with open(filepath, 'w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.writer(csv_file, delimiter=delimiter)
+        writer.writerow(get_header(db))
+        for chunk in chunks:
+            if standard: #Keys separated by spaces as in the key box
+                chunk = [[' '.join(key_list), phrase] for key_list, phrase in chunk]
+            writer.writerows(chunk)
+            total += len(chunk)
+            yield total
+
+def write_jsonl(db, filepath, chunks):
+    """ Write chunks to JSONL file, yielding rows written after each chunk
+
+    Database, Path, iterator(list) -> iterator(int)
+    """
+    header = get_header(db)
+    total = 0
+    with open(filepath, 'w', encoding='utf-8') as jsonl_file:
+        for chunk in chunks:
+            jsonl_file.writelines(json.dumps(dict(zip(header, row)),
+                                             ensure_ascii=False) + '\n'
+                                  for row in chunk)
+            total += len(chunk)
+            yield total
+
+def write_parquet(db, filepath, chunks):
+    """ Write chunks to Parquet file, one row group per chunk
+
+    Database, Path, iterator(list) -> iterator(int)
+
+    Raises ImportError if pyarrow isn't installed.
+    """
+    if pyarrow is None:
+        raise ImportError('Parquet export requires pyarrow')
+    header = get_header(db)
+    key_type = pyarrow.string()
+    if not isinstance(db, TranslationDatabase):
+        key_type = pyarrow.list_(key_type)
+    schema = pyarrow.schema([(header[0], key_type), (header[1], pyarrow.string())])
+    total = 0
+    with pyarrow.parquet.ParquetWriter(filepath, schema) as writer:
+        for chunk in chunks:
+            columns = [[row[0] for row in chunk], [row[1] for row in chunk]]
+            writer.write_table(pyarrow.table(columns, schema=schema))
+            total += len(chunk)
+            yield total
+
+def print_progress(total, seconds):
+    """ Print rows exported so far and throughput | int, float -> None """
+    print(f'Exported {total} rows in {seconds:.1f} s '
+          f'({total / max(seconds, 1e-9):.0f} rows/s)')
+
+def export_file(db, filepath, chunk_size=CHUNK_SIZE, progress=print_progress):
+    """ Write all entries of db to file in chunks | Database, Path -> int
+
+    The format is chosen from the file extension. Calls progress with rows
+    written and elapsed seconds after each chunk. Returns number of rows
+    written.
+
+    Raises ValueError if file extension isn't supported.
+    """
+    filepath = pathlib.Path(filepath)
+    suffix = filepath.suffix.lower()
+    chunks = iter_chunks(db, chunk_size)
+    if suffix == '.jsonl':
+        written = write_jsonl(db, filepath, chunks)
+    elif suffix == '.parquet':
+        written = write_parquet(db, filepath, chunks)
+    elif suffix in ['.csv', '.tsv']:
+        written = write_csv(db, filepath, chunks, '\t' if suffix == '.tsv' else ',')
+    else:
+        raise ValueError(f'Unsupported file type: {filepath.name}')
+    start = time.perf_counter()
+    total = 0
+    for total in written:
+        progress(total, time.perf_counter() - start)
+    return total
+
+def export_dialog():
+    """ Ask for file and export active database to it | None -> None """
+    filetypes = [('CSV', '*.csv'), ('TSV', '*.tsv'), ('JSONL', '*.jsonl')]
+    if pyarrow is not None:
+        filetypes.append(('Parquet', '*.parquet'))
+    filepath = filedialog.asksaveasfilename(defaultextension='.csv',
+                                            filetypes=filetypes)
+    if filepath:
+        export_file(config.active_objects['db'], filepath)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Export entries to CSV, TSV, JSONL or Parquet file')
+    parser.add_argument('file', type=pathlib.Path)
+    database = parser.add_mutually_exclusive_group()
+    database.add_argument('--standard', action='store_true',
+                          help='Export standard database')
+    database.add_argument('--languages', nargs=2, metavar=('LANG1', 'LANG2'),
+                          help='Export translation database')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    db = importer.open_database(args)
+    print(f'Exporting {args.file}')
+    export_file(db, args.file, args.chunk_size)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+
+""" Bulk import of entries from CSV, TSV and JSONL files
+
+Files are read one row at a time and saved in batches, so memory use
+doesn't depend on file size. Progress and throughput are printed after
+each batch. An import can't be undone: tracking it for undo would hold
+every change in memory, so undo history is cleared.
+
+File formats, one entry per row:
+    Standard database:
+        CSV/TSV: keys, phrase - keys separated by spaces as in the key box
+        JSONL: {"keys": ["key", ...] or "key key", "phrase": "..."}
+    Translation database:
+        CSV/TSV: language 1 key, language 2 key
+        JSONL: {"lang1": "...", "lang2": "..."}
+A first CSV/TSV row holding these column names is skipped as a header.
+Rows with an empty field are skipped and counted. Saving them would delete
+the phrase (see save_entries), and an import never deletes entries.
+
+Run from the console to import into the active database, or in another
+database with --standard or --languages:
+    python importer.py glossary.tsv --languages Français English
+
+Constants:
+    BATCH_SIZE
+    HEADERS
+
+Functions:
+    read_rows(Path) -> iterator(list)
+    to_entry(Database, list or dict) -> tuple
+    read_entries(Database, Path) -> iterator(tuple)
+    print_progress(int, float)
+    import_file(Database, Path, opt:int, opt:function) -> int
+    import_dialog()
+    open_database(argparse.Namespace) -> Database
+    main()
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import pathlib
+import time
+from tkinter import filedialog
+import config
+from Databases import StandardDatabase, TranslationDatabase
+
+BATCH_SIZE = 10000 #Entries saved together
+
+#Column names skipped on first row of CSV/TSV files
+HEADERS = [
+    ['keys', 'phrase'],
+    ['lang1', 'lang2']
+]
+
+def read_rows(filepath):
+    """ Read rows of CSV, TSV or JSONL file lazily | Path -> iterator(list or dict)
+
+    Raises ValueError if file extension isn't supported.
+    """
+    suffix = filepath.suffix.lower()
+    if suffix == '.jsonl':
+        with open(filepath, 'r', encoding='utf-8') as jsonl_file:
+            for line in jsonl_file:
+                if line.strip():
+                    yield json.loads(line)
+    elif suffix in ['.csv', '.tsv']:
+        delimiter = '\t' if suffix == '.tsv' else ','
+        with open(filepath, 'r', encoding='utf-8-sig', newline='') as csv_file:
+            for number, row in enumerate(csv.reader(csv_file, delimiter=delimiter)):
+                if number == 0 and [field.strip().lower() for field in row] in HEADERS:
+                    continue
+                if row:
+                    yield row
+    else:
+        raise ValueError(f'Unsupported file type: {filepath.name}')
+
+def to_entry(db, row):
+    """ Convert file row to save_entries argument | Database, list or dict -> tuple """
+    if isinstance(db, TranslationDatabase):
+        if isinstance(row, dict):
+            return row.get('lang1', ''), row.get('lang2', '')
+        return tuple((row + ['', ''])[:2])
+    if isinstance(row, dict):
+        keys = row.get('keys', [])
+        phrase = row.get('phrase', '')
+    else:
+        keys, phrase = (row + ['', ''])[:2]
+    if isinstance(keys, str):
+        keys = [key for key in keys.split(' ') if not key == '']
+    return keys, phrase
+
+def read_entries(db, filepath):
+    """ Read entries for db from file lazily | Database, Path -> iterator(tuple) """
+    return (to_entry(db, row) for row in read_rows(filepath))
+
+def print_progress(total, seconds):
+    """ Print rows imported so far and throughput | int, float -> None """
+    print(f'Imported {total} rows in {seconds:.1f} s '
+          f'({total / max(seconds, 1e-9):.0f} rows/s)')
+
+def import_file(db, filepath, batch_size=BATCH_SIZE, progress=print_progress):
+    """ Save all entries of file to db in batches | Database, Path -> int
+
+    Calls progress with rows read and elapsed seconds after each batch.
+    Prints number of rows skipped for an empty field, if any.
+    Returns number of rows read.
+    """
+    db.clear_undo()
+    entries = read_entries(db, pathlib.Path(filepath))
+    start = time.perf_counter()
+    total = 0
+    skipped = 0
+    while True:
+        batch = list(itertools.islice(entries, batch_size))
+        if not batch:
+            break
+        complete = [entry for entry in batch if all(entry)] #Keys or phrase missing
+        skipped += len(batch) - len(complete)
+        db.save_entries(complete, undo=False)
+        if db.journal: #Journal records are held in memory until written
+            db.flush(wait=False) #Written while next batch is read
+        total += len(batch)
+        progress(total, time.perf_counter() - start)
+    db.flush()
+    if skipped:
+        print(f'Skipped {skipped} rows with an empty field')
+    return total
+
+def import_dialog():
+    """ Ask for file and import it into active database | None -> None """
+    filepath = filedialog.askopenfilename(
+        filetypes=[('CSV, TSV, JSONL', '*.csv *.tsv *.jsonl')])
+    if filepath:
+        import_file(config.active_objects['db'], filepath)
+
+def open_database(args):
+    """ Open database chosen on command line | argparse.Namespace -> Database """
+    if args.standard:
+        return StandardDatabase()
+    if args.languages:
+        return TranslationDatabase(*args.languages)
+    if config.get_db_type() == 'standard':
+        return StandardDatabase()
+    return TranslationDatabase(config.get_lang1(), config.get_lang2())
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Import entries from CSV, TSV or JSONL files')
+    parser.add_argument('files', nargs='+', type=pathlib.Path)
+    database = parser.add_mutually_exclusive_group()
+    database.add_argument('--standard', action='store_true',
+                          help='Import into standard database')
+    database.add_argument('--languages', nargs=2, metavar=('LANG1', 'LANG2'),
+                          help='Import into translation database')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    db = open_database(args)
+    for filepath in args.files:
+        print(f'Importing {filepath}')
+        import_file(db, filepath, args.batch_size)
+    db.checkpoint()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+
+""" Synthetic databases for scale testing
+
+Database.generate_test_db saves random entries one at a time, which is too
+slow past a few thousand entries. This module builds a whole database
+state with numpy in a few vectorized passes and writes it straight to the
+storage file, without going through a Database.
+
+Words are drawn from a Zipfian distribution, like words in real text: the
+word of rank r is drawn with probability proportional to 1 / r ** exponent.
+Ranks are given to words in a random order, so frequent words aren't all
+at the start of the alphabet. The same seed always gives the same database.
+
+Databases, sized by number of links:
+    standard: entries of 1 to 3 keys and a phrase of 8 to 30 words
+    translation: one language 1 word and one language 2 word per link
+Duplicate phrases and repeated keys of a standard entry are dropped, so
+a standard database can end up with slightly fewer links than asked for.
+
+Run from the console, for example:
+    python synthetic.py 10000000 --storage columnar --seed 1
+    python synthetic.py 1000000 --languages Français English --exponent 1.2
+
+Constants:
+    EXPONENT
+    CHUNK_SIZE
+
+Functions:
+    load_words(str) -> np.ndarray
+    sample_zipf(np.random.Generator, int, int, float) -> np.ndarray
+    renumber(np.ndarray) -> tuple(np.ndarray, np.ndarray)
+    join_words(np.ndarray, np.ndarray, np.ndarray) -> list(str)
+    make_state(np.ndarray, np.ndarray, list(str), list(str)) -> dict
+    generate_standard(np.ndarray, int, opt:int, opt:float) -> dict
+    generate_translation(np.ndarray, np.ndarray, int, opt:int, opt:float) -> dict
+    write_database(dict, Path, str)
+    main()
+"""
+
+import argparse
+import pathlib
+import time
+import numpy as np
+import pandas as pd
+import config
+import columnar
+from Storage import SQLiteStore
+from Journal import Journal
+
+EXPONENT = 1.0 #Zipf exponent, about 1 for natural language
+CHUNK_SIZE = 100000 #Phrases joined together, bounds temporary memory
+
+def load_words(language):
+    """ Read word list, 'fr' or 'en' as in generate_test_db | str -> np.ndarray """
+    filepath = 'language/mots.txt' if language == 'fr' else '/usr/share/dict/words'
+    with open(filepath, 'r', encoding='utf-8') as word_file:
+        words = word_file.read().split()
+    return np.array(words, dtype=object)
+
+def sample_zipf(rng, count, size, exponent=EXPONENT):
+    """ Draw word ranks from a Zipfian distribution
+
+    np.random.Generator, int, int, opt:float -> np.ndarray
+
+    Returns size ranks between 0 and count - 1, rank 0 being most frequent.
+    """
+    weights = np.arange(1, count + 1, dtype=np.float64) ** -exponent
+    cumulative = np.cumsum(weights)
+    cumulative /= cumulative[-1]
+    ranks = np.searchsorted(cumulative, rng.random(size), side='right')
+    return np.minimum(ranks, count - 1) #Rounding of last cumulative weight
+
+def renumber(ids):
+    """ Number ids densely in order of first appearance
+
+    np.ndarray -> tuple(np.ndarray, np.ndarray)
+
+    Returns the new id of each id and the original ids in new id order.
+    """
+    unique, first, inverse = np.unique(ids, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    new_ids = np.empty(len(unique), dtype=np.int64)
+    new_ids[order] = np.arange(len(unique))
+    return new_ids[inverse.ravel()], unique[order]
+
+def join_words(words, tokens, token_offsets):
+    """ Build phrases from word ids by gathering UTF-8 bytes
+
+    np.ndarray, np.ndarray, np.ndarray -> list(str)
+
+    Phrase i holds the words tokens[token_offsets[i]:token_offsets[i+1]].
+    Every word is stored followed by a space, and the space after the last
+    word of each phrase becomes a line break, so all phrases of a chunk are
+    decoded with a single split.
+    """
+    encoded = [(word + ' ').encode('utf-8') for word in words]
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    lengths = np.array([len(word) for word in encoded], dtype=np.int64)
+    starts = np.zeros(len(encoded), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    phrases = []
+    for first in range(0, len(token_offsets) - 1, CHUNK_SIZE):
+        offsets = token_offsets[first:first+CHUNK_SIZE+1]
+        chunk = tokens[offsets[0]:offsets[-1]]
+        chunk_lengths = lengths[chunk]
+        ends = np.cumsum(chunk_lengths) #End of each word in chunk bytes
+        positions = (np.repeat(starts[chunk] - ends + chunk_lengths, chunk_lengths)
+                     + np.arange(ends[-1]))
+        text = blob[positions]
+        text[ends[offsets[1:] - offsets[0] - 1] - 1] = ord('\n')
+        phrases.extend(text.tobytes().decode('utf-8').split('\n')[:-1])
+    return phrases
+
+def make_state(link_rows, link_columns, rows, columns):
+    """ LinkStore state from links given by dense ids
+
+    np.ndarray, np.ndarray, list(str), list(str) -> dict
+
+    Repeated links are dropped. The state is the one saved by
+    LinkStore.get_state, with the column ids of each row sorted.
+    """
+    links = np.unique(link_rows.astype(np.int64) * len(columns) + link_columns)
+    row_offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(links // len(columns), minlength=len(rows)),
+              out=row_offsets[1:])
+    return {
+        'version': 1,
+        'generation': 0,
+        'rows': rows,
+        'columns': columns,
+        'row_offsets': row_offsets,
+        'row_links': links % len(columns),
+    }
+
+def generate_standard(words, links, seed=None, exponent=EXPONENT):
+    """ State of random standard database with about links links
+
+    np.ndarray, int, opt:int, opt:float -> dict
+    """
+    rng = np.random.default_rng(seed)
+    words = words[rng.permutation(len(words))] #Words by rank
+    key_counts = rng.integers(1, 4, size=links) #At least one key per entry
+    key_offsets = np.concatenate([[0], np.cumsum(key_counts)])
+    size = int(np.searchsorted(key_offsets, links)) #Entries needed for links
+    key_counts = key_counts[:size]
+    key_counts[-1] -= key_offsets[size] - links
+    keys = sample_zipf(rng, len(words), links, exponent)
+    word_counts = rng.integers(8, 31, size=size)
+    token_offsets = np.concatenate([[0], np.cumsum(word_counts)])
+    tokens = sample_zipf(rng, len(words), int(token_offsets[-1]), exponent)
+    phrases = join_words(words, tokens, token_offsets)
+    unique = ~pd.Index(phrases).duplicated() #Phrases are saved once
+    link_rows = np.repeat(np.arange(size), key_counts)
+    kept = unique[link_rows]
+    link_rows = (np.cumsum(unique) - 1)[link_rows[kept]]
+    link_columns, key_words = renumber(keys[kept])
+    return make_state(link_rows, link_columns,
+                      [phrase for phrase, keep in zip(phrases, unique) if keep],
+                      words[key_words].tolist())
+
+def generate_translation(words_lang1, words_lang2, links, seed=None,
+                         exponent=EXPONENT):
+    """ State of random translation database with links links
+
+    np.ndarray, np.ndarray, int, opt:int, opt:float -> dict
+
+    Frequent words are often drawn together, so pairs are drawn again until
+    there are enough distinct ones.
+    """
+    rng = np.random.default_rng(seed)
+    words_lang1 = words_lang1[rng.permutation(len(words_lang1))]
+    words_lang2 = words_lang2[rng.permutation(len(words_lang2))]
+    pairs = np.empty(0, dtype=np.int64) #Lang2 rank * len(words_lang1) + lang1 rank
+    while len(pairs) < links:
+        missing = links - len(pairs)
+        drawn = (sample_zipf(rng, len(words_lang2), missing, exponent) * len(words_lang1)
+                 + sample_zipf(rng, len(words_lang1), missing, exponent))
+        pairs = pd.unique(np.concatenate([pairs, drawn]))[:links]
+    link_columns, lang1_words = renumber(pairs % len(words_lang1))
+    link_rows, lang2_words = renumber(pairs // len(words_lang1))
+    return make_state(link_rows, link_columns, words_lang2[lang2_words].tolist(),
+                      words_lang1[lang1_words].tolist())
+
+def write_database(state, filepath, storage):
+    """ Write state to new database file | dict, Path, str -> None
+
+    storage is a config storage format. Any database at filepath and its
+    journal are replaced.
+    """
+    filepath.unlink(missing_ok=True)
+    Journal(filepath).discard()
+    if storage == 'sqlite':
+        store = SQLiteStore(filepath)
+        store.import_state(state)
+        store.close()
+    elif storage == 'columnar':
+        columnar.write(state, filepath)
+    else:
+        pd.to_pickle(state, filepath)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate random database for scale testing')
+    parser.add_argument('links', type=int, help='Number of links to generate')
+    parser.add_argument('--languages', nargs=2, metavar=('LANG1', 'LANG2'),
+                        help='Generate translation database')
+    parser.add_argument('--words', nargs='+', default=['fr'], choices=['fr', 'en'],
+                        help='Word list, or one per language for translations')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--exponent', type=float, default=EXPONENT)
+    parser.add_argument('--storage', default=config.get_storage(),
+                        choices=list(config.STORAGE_EXTENSIONS))
+    parser.add_argument('--output', type=pathlib.Path,
+                        help='Database file, default is the app database')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Replace existing database')
+    args = parser.parse_args()
+    name = '_'.join(args.languages) if args.languages else 'standard'
+    filepath = args.output or (config.get_db_path() /
+                               (name + config.STORAGE_EXTENSIONS[args.storage]))
+    if filepath.exists() and not args.overwrite:
+        parser.error(f'{filepath} exists, use --overwrite to replace it')
+    start = time.perf_counter()
+    words = [load_words(language) for language in args.words]
+    if args.languages:
+        state = generate_translation(words[0], words[-1], args.links, args.seed,
+                                     args.exponent)
+    else:
+        state = generate_standard(words[0], args.links, args.seed, args.exponent)
+    print(f'Generated {len(state["rows"])} rows, {len(state["columns"])} columns, '
+          f'{len(state["row_links"])} links in {time.perf_counter() - start:.1f} s')
+    write_database(state, filepath, args.storage)
+    print(f'Wrote {filepath} in {time.perf_counter() - start:.1f} s')
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ import pytest
 import mock
 import config
 from AutoText import AutoText
+from Indexes import ListRange
 import tkinter as tk
 
 @pytest.fixture
@@ -16,7 +17,7 @@ def generate_suggestion_widget():
     widget = AutoText(tk.Tk())
     widget.set_contents('TextSuggestion')
     widget.current_text = 'Text'
-    widget.suggestion_list = ['TextSuggestion']
+    widget.suggestions = ListRange(['TextSuggestion'], 'Text')
     widget.suggestion_text = 'Suggestion'
     widget.current_cursor = '1.4'
     return widget
@@ -182,49 +183,49 @@ def test_get_suggestion(widget):
     
 def test_update_suggestions(widget):
     original_list = ['pou', 'poule', 'poulet', 'poulet frit','poulet au miel']
-    widget.suggestion_list = original_list
+    widget.suggestions = ListRange(original_list)
     widget.current_text = ''
     widget.update_suggestions()
-    assert widget.suggestion_list == original_list
+    assert list(widget.suggestions) == original_list
     widget.current_text = 'c'
     widget.update_suggestions()
-    assert widget.suggestion_list == []
-    widget.suggestion_list = original_list
+    assert list(widget.suggestions) == []
+    widget.suggestions = ListRange(original_list)
     widget.current_text = 'p'
     widget.update_suggestions()
-    assert widget.suggestion_list == original_list
+    assert list(widget.suggestions) == original_list
     widget.current_text = 'pou'
     widget.update_suggestions()
     current_list = [item for item in original_list]
     current_list.remove('pou')
-    assert widget.suggestion_list == current_list
+    assert list(widget.suggestions) == current_list
     widget.current_text = 'poul'
     widget.update_suggestions()
-    assert widget.suggestion_list == current_list
+    assert list(widget.suggestions) == current_list
     widget.current_text = 'poule'
     widget.update_suggestions()
     current_list.remove('poule')
-    assert widget.suggestion_list == current_list
+    assert list(widget.suggestions) == current_list
     widget.current_text = 'poulet'
     widget.update_suggestions()
     current_list.remove('poulet')
-    assert widget.suggestion_list == current_list
+    assert list(widget.suggestions) == current_list
     widget.current_text = 'poulet '
     widget.update_suggestions()
-    assert widget.suggestion_list == current_list
+    assert list(widget.suggestions) == current_list
     widget.current_text = 'poulet f'
     widget.update_suggestions()
     current_list.remove('poulet au miel')
-    assert widget.suggestion_list == ['poulet frit']
+    assert list(widget.suggestions) == ['poulet frit']
     widget.current_text = 'poulet frit'
     widget.update_suggestions()
-    assert widget.suggestion_list == []
+    assert list(widget.suggestions) == []
 
 def test_reset_suggestions(widget):
-    widget.suggestion_list = ['sugg1', 'sugg2']
+    widget.suggestions = ListRange(['sugg1', 'sugg2'])
     widget.suggestion_text = 'sugg1'
     widget.reset_suggestions()
-    assert widget.suggestion_list == []
+    assert widget.suggestions is None
     assert widget.suggestion_text == ''
 
 def test_ignore_suggestion(suggestion_widget):
@@ -234,7 +235,7 @@ def test_ignore_suggestion(suggestion_widget):
     assert widget.get_contents() == 'Text'
     assert widget.current_cursor == '1.4'
     assert widget.get_cursor() == '1.4'
-    assert widget.suggestion_list == []
+    assert not widget.suggestions
     assert widget.suggestion_text == ''
 
 def test_confirm_suggestion(widget, suggestion_widget):
@@ -243,14 +244,14 @@ def test_confirm_suggestion(widget, suggestion_widget):
     widget.confirm_suggestion()
     assert widget.get_contents() == 'TextSuggestion' == widget.current_text
     assert widget.get_cursor() == '1.14' == widget.current_cursor
-    assert widget.suggestion_list == ['TextSuggestion']
+    assert list(widget.suggestions) == ['TextSuggestion']
     assert widget.suggestion_text == ''
     widget = generate_suggestion_widget()
     widget.confirm_suggestion(cursor='1.11')
     assert widget.get_contents() == 'TextSuggestion'
     assert widget.current_text == 'TextSuggest'
     assert widget.get_cursor() == '1.11' == widget.current_cursor
-    assert widget.suggestion_list == ['TextSuggestion']
+    assert list(widget.suggestions) == ['TextSuggestion']
     assert widget.suggestion_text == 'ion'
 
 def test_type_text(widget):
@@ -302,39 +303,39 @@ def test_autocomplete_delete(suggestion_widget):
     assert suggestion_widget.get_contents() == 'Text'
     assert suggestion_widget.suggestion_text == ''
     assert suggestion_widget.current_text == 'Text'
-    assert suggestion_widget.suggestion_list == []
+    assert not suggestion_widget.suggestions
     suggestion_widget = generate_suggestion_widget()
     suggestion_widget.delete_text()
     suggestion_widget.autocomplete(DummyEvent('KP_Delete'))
     assert suggestion_widget.get_contents() == 'Text'
     assert suggestion_widget.suggestion_text == ''
     assert suggestion_widget.current_text == 'Text'
-    assert suggestion_widget.suggestion_list == []
+    assert not suggestion_widget.suggestions
     suggestion_widget = generate_suggestion_widget()
     suggestion_widget.backspace_text()
     suggestion_widget.autocomplete(DummyEvent('BackSpace'))
     assert suggestion_widget.get_contents() == 'Tex'
     assert suggestion_widget.suggestion_text == ''
     assert suggestion_widget.current_text == 'Tex'
-    assert suggestion_widget.suggestion_list == []
+    assert not suggestion_widget.suggestions
     suggestion_widget = generate_suggestion_widget()
     suggestion_widget.delete_text()
     suggestion_widget.autocomplete(DummyEvent(458872))
     assert suggestion_widget.get_contents() == 'Text'
     assert suggestion_widget.suggestion_text == ''
     assert suggestion_widget.current_text == 'Text'
-    assert suggestion_widget.suggestion_list == []
+    assert not suggestion_widget.suggestions
     suggestion_widget = generate_suggestion_widget()
     suggestion_widget.backspace_text()
     suggestion_widget.autocomplete(DummyEvent(458776))
     assert suggestion_widget.get_contents() == 'Tex'
     assert suggestion_widget.suggestion_text == ''
     assert suggestion_widget.current_text == 'Tex'
-    assert suggestion_widget.suggestion_list == []
+    assert not suggestion_widget.suggestions
     
 def get_suggestion_no_list(self): #will replace AutoText method
-    if self.suggestion_list:
-        suggestion = self.suggestion_list[0]
+    if self.suggestions:
+        suggestion = self.suggestions.head()
         self.suggestion_text = suggestion[len(self.current_text):]
     self.update_display()
 
@@ -344,12 +345,12 @@ def mock_get_suggestion_no_list(monkeypatch):
     monkeypatch.setattr(AutoText, 'get_suggestion', get_suggestion_no_list)
     
 def get_suggestion_dummy_list(self): #Will replace AutoText method
-    if not self.suggestion_list:
-        self.suggestion_list = [
+    if not self.suggestions:
+        self.suggestions = ListRange([
             self.current_text + 'Suggestion1',
             self.current_text + 'Suggestion2'
-        ]
-    suggestion = self.suggestion_list[0]
+        ])
+    suggestion = self.suggestions.head()
     self.suggestion_text = suggestion[len(self.current_text):]
     self.update_display()
 
@@ -364,7 +365,7 @@ def test_autocomplete_no_suggestion(widget, mock_get_suggestion_no_list):
     widget.autocomplete(DummyEvent('a'))
     assert widget.current_text == 'a'
     assert widget.suggestion_text == ''
-    assert widget.suggestion_list == []
+    assert not widget.suggestions
     assert widget.current_cursor == '1.1'
 
 def test_autocomplete_dummy_suggestion(widget, mock_get_suggestion_dummy_list):
@@ -373,7 +374,7 @@ def test_autocomplete_dummy_suggestion(widget, mock_get_suggestion_dummy_list):
     widget.autocomplete(DummyEvent('a'))
     assert widget.current_text == 'a'
     assert widget.suggestion_text == 'Suggestion1'
-    assert widget.suggestion_list == ['aSuggestion1', 'aSuggestion2']
+    assert list(widget.suggestions) == ['aSuggestion1', 'aSuggestion2']
     assert widget.current_cursor == '1.1'
     assert widget.get_contents() == 'aSuggestion1'
 
@@ -386,15 +387,15 @@ def test_autocomplete_cursor_moved_left(suggestion_widget):
     assert suggestion_widget.current_cursor == '1.3'
     assert suggestion_widget.get_cursor() == '1.3'
     assert suggestion_widget.suggestion_text == ''
-    assert suggestion_widget.suggestion_list == []
+    assert not suggestion_widget.suggestions
 
 def get_suggestion_single_list(self): #Will replace AutoText method
-    if not self.suggestion_list:
-        self.suggestion_list = ['TextSuggestion']
-    suggestion = self.suggestion_list[0]
+    if not self.suggestions:
+        self.suggestions = ListRange(['TextSuggestion'])
+    suggestion = self.suggestions.head()
     self.suggestion_text = suggestion[len(self.current_text):]
     if not self.suggestion_text:
-        self.suggestion_list = []
+        self.suggestions = None
     self.update_display()
 
 @pytest.fixture
@@ -412,7 +413,7 @@ def test_autocomplete_cursor_moved_right(suggestion_widget,
     assert suggestion_widget.current_cursor == '1.5'
     assert suggestion_widget.get_cursor() == '1.5'
     assert suggestion_widget.suggestion_text == 'uggestion'
-    assert suggestion_widget.suggestion_list == ['TextSuggestion']
+    assert list(suggestion_widget.suggestions) == ['TextSuggestion']
     suggestion_widget.set_cursor('1.13')
     suggestion_widget.autocomplete(DummyEvent(''))
     assert suggestion_widget.current_text == 'TextSuggestio'
@@ -420,7 +421,7 @@ def test_autocomplete_cursor_moved_right(suggestion_widget,
     assert suggestion_widget.current_cursor == '1.13'
     assert suggestion_widget.get_cursor() == '1.13'
     assert suggestion_widget.suggestion_text == 'n'
-    assert suggestion_widget.suggestion_list == ['TextSuggestion']
+    assert list(suggestion_widget.suggestions) == ['TextSuggestion']
     suggestion_widget.set_cursor('1.14')
     suggestion_widget.autocomplete(DummyEvent(''))
     assert suggestion_widget.current_text == 'TextSuggestion'
@@ -428,7 +429,7 @@ def test_autocomplete_cursor_moved_right(suggestion_widget,
     assert suggestion_widget.current_cursor == '1.14'
     assert suggestion_widget.get_cursor() == '1.14'
     assert suggestion_widget.suggestion_text == ''
-    assert suggestion_widget.suggestion_list == []
+    assert not suggestion_widget.suggestions
     
 def test_autocomplete_text_changed_sugg_active(suggestion_widget,
                                                mock_get_suggestion_single_list):
@@ -440,7 +441,7 @@ def test_autocomplete_text_changed_sugg_active(suggestion_widget,
     assert suggestion_widget.current_cursor == '1.6'
     assert suggestion_widget.get_cursor() == '1.6'
     assert suggestion_widget.suggestion_text == ''
-    assert suggestion_widget.suggestion_list == []
+    assert not suggestion_widget.suggestions
     
 def _test_autocomplete(self, event):
     """ Autocomplete logic | tk.Event -> None """
@@ -541,6 +542,6 @@ def _test_debug(self, name, out=False):
     print(f'display_text = {self.get_contents()}')
     print(f'display_cursor = {self.get_cursor()}')
     print(f'suggestion_text = {self.suggestion_text}')
-    print(f'suggestion_list = {self.suggestion_list}')
+    print(f'suggestions = {self.suggestions}')
     if out:
         print(f'Leaving: {name}')
@@ -63,3 +63,32 @@ def test_new_year(monkeypatch):
     assert backup.new_year()
     monkeypatch.setitem(backup.backup_date_dict, 'year', values[9])
     assert backup.new_year()
+
+class CheckpointedDatabase():
+    """ Active database whose journal is folded on checkpoint | None -> None """
+    def __init__(self, filepath):
+        self.filepath = filepath
+
+    def checkpoint(self):
+        self.filepath.write_text('folded changes')
+        self.filepath.with_suffix('.journal').write_text('')
+
+def test_backup_checkpoints_database(tmp_path, monkeypatch):
+    db_path, backup_path = tmp_path / 'db', tmp_path / 'backup'
+    db_path.mkdir()
+    backup_path.mkdir()
+    monkeypatch.setitem(backup.config.config_dict, 'db_path', str(db_path))
+    monkeypatch.setitem(backup.config.config_dict, 'backup_path', str(backup_path))
+    monkeypatch.setitem(backup.config.config_dict, 'db_type', 'standard')
+    monkeypatch.setitem(backup.config.config_dict, 'storage', 'pickle')
+    filepath = db_path / 'standard.pickle'
+    filepath.write_text('snapshot')
+    filepath.with_suffix('.journal').write_text('changes')
+    monkeypatch.setitem(backup.config.active_objects, 'db', CheckpointedDatabase(filepath))
+    for period in backup.DEFAULT_DATES:
+        monkeypatch.setitem(backup.backup_date_dict, period, values[9])
+    backup.backup()
+    for period in ['daily', 'weekly', 'monthly', 'yearly']:
+        assert (backup_path / f'standard_{period}.pickle').read_text() == 'folded changes'
+        assert (backup_path / f'standard_{period}.journal').read_text() == ''
+    assert backup.backup_date_dict['day'] == values[0]
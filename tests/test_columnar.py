@@ -0,0 +1,117 @@
+""" Tests for columnar file format and memory-mapped stores """
+import pathlib
+import tempfile
+import numpy as np
+import columnar
+from Journal import Journal
+from Storage import LinkStore
+
+def standard_test_store():
+    store = LinkStore()
+    store.set_row('phrase 1', ['a', 'b'])
+    store.set_row('phrase 2', ['c', 'd'])
+    store.set_row('phrase 3', ['a', 'd'])
+    store.set_row('été', ['b'])
+    return store
+
+def test_write_read():
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = pathlib.Path(folder) / 'test.columnar'
+        columnar.write(standard_test_store().get_state(), filepath)
+        arrays = columnar.read(filepath)
+        assert isinstance(arrays['row_links'], np.memmap)
+        assert arrays['row_links'].tolist() == [0, 1, 2, 3, 0, 3, 1]
+        assert arrays['column_link_offsets'].tolist() == [0, 2, 4, 5, 7]
+        assert arrays['column_links'].tolist() == [0, 2, 0, 3, 1, 1, 2]
+        assert arrays['row_order'].tolist() == [0, 1, 2, 3]
+
+def test_write_read_empty():
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = pathlib.Path(folder) / 'test.columnar'
+        columnar.write(LinkStore().get_state(), filepath)
+        store = LinkStore.open_columnar(filepath)
+        assert store.is_empty()
+        store.set_row('phrase 1', ['a'])
+        assert store.rows_with_all(['a']) == ['phrase 1']
+
+def test_open_columnar():
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = pathlib.Path(folder) / 'test.columnar'
+        columnar.write(standard_test_store().get_state(), filepath)
+        store = LinkStore.open_columnar(filepath)
+        assert store.links == 7
+        assert store.has_row('été')
+        assert not store.has_column('e')
+        assert store.rows_with_all(['a', 'd']) == ['phrase 3']
+        assert store.columns_of_row('phrase 2') == ['c', 'd']
+        assert store.to_frame().equals(standard_test_store().to_frame())
+
+def test_mapped_store_changes():
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = pathlib.Path(folder) / 'test.columnar'
+        columnar.write(standard_test_store().get_state(), filepath)
+        store = LinkStore.open_columnar(filepath)
+        store.set_row('phrase 4', ['a', 'e'])
+        store.remove_row('phrase 2')
+        store.remove_empty_columns()
+        assert store.row_names() == ['phrase 1', 'phrase 3', 'été', 'phrase 4']
+        assert store.column_names() == ['a', 'b', 'd', 'e']
+        assert store.rows_with_all(['a']) == ['phrase 1', 'phrase 3', 'phrase 4']
+        assert not store.has_column('c')
+        store.add_row('phrase 2') #Removed saved name gets a new id
+        assert store.row_names()[-1] == 'phrase 2'
+        expected = store.to_frame()
+        columnar.write(store.get_state(), filepath)
+        assert LinkStore.open_columnar(filepath).to_frame().equals(expected)
+
+def test_columnar_checkpoint():
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = pathlib.Path(folder) / 'test.columnar'
+        columnar.write(standard_test_store().get_state(), filepath)
+        store = LinkStore.open_columnar(filepath)
+        journal = Journal(filepath, columnar.write)
+        journal.start(store)
+        store.set_row('phrase 4', ['e'])
+        journal.append(store)
+        journal.checkpoint(store, background=False)
+        reopened = LinkStore.open_columnar(filepath)
+        assert reopened.generation == store.generation
+        assert reopened.to_frame().equals(store.to_frame())
+        store.remove_row('phrase 1')
+        journal.append(store)
+        recovered = LinkStore.open_columnar(filepath)
+        Journal(filepath, columnar.write).recover(recovered)
+        assert recovered.rows_with_all(['a']) == ['phrase 3']
+
+def test_mapped_store_revert():
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = pathlib.Path(folder) / 'test.columnar'
+        columnar.write(standard_test_store().get_state(), filepath)
+        store = LinkStore.open_columnar(filepath)
+        store.changes = []
+        store.remove_row('phrase 2')
+        store.remove_empty_columns()
+        store.set_row('phrase 2', ['e'])
+        changes, store.changes = store.changes, None
+        store.revert(changes)
+        assert store.to_frame().equals(standard_test_store().to_frame())
+        assert store.rows.get_id('phrase 2') == 1
+
+def test_columnar_replay_keeps_order_of_undone_removal():
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = pathlib.Path(folder) / 'test.columnar'
+        columnar.write(standard_test_store().get_state(), filepath)
+        store = LinkStore.open_columnar(filepath)
+        journal = Journal(filepath, columnar.write)
+        journal.start(store)
+        store.changes = []
+        store.remove_row('phrase 2', prune=True)
+        journal.checkpoint(store, background=False) #Saved without phrase 2
+        changes, store.changes = store.changes, None
+        store.revert(changes)
+        journal.append(store)
+        recovered = LinkStore.open_columnar(filepath)
+        Journal(filepath, columnar.write).recover(recovered)
+        assert recovered.row_names() == ['phrase 1', 'phrase 2', 'phrase 3', 'été']
+        assert recovered.column_names() == ['a', 'b', 'c', 'd']
+        assert recovered.to_frame().equals(standard_test_store().to_frame())
@@ -1,4 +1,19 @@
 """ Tests for config module
 
-No tests written. Add as bugs arise.
+Tests not written for all functions. Add more as bugs arise.
 """
+import pytest
+import config
+
+@pytest.mark.parametrize('name, language', [
+    ('Français', 'Français'),
+    ('français', 'Français'),
+    ('francais', 'Français'),
+    ('French', 'Français'),
+    ('English', 'English'),
+    ('english', 'English'),
+    ('anglais', 'English'),
+    ('klingon', None)
+])
+def test_get_supported_language(name, language):
+    assert config.get_supported_language(name) == language
@@ -2,7 +2,9 @@
 
 Tests not written for all methods. Add more as bugs arise.
 """
+import sqlite3
 import pytest
+import pandas as pd
 import config
 from Databases import StandardDatabase, TranslationDatabase
 
@@ -35,21 +37,17 @@ def mock_get_translation_filepath(monkeypatch):
     monkeypatch.setattr(TranslationDatabase, 'get_filepath',
                         get_translation_test_filepath)
     
+def delete_test_files(filepath):
+    """ Delete test database file, journal, usage scores and saved indexes | Path -> None """
+    for suffix in ['.journal', '.ranking', '.tokens', '.trigrams']:
+        filepath.with_suffix(suffix).unlink(missing_ok=True)
+    filepath.unlink(missing_ok=True)
+
 def delete_standard_test_db():
-    test_db = get_standard_test_filepath()
-    try:
-        test_db.unlink()
-        print('deleted standard test db')
-    except FileNotFoundError:
-        print('No standard test db to delete')
+    delete_test_files(get_standard_test_filepath())
 
 def delete_translation_test_db():
-    test_db = get_translation_test_filepath()
-    try:
-        test_db.unlink()
-        print('deleted translation test db')
-    except FileNotFoundError:
-        print('No translation test db to delete')
+    delete_test_files(get_translation_test_filepath())
 
 def delete_test_db(func):
     """ Decorator to delete test dbs after testing | func -> func """
@@ -121,6 +119,14 @@ def test_standard_get_phrase_list():
     assert test_db.get_phrase_list(['a','c']) == None
     assert test_db.get_phrase_list(['e','f']) == None
 
+@delete_test_db
+def test_standard_count_phrases():
+    test_db = standard_test_db()
+    assert test_db.count_phrases([]) == 0
+    assert test_db.count_phrases(['a','b']) == 1
+    assert test_db.count_phrases(['a','c']) == 0
+    assert test_db.count_phrases(['e']) == 0
+
 @delete_test_db
 def test_standard_get_matching_keys():
     test_db = standard_test_db()
@@ -152,6 +158,55 @@ def test_standard_valid_phrases():
     assert test_db.valid_phrases('B') == ['Bla bla \n bla bla']
     assert test_db.valid_phrases('') == []
 
+@delete_test_db
+def test_standard_suggestion_ranges():
+    test_db = standard_test_db()
+    test_db.save_entry(['allo_allo', 'zenitude'], 'phrase 3')
+    keys = test_db.key_range('A')
+    assert list(keys) == ['allo_allo'] #Typed key left out
+    assert list(keys.narrow('all')) == ['allo_allo']
+    assert not keys.narrow('allo_allo')
+    assert not test_db.key_range('')
+    phrases = test_db.phrase_range('p')
+    assert list(phrases) == ['phrase 1', 'phrase 2', 'phrase 3']
+    assert list(phrases.narrow('phrase 2')) == []
+    test_db.record_use(['zenitude'], 'phrase 3')
+    assert test_db.ranker.top_of_range('rows', phrases.narrow('phrase ')) == 'phrase 3'
+
+@delete_test_db
+def test_suggestion_ranges_skip_typed_text():
+    test_db = standard_test_db()
+    test_db.save_entry(['chat'], 'chat')
+    test_db.save_entry(['chaton'], 'chaton')
+    test_db.record_use(['chat'], 'chat') #Typed text most used
+    assert test_db.ranker.top_of_range('columns', test_db.key_range('chat')) == 'chaton'
+    assert test_db.ranker.top_of_range('columns', test_db.key_range('CHAT')) == 'chaton'
+    assert test_db.ranker.top_of_range('rows', test_db.phrase_range('chat')) == 'chaton'
+    translation_db = translation_test_db()
+    translation_db.save_entry('chat', 'cat')
+    translation_db.save_entry('chaton', 'catkin')
+    translation_db.record_use('chat', 'cat')
+    assert translation_db.ranker.top_of_range(
+        'columns', translation_db.lang1_key_range('chat')) == 'chaton'
+    assert translation_db.ranker.top_of_range(
+        'rows', translation_db.lang2_key_range('cat')) == 'catkin'
+
+@delete_test_db
+def test_standard_suggestion_cache():
+    test_db = standard_test_db()
+    assert test_db.valid_keys('a') == ['a']
+    assert test_db.valid_keys('A') is test_db.valid_keys('a') #Same form, cached
+    assert list(test_db.key_range('a')) == []
+    assert test_db.suggestion_cache.hits == 2
+    test_db.prepare_undo()
+    test_db.save_entry(['allo'], 'phrase 3')
+    assert test_db.valid_keys('a') == ['a', 'allo'] #New key invalidates
+    assert list(test_db.key_range('a')) == ['allo']
+    test_db.undo()
+    assert test_db.valid_keys('a') == ['a']
+    assert test_db.valid_phrases('phrase 3') == []
+    assert test_db.suggestion_cache.get_stats()['invalidations'] == 2
+
 def translation_test_db():
     test_db = TranslationDatabase('Français','English')
     test_db.save_entry('mouton','lamb')
@@ -256,6 +311,23 @@ def test_translation_get_lang2_matches():
     test_db.save_entry('mouton', 'mutton')
     assert test_db.get_lang2_matches('mouton') == ['lamb', 'mutton']
 
+@delete_test_db
+def test_translation_normalized_matches():
+    test_db = translation_test_db()
+    assert test_db.get_lang2_matches('PORC') == ['pork']
+    test_db.save_entry('Paris', 'Paris')
+    test_db.save_entry("l'été", 'summer')
+    test_db.save_entry("L'ÉTÉ", 'Summer')
+    assert test_db.get_lang2_matches('PARIS') == ['Paris']
+    assert test_db.get_lang2_matches("l'été") == ['summer'] #Stored as typed
+    assert test_db.get_lang2_matches("L'E\u0301te\u0301") == ['summer', 'Summer']
+    assert test_db.get_lang1_matches('SUMMER') == ["l'été", "L'ÉTÉ"]
+    test_db.prepare_undo()
+    test_db.delete_match('Paris', 'Paris')
+    assert test_db.get_lang2_matches('paris') == []
+    test_db.undo()
+    assert test_db.get_lang2_matches('paris') == ['Paris']
+
 def test_translation_valid_lang1_keys():
     test_db = translation_test_db()
     assert test_db.valid_lang1_keys('') == []
@@ -292,3 +364,334 @@ def test_translation_valid_lang2_keys():
     assert test_db.valid_lang2_keys('pork') == ['pork']
     assert test_db.valid_lang2_keys('poultry') == ['poultry']
     assert test_db.valid_lang2_keys('porky') == []
+
+@delete_test_db
+def test_translation_inherited_lookups():
+    test_db = translation_test_db()
+    test_db.save_entry('porc', 'pig')
+    assert test_db.valid_keys('MO') == ['mouton']
+    assert list(test_db.key_range('mo')) == ['mouton']
+    assert test_db.closest_keys('mouon') == ['mouton']
+    assert test_db.correct_keys(['moutn']) == ['mouton']
+    assert test_db.get_phrase_list(['moutn'], fuzzy=True) == ['lamb']
+    assert test_db.valid_phrases('pi') == ['pig']
+    assert list(test_db.phrase_range('por')) == ['pork']
+    assert test_db.search_phrases('LAMB') == ['lamb']
+    assert test_db.search_substring('or') == ['pork']
+    assert test_db.lang1_prefix_index is test_db.key_index
+
+def get_sqlite_test_filepath(self): #will replace instance method
+    folder = config.get_db_path()
+    if isinstance(self, TranslationDatabase):
+        return folder / 'test_translation_db.sqlite'
+    return folder / 'test_standard_db.sqlite'
+
+@pytest.fixture
+def sqlite_storage(monkeypatch):
+    """ Use SQLite storage with test database files | None -> None """
+    delete_standard_test_db() #Would be converted on first use of SQLite
+    delete_translation_test_db()
+    monkeypatch.setitem(config.config_dict, 'storage', 'sqlite')
+    monkeypatch.setattr(StandardDatabase, 'get_filepath', get_sqlite_test_filepath)
+    monkeypatch.setattr(TranslationDatabase, 'get_filepath',
+                        get_sqlite_test_filepath)
+    yield
+    for name in ['test_standard_db.sqlite', 'test_translation_db.sqlite']:
+        (config.get_db_path() / name).unlink(missing_ok=True)
+
+def test_sqlite_standard_database(sqlite_storage):
+    test_db = standard_test_db()
+    test_db.save_entry(['a', 'c'], 'phrase 3')
+    assert test_db.get_index() == ['phrase 1', 'phrase 2', 'phrase 3']
+    assert test_db.get_columns() == ['a', 'b', 'c', 'd']
+    assert test_db.get_phrase_list(['a']) == ['phrase 1', 'phrase 3']
+    assert test_db.get_phrase_list(['a', 'c']) == ['phrase 3']
+    assert test_db.get_phrase_list(['a', 'e']) == None
+    assert test_db.get_matching_keys('phrase 3') == ['a', 'c']
+    test_db.delete_phrase('phrase 2')
+    assert test_db.get_columns() == ['a', 'b', 'c']
+    reloaded_db = StandardDatabase()
+    assert reloaded_db.get_index() == ['phrase 1', 'phrase 3']
+    assert reloaded_db.get_matching_keys('phrase 3') == ['a', 'c']
+    reloaded_db.prepare_undo()
+    reloaded_db.delete_phrase('phrase 1')
+    reloaded_db.save_entry(['e'], 'phrase 1')
+    reloaded_db.undo()
+    assert reloaded_db.get_index() == ['phrase 1', 'phrase 3']
+    assert reloaded_db.get_columns() == ['a', 'b', 'c']
+    reloaded_db.redo()
+    assert reloaded_db.get_phrase_list(['e']) == ['phrase 1']
+    assert reloaded_db.get_columns() == ['a', 'c', 'e']
+    reloaded_db.store.close()
+
+def test_sqlite_commits_in_background(sqlite_storage):
+    test_db = standard_test_db()
+    test_db.saver.delay = 60
+    test_db.save_entry(['e'], 'phrase 3')
+    assert test_db.saver.is_dirty() #Not committed by the interface thread
+    other = sqlite3.connect(str(test_db.get_filepath()))
+    assert other.execute("SELECT COUNT(*) FROM phrases WHERE name = 'phrase 3'").fetchone() == (0,)
+    test_db.flush()
+    assert other.execute("SELECT COUNT(*) FROM phrases WHERE name = 'phrase 3'").fetchone() == (1,)
+    other.close()
+    test_db.store.close()
+
+def test_sqlite_translation_database(sqlite_storage):
+    test_db = translation_test_db()
+    test_db.save_entry('mouton', 'mutton')
+    assert test_db.get_lang2_matches('mouton') == ['lamb', 'mutton']
+    assert test_db.get_lang1_matches('Pork') == ['porc']
+    test_db.delete_match('porc', 'pork')
+    assert test_db.get_index() == ['lamb', 'mutton']
+    assert test_db.get_columns() == ['mouton']
+    assert TranslationDatabase('Français','English').get_index() == ['lamb', 'mutton']
+
+def test_sqlite_converts_pickle_database(monkeypatch):
+    try:
+        standard_test_db()
+        monkeypatch.setitem(config.config_dict, 'storage', 'sqlite')
+        monkeypatch.setattr(StandardDatabase, 'get_filepath',
+                            get_sqlite_test_filepath)
+        test_db = StandardDatabase()
+        assert test_db.get_index() == ['phrase 1', 'phrase 2']
+        assert test_db.get_phrase_list(['c', 'd']) == ['phrase 2']
+        test_db.store.close()
+    finally:
+        delete_standard_test_db()
+        (config.get_db_path() / 'test_standard_db.sqlite').unlink(missing_ok=True)
+
+@delete_test_db
+def test_journal_mode():
+    test_db = standard_test_db()
+    saved_db = pd.read_pickle(get_standard_test_filepath())
+    assert saved_db['rows'] == [] #Changes only in journal
+    assert StandardDatabase().get_phrase_list(['a', 'b']) == ['phrase 1']
+    test_db.prepare_undo()
+    test_db.save_entry(['e'], 'phrase 3')
+    test_db.undo()
+    assert test_db.get_index() == ['phrase 1', 'phrase 2']
+    test_db.redo()
+    assert test_db.get_index() == ['phrase 1', 'phrase 2', 'phrase 3']
+    test_db.checkpoint()
+    saved_db = pd.read_pickle(get_standard_test_filepath())
+    assert saved_db['rows'] == ['phrase 1', 'phrase 2', 'phrase 3']
+
+def get_columnar_test_filepath(self): #will replace instance method
+    return config.get_db_path() / 'test_standard_db.columnar'
+
+def test_columnar_database(monkeypatch):
+    monkeypatch.setitem(config.config_dict, 'storage', 'columnar')
+    monkeypatch.setattr(StandardDatabase, 'get_filepath',
+                        get_columnar_test_filepath)
+    filepath = config.get_db_path() / 'test_standard_db.columnar'
+    try:
+        delete_standard_test_db() #Would be converted on first use
+        test_db = standard_test_db()
+        test_db.save_entry(['a', 'c'], 'phrase 3')
+        test_db.delete_phrase('phrase 2')
+        assert test_db.get_phrase_list(['a']) == ['phrase 1', 'phrase 3']
+        reloaded_db = StandardDatabase() #Replays journal
+        assert reloaded_db.get_index() == ['phrase 1', 'phrase 3']
+        assert reloaded_db.get_columns() == ['a', 'b', 'c']
+        reloaded_db.checkpoint()
+        assert StandardDatabase().get_matching_keys('phrase 3') == ['a', 'c']
+    finally:
+        delete_test_files(filepath)
+
+def test_background_save(monkeypatch):
+    monkeypatch.setitem(config.config_dict, 'journal', False)
+    try:
+        test_db = standard_test_db()
+        test_db.flush()
+        durable_time = test_db.get_durable_time()
+        test_db.save_entry(['e'], 'phrase 3')
+        assert test_db.saver.is_dirty() #Written after idle delay
+        saved_db = pd.read_pickle(get_standard_test_filepath())
+        assert saved_db['rows'] == ['phrase 1', 'phrase 2']
+        test_db.flush()
+        assert test_db.get_durable_time() > durable_time
+        saved_db = pd.read_pickle(get_standard_test_filepath())
+        assert saved_db['rows'] == ['phrase 1', 'phrase 2', 'phrase 3']
+    finally:
+        delete_standard_test_db()
+
+@delete_test_db
+def test_undo_redo():
+    test_db = standard_test_db()
+    test_db.prepare_undo()
+    test_db.delete_phrase('phrase 1')
+    test_db.prepare_undo()
+    test_db.save_entry(['a', 'e'], 'phrase 3')
+    test_db.add_column_if_missing('f') #Undone with last undo point
+    test_db.undo()
+    assert test_db.get_index() == ['phrase 2']
+    assert test_db.get_columns() == ['c', 'd']
+    test_db.undo()
+    assert test_db.get_index() == ['phrase 1', 'phrase 2']
+    assert test_db.get_columns() == ['a', 'b', 'c', 'd']
+    test_db.undo() #Nothing left to undo
+    test_db.redo()
+    test_db.redo()
+    assert test_db.get_index() == ['phrase 2', 'phrase 3']
+    assert test_db.get_columns() == ['c', 'd', 'a', 'e', 'f']
+    test_db.undo()
+    test_db.prepare_undo() #New change, redo no longer possible
+    test_db.redo()
+    assert test_db.get_index() == ['phrase 2']
+    assert StandardDatabase().get_index() == ['phrase 2']
+
+@delete_test_db
+def test_standard_save_entries():
+    test_db = standard_test_db()
+    entries = [(['e', 'a'], 'phrase 3'), (['f'], 'phrase 1'), ([], 'phrase 2'),
+               (['g'], ''), (['c'], 'phrase 2'), (['h'], 'phrase 3')]
+    test_db.save_entries(iter(entries))
+    assert test_db.get_index() == ['phrase 1', 'phrase 3', 'phrase 2']
+    assert test_db.get_columns() == ['a', 'b', 'e', 'f', 'c', 'h'] #Only keys of deleted phrase pruned
+    assert test_db.get_matching_keys('phrase 3') == ['h']
+    assert test_db.get_phrase_list(['c']) == ['phrase 2']
+    test_db.undo() #One undo point for all entries
+    assert test_db.get_index() == ['phrase 1', 'phrase 2']
+    assert test_db.get_columns() == ['a', 'b', 'c', 'd']
+    assert StandardDatabase().get_index() == ['phrase 1', 'phrase 2']
+
+@delete_test_db
+def test_translation_save_entries():
+    test_db = translation_test_db()
+    test_db.save_entries([('agneau', 'lamb'), ('veau', 'veal'), ('', 'pork'),
+                          ('mouton', 'mutton'), ('veau', 'calf')])
+    assert test_db.get_index() == ['lamb', 'pork', 'veal', 'mutton', 'calf']
+    assert test_db.get_columns() == ['mouton', 'porc', 'agneau', 'veau']
+    assert test_db.get_lang1_matches('lamb') == ['mouton', 'agneau']
+    assert test_db.get_lang2_matches('veau') == ['veal', 'calf']
+    test_db.undo()
+    assert test_db.get_index() == ['lamb', 'pork']
+
+@delete_test_db
+def test_accent_folding():
+    fold_accents = config.get_fold_accents()
+    try:
+        config.set_fold_accents(True)
+        test_db = standard_test_db()
+        test_db.save_entry(['été', 'Noël'], "L'été à Noël")
+        test_db.save_entry(['ete'], 'ete')
+        assert test_db.valid_keys('ETE') == ['été', 'ete']
+        assert test_db.valid_keys('noe') == ['Noël']
+        assert test_db.valid_phrases("L'ete") == ["L'été à Noël"]
+        assert test_db.valid_phrases("l'ete") == [] #Phrases stay case specific
+        test_db.delete_phrase("L'été à Noël")
+        assert test_db.valid_keys('e') == ['ete']
+        config.set_fold_accents(False)
+        assert test_db.valid_keys('ETE') == ['ete']
+    finally:
+        config.set_fold_accents(fold_accents)
+
+@delete_test_db
+def test_translation_accent_folding():
+    fold_accents = config.get_fold_accents()
+    try:
+        config.set_fold_accents(True)
+        test_db = translation_test_db()
+        test_db.save_entry('été', 'summer')
+        assert test_db.valid_lang1_keys('ete') == ['été']
+        assert test_db.get_lang2_matches('ETE') == ['summer']
+        assert test_db.valid_lang2_keys('SUM') == ['summer']
+        config.set_fold_accents(False)
+        assert test_db.valid_lang1_keys('ete') == []
+        assert test_db.get_lang2_matches('ETE') == []
+    finally:
+        config.set_fold_accents(fold_accents)
+
+@delete_test_db
+def test_standard_record_use():
+    test_db = standard_test_db()
+    test_db.save_entry(['a', 'c'], 'phrase 3')
+    assert test_db.get_phrase_list(['a']) == ['phrase 1', 'phrase 3']
+    test_db.ranking_saver.delay = 60
+    test_db.record_use(['a', 'c', 'missing'], 'phrase 3')
+    assert test_db.ranking_saver.is_dirty() #Written in background
+    test_db.record_use(['a'], 'missing phrase') #Ignored
+    assert test_db.get_phrase_list(['a']) == ['phrase 3', 'phrase 1']
+    assert test_db.ranker.top('columns', ['a', 'b', 'c'], 2) == ['a', 'c']
+    assert 'missing' not in test_db.ranker.scores['columns']
+    reloaded_db = StandardDatabase() #Pending scores written before loading
+    assert reloaded_db.get_phrase_list(['a']) == ['phrase 3', 'phrase 1']
+
+@delete_test_db
+def test_translation_record_use():
+    test_db = translation_test_db()
+    test_db.save_entry('mouton', 'mutton')
+    assert test_db.get_lang2_matches('mouton') == ['lamb', 'mutton']
+    test_db.record_use('mouton', 'mutton')
+    assert test_db.get_lang2_matches('mouton') == ['mutton', 'lamb']
+    assert test_db.get_lang1_matches('mutton') == ['mouton']
+
+@delete_test_db
+def test_fuzzy_phrase_list():
+    test_db = standard_test_db()
+    test_db.save_entry(['mouton', 'laine'], 'phrase 3')
+    test_db.save_entry(['bouton'], 'phrase 4')
+    test_db.save_entry(['Mouton'], 'phrase 5')
+    assert test_db.closest_keys('mouotn') == ['mouton', 'Mouton']
+    assert test_db.closest_keys('') == []
+    assert test_db.get_phrase_list(['moutn']) == None #Exact unless fuzzy
+    assert test_db.get_phrase_list(['moutn', 'laine'], fuzzy=True) == ['phrase 3']
+    test_db.record_use(['Mouton'], 'phrase 5')
+    assert test_db.get_phrase_list(['moutn'], fuzzy=True) == ['phrase 5'] #Most used
+    assert test_db.get_phrase_list(['a', 'x'], fuzzy=True) == None #Too short to fix
+    test_db.delete_phrase('phrase 4')
+    assert test_db.closest_keys('bouton') == ['mouton', 'Mouton']
+
+@delete_test_db
+def test_translation_fuzzy_matches():
+    test_db = translation_test_db()
+    test_db.save_entry('Paris', 'Paris')
+    assert test_db.get_lang2_matches('moutno') == []
+    assert test_db.get_lang2_matches('moutno', fuzzy=True) == ['lamb']
+    assert test_db.get_lang2_matches('PARSI', fuzzy=True) == ['Paris']
+    assert test_db.get_lang1_matches('lanb', fuzzy=True) == ['mouton']
+    assert test_db.get_lang1_matches('', fuzzy=True) == []
+    assert test_db.closest_lang1_keys('porcs') == ['porc']
+    assert test_db.closest_lang2_keys('prok') == ['pork']
+
+@delete_test_db
+def test_search_phrases():
+    fold_accents = config.get_fold_accents()
+    try:
+        config.set_fold_accents(True)
+        test_db = standard_test_db()
+        test_db.save_entry(['e'], "L'été à Paris")
+        test_db.save_entry(['f'], 'Paris en été')
+        assert test_db.search_phrases('') == []
+        assert test_db.search_phrases('phrase') == ['phrase 1', 'phrase 2']
+        assert test_db.search_phrases('PARIS ete') == ["L'été à Paris", 'Paris en été']
+        test_db.record_use(['f'], 'Paris en été')
+        assert test_db.search_phrases('paris') == ['Paris en été', "L'été à Paris"]
+        test_db.delete_phrase('Paris en été')
+        assert test_db.search_phrases('paris') == ["L'été à Paris"]
+        config.set_fold_accents(False)
+        assert test_db.search_phrases('ete') == []
+        test_db.checkpoint()
+        reloaded_db = StandardDatabase()
+        assert reloaded_db.search_phrases('été') == ["L'été à Paris"]
+        assert not reloaded_db.token_index.dirty #Read from file, not built again
+    finally:
+        config.set_fold_accents(fold_accents)
+
+@delete_test_db
+def test_search_substring():
+    test_db = standard_test_db()
+    test_db.save_entry(['e'], "L'été à Paris")
+    test_db.save_entry(['f'], 'Paris en été')
+    assert test_db.search_substring('') == []
+    assert test_db.search_substring('ase ') == ['phrase 1', 'phrase 2']
+    assert test_db.search_substring('ARIS') == ["L'été à Paris", 'Paris en été']
+    assert test_db.search_substring('ARIS', case_specific=True) == []
+    assert test_db.search_substring('p%1') == ['phrase 1']
+    test_db.record_use(['f'], 'Paris en été')
+    assert test_db.search_substring('aris') == ['Paris en été', "L'été à Paris"]
+    test_db.delete_phrase('Paris en été')
+    test_db.checkpoint()
+    reloaded_db = StandardDatabase()
+    assert reloaded_db.search_substring('aris') == ["L'été à Paris"]
+    assert not reloaded_db.trigram_index.dirty #Read from file, not built again
@@ -0,0 +1,81 @@
+""" Tests for bulk export """
+import json
+import pytest
+import config
+import exporter
+import importer
+from Databases import StandardDatabase, TranslationDatabase
+
+@pytest.fixture
+def test_folder(tmp_path, monkeypatch):
+    """ Save test databases in temporary folder | None -> Path """
+    def get_filepath(self):
+        return tmp_path / (self.name + config.get_db_extension())
+    monkeypatch.setattr(StandardDatabase, 'get_filepath', get_filepath)
+    monkeypatch.setattr(TranslationDatabase, 'get_filepath', get_filepath)
+    return tmp_path
+
+def make_standard_db():
+    """ Standard database with a deleted phrase | None -> StandardDatabase
+
+    Keys are exported in the order they were first saved.
+    """
+    test_db = StandardDatabase()
+    test_db.save_entries([(['a', 'b'], 'phrase 1, with comma'),
+                          (['c'], 'phrase 2'),
+                          (['é', 'a'], 'phrase 3')])
+    test_db.delete_phrase('phrase 2')
+    return test_db
+
+def test_export_csv(test_folder):
+    filepath = test_folder / 'phrases.csv'
+    progress = []
+    total = exporter.export_file(make_standard_db(), filepath, chunk_size=1,
+                                 progress=lambda *args: progress.append(args))
+    assert total == 2
+    assert [rows for rows, seconds in progress] == [1, 2]
+    assert filepath.read_text(encoding='utf-8').splitlines() == [
+        'keys,phrase', 'a b,"phrase 1, with comma"', 'a é,phrase 3']
+
+def test_export_jsonl(test_folder):
+    filepath = test_folder / 'phrases.jsonl'
+    assert exporter.export_file(make_standard_db(), filepath) == 2
+    lines = filepath.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'keys': ['a', 'b'], 'phrase': 'phrase 1, with comma'},
+        {'keys': ['a', 'é'], 'phrase': 'phrase 3'}]
+
+def test_export_translation_round_trip(test_folder):
+    test_db = TranslationDatabase('Français', 'English')
+    test_db.save_entries([('mouton', 'lamb'), ('mouton', 'mutton'), ('porc', 'pork')])
+    filepath = test_folder / 'glossary.tsv'
+    assert exporter.export_file(test_db, filepath) == 3
+    copy_db = TranslationDatabase('English', 'Français')
+    assert importer.import_file(copy_db, filepath) == 3
+    assert copy_db.get_lang2_matches('mouton') == ['lamb', 'mutton']
+    assert copy_db.get_lang1_matches('pork') == ['porc']
+
+def test_export_sqlite(test_folder):
+    storage = config.get_storage()
+    config.set_storage('sqlite')
+    try:
+        test_db = make_standard_db()
+        test_db.save_entry([], 'phrase 3')
+        test_db.store.add_row('no keys')
+        assert list(test_db.iter_entries()) == [
+            (['a', 'b'], 'phrase 1, with comma'), ([], 'no keys')]
+        test_db.store.close()
+    finally:
+        config.set_storage(storage)
+
+def test_export_parquet(test_folder):
+    parquet = pytest.importorskip('pyarrow.parquet')
+    filepath = test_folder / 'phrases.parquet'
+    assert exporter.export_file(make_standard_db(), filepath, chunk_size=1) == 2
+    table = parquet.read_table(filepath)
+    assert table.num_rows == 2
+    assert table.column('keys').to_pylist() == [['a', 'b'], ['a', 'é']]
+
+def test_unsupported_file(test_folder):
+    with pytest.raises(ValueError):
+        exporter.export_file(StandardDatabase(), test_folder / 'phrases.xlsx')
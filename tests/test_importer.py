@@ -0,0 +1,69 @@
+""" Tests for bulk import """
+import json
+import pytest
+import importer
+from Databases import StandardDatabase, TranslationDatabase
+
+@pytest.fixture
+def test_folder(tmp_path, monkeypatch):
+    """ Save test databases in temporary folder | None -> Path """
+    def get_filepath(self):
+        return tmp_path / (self.name + '.pickle')
+    monkeypatch.setattr(StandardDatabase, 'get_filepath', get_filepath)
+    monkeypatch.setattr(TranslationDatabase, 'get_filepath', get_filepath)
+    return tmp_path
+
+def test_import_csv(test_folder):
+    filepath = test_folder / 'phrases.csv'
+    filepath.write_text('keys,phrase\n'
+                        'a b,"phrase 1, with comma"\n'
+                        '\n'
+                        'c,phrase 2\n'
+                        'a  d,phrase 3\n', encoding='utf-8')
+    progress = []
+    test_db = StandardDatabase()
+    test_db.prepare_undo()
+    total = importer.import_file(test_db, filepath, batch_size=2,
+                                 progress=lambda *args: progress.append(args))
+    assert total == 3
+    assert [rows for rows, seconds in progress] == [2, 3]
+    assert test_db.get_index() == ['phrase 1, with comma', 'phrase 2', 'phrase 3']
+    assert test_db.get_phrase_list(['a']) == ['phrase 1, with comma', 'phrase 3']
+    assert test_db.undo_list == [] #Imports can't be undone
+    assert StandardDatabase().get_matching_keys('phrase 3') == ['a', 'd']
+
+def test_import_jsonl(test_folder, capsys):
+    filepath = test_folder / 'phrases.jsonl'
+    lines = [{'keys': ['é', 'b'], 'phrase': 'phrase 1'},
+             {'keys': 'c d', 'phrase': 'phrase 2'},
+             {'keys': [], 'phrase': 'phrase 1'}, #Skipped, doesn't delete phrase 1
+             {'phrase': 'phrase 2'}]
+    filepath.write_text('\n'.join(json.dumps(line) for line in lines) + '\n',
+                        encoding='utf-8')
+    test_db = StandardDatabase()
+    assert importer.import_file(test_db, filepath, progress=print) == 4
+    assert test_db.get_index() == ['phrase 1', 'phrase 2']
+    assert test_db.get_columns() == ['é', 'b', 'c', 'd']
+    assert 'Skipped 2 rows' in capsys.readouterr().out
+
+def test_import_csv_blank_keys(test_folder):
+    test_db = StandardDatabase()
+    test_db.save_entry(['a'], 'phrase 1')
+    filepath = test_folder / 'phrases.csv'
+    filepath.write_text(',phrase 1\n   ,phrase 1\nb,\n', encoding='utf-8')
+    assert importer.import_file(test_db, filepath) == 3
+    assert test_db.get_index() == ['phrase 1']
+    assert test_db.get_matching_keys('phrase 1') == ['a']
+
+def test_import_translation_tsv(test_folder):
+    filepath = test_folder / 'glossary.tsv'
+    filepath.write_text('lang1\tlang2\nmouton\tlamb\nmouton\tmutton\nporc\tpork\n'
+                        'porc\t\n', encoding='utf-8')
+    test_db = TranslationDatabase('Français', 'English')
+    assert importer.import_file(test_db, filepath) == 4
+    assert test_db.get_lang2_matches('mouton') == ['lamb', 'mutton']
+    assert test_db.get_lang1_matches('pork') == ['porc']
+
+def test_unsupported_file(test_folder):
+    with pytest.raises(ValueError):
+        importer.import_file(StandardDatabase(), test_folder / 'phrases.xlsx')
@@ -0,0 +1,251 @@
+""" Tests for name indexes
+
+Lookups through the databases are tested in test_databases.py.
+"""
+import random
+from Indexes import (NormalizedIndex, PrefixIndex, FrontCodedIndex, FuzzyIndex,
+                     TokenIndex, TrigramIndex, PrefixRange, ListRange, front_code,
+                     front_decode, get_deletes, get_checksum, get_trigrams)
+from text_utilities import fold, fold_accents, edit_distance
+from Storage import LinkStore
+
+def test_normalized_index_built_on_first_lookup():
+    store = LinkStore()
+    store.set_row('phrase 1', ['Clé', 'clé'])
+    index = NormalizedIndex(store.column_names)
+    store.attach_index('columns', index)
+    store.add_column('CLÉ')
+    assert not index.built
+    assert index.lookup('cLé') == ['Clé', 'clé', 'CLÉ']
+    store.remove_row('phrase 1', prune=True)
+    assert index.lookup('CLÉ') == ['CLÉ']
+    assert index.lookup('cle') == []
+    assert index.forms == {'clé': ['CLÉ']}
+
+def test_prefix_index():
+    store = LinkStore()
+    store.set_rows([('Été', ['a']), ('étage', ['b']), ('Zoo', ['c'])])
+    index = PrefixIndex(store.row_names)
+    folded_index = PrefixIndex(store.row_names, fold)
+    store.attach_index('rows', index)
+    store.attach_index('rows', folded_index)
+    assert index.starting_with('ét') == ['étage', 'Été']
+    assert folded_index.starting_with('ET') == ['étage', 'Été']
+    store.add_row('ete')
+    assert folded_index.starting_with('ET') == ['étage', 'Été', 'ete']
+    assert folded_index.lookup('ÉTÉ') == ['Été', 'ete']
+    assert index.starting_with('z') == ['Zoo']
+    assert index.find_range('zz') == (2, 2) #Accented letters sort after z
+    store.remove_row('Été')
+    assert folded_index.forms == ['etage', 'ete', 'zoo']
+    assert index.names == ['ete', 'Zoo', 'étage']
+
+def test_front_code():
+    strings = ['', 'phrase', 'phrase 1', 'phrase 2', 'phrases', 'été']
+    block = front_code(strings)
+    assert list(block[0]) == [0, 0, 0, 6, 6, 2, 7, 1, 6, 1, 0, 3]
+    assert block[1] == 'phrase 12sété'
+    assert front_decode(block) == strings
+
+def test_front_coded_index_matches_scan():
+    random.seed(0)
+    words = ['Été', 'été', 'ete', 'phrase', 'Phrase', 'a', 'b', 'bla']
+    phrases = list({' '.join(random.choices(words, k=random.randint(1, 4)))
+                    for _ in range(400)})
+    store = LinkStore()
+    store.set_rows((phrase, ['a']) for phrase in phrases[:200])
+    indexes = [FrontCodedIndex(store.row_names), FrontCodedIndex(store.row_names, fold)]
+    for index in indexes:
+        store.attach_index('rows', index)
+    indexes[0].build()
+    store.set_rows((phrase, ['a']) for phrase in phrases[200:])
+    for phrase in phrases[::3]:
+        store.remove_row(phrase)
+    names = store.row_names()
+    assert len(indexes[0].heads) > 1
+    for prefix in ['', 'e', 'É', 'ete b', 'Phrase b', 'z']:
+        assert indexes[0].starting_with(prefix) == sorted(
+            name for name in names if name.startswith(prefix))
+        assert indexes[1].starting_with(prefix) == sorted(
+            (name for name in names if fold(name).startswith(fold(prefix))), key=fold)
+    assert indexes[1].lookup('ETE') == [name for name in names if fold(name) == 'ete']
+
+def test_prefix_range():
+    store = LinkStore()
+    store.set_rows([('Été', ['a']), ('été', ['a']), ('étage', ['b']), ('étages', ['b']),
+                    ('Zoo', ['c'])])
+    index = PrefixIndex(store.row_names, fold)
+    store.attach_index('rows', index)
+    names = PrefixRange(index, 'et')
+    assert list(names) == ['étage', 'étages', 'Été', 'été']
+    narrowed = names.narrow('eta')
+    assert (narrowed.start, narrowed.stop) == (0, 2)
+    assert narrowed.head() == 'étage'
+    narrowed = narrowed.narrow('étage') #Same form left out
+    assert list(narrowed) == ['étages']
+    assert 'étages' in narrowed and 'étage' not in narrowed and 'Étages' not in narrowed
+    assert not narrowed.narrow('étages')
+    assert narrowed.narrow('étages').head() is None
+    assert list(narrowed.narrow('z')) == ['Zoo'] #Other prefix searched in whole index
+    names = PrefixRange(index, 'étag')
+    store.add_row('étagère')
+    store.add_row('étagé')
+    assert list(names.narrow('étage')) == ['étagère', 'étages'] #Found again
+
+def test_prefix_range_matches_scan():
+    random.seed(1)
+    words = ['Été', 'été', 'ete', 'phrase', 'Phrase', 'a', 'b', 'bla']
+    phrases = list({' '.join(random.choices(words, k=random.randint(1, 4)))
+                    for _ in range(400)})
+    store = LinkStore()
+    store.set_rows((phrase, ['a']) for phrase in phrases)
+    for index in [PrefixIndex(store.row_names, fold), FrontCodedIndex(store.row_names, fold)]:
+        for typed in ['phrase a', 'ete bla', 'b']:
+            names = PrefixRange(index, typed[0])
+            for length in range(1, len(typed) + 1):
+                prefix = fold(typed[:length])
+                names = names.narrow(typed[:length])
+                expected = sorted((name for name in phrases if fold(name).startswith(prefix)
+                                   and not fold(name) == prefix), key=fold)
+                assert list(names) == expected
+                assert names.head() == (expected[0] if expected else None)
+                assert all(name in names for name in expected)
+
+def test_list_range():
+    names = ListRange(['ab', 'abc', 'abd', 'b'], 'ab')
+    assert list(names) == ['abc', 'abd']
+    assert list(names.narrow('abd')) == []
+    assert names.narrow('abc').head() is None
+    assert not ListRange([])
+
+def test_get_deletes():
+    assert get_deletes('abc', 1) == {'abc', 'bc', 'ac', 'ab'}
+    assert get_deletes('ab', 2) == {'ab', 'a', 'b', ''}
+
+def test_fuzzy_index():
+    store = LinkStore()
+    store.set_row('phrase 1', ['mouton', 'Mouton', 'moutons', 'bouton', 'chat',
+                               'anticonstitutionnel', 'anticonstitutionnelle'])
+    index = FuzzyIndex(store.column_names)
+    store.attach_index('columns', index)
+    assert index.closest('mouton') == ['mouton', 'Mouton', 'bouton', 'moutons']
+    assert index.closest('moutno') == ['mouton', 'Mouton'] #Swap counts once
+    assert index.nearest('MOUTÖN') == ['mouton', 'Mouton']
+    assert index.closest('chta') == ['chat']
+    assert index.closest('cht') == [] #No typos in short strings
+    assert index.closest('cht', max_distance=1) == ['chat']
+    assert index.closest('antcontitutionnel') == ['anticonstitutionnel']
+    assert index.closest('anticonstitutionnele') == ['anticonstitutionnel',
+                                                     'anticonstitutionnelle']
+    store.remove_column('bouton')
+    store.add_column('mouron')
+    assert index.closest('mouton', max_distance=1) == ['mouton', 'Mouton', 'mouron',
+                                                       'moutons']
+
+def test_fuzzy_index_matches_scan():
+    random.seed(0)
+    letters = 'abcdeé'
+    names = list({''.join(random.choices(letters, k=random.randint(1, 12)))
+                  for _ in range(3000)})
+    store = LinkStore()
+    store.set_row('phrase 1', names[:1000])
+    index = FuzzyIndex(store.column_names)
+    store.attach_index('columns', index)
+    index.build()
+    store.set_row('phrase 2', names[1000:])
+    for name in names[::3]:
+        store.remove_column(name)
+    names = store.column_names()
+    for query in random.sample(names, 50) + ['abcdeabcde', 'eeeeddddcc', 'abc']:
+        form = fold(query)
+        distance = index.get_max_distance(form)
+        assert sorted(index.closest(query)) == sorted(
+            name for name in names if edit_distance(form, fold(name), distance) <= distance)
+
+def test_token_index():
+    store = LinkStore()
+    store.set_rows([("L'été à Paris", ['a']), ('Paris en été', ['a']),
+                    ('Un ete a Rome', ['b'])])
+    index = TokenIndex(store.row_names)
+    store.attach_index('rows', index)
+    assert index.search('paris') == ["L'été à Paris", 'Paris en été']
+    assert index.search('ÉTÉ PARIS') == ["L'été à Paris", 'Paris en été']
+    assert index.search('été') == ["L'été à Paris", 'Paris en été', 'Un ete a Rome']
+    assert index.search('été', ignore_accents=False) == ["L'été à Paris", 'Paris en été']
+    assert index.search('pari') == [] #Whole words only
+    assert index.search('paris londres') == []
+    assert index.search("l'") == ["L'été à Paris"]
+    assert index.search('') == []
+    store.remove_row('Paris en été')
+    store.add_row('Rome en été')
+    assert index.search('en été') == ['Rome en été']
+
+def test_token_index_saved(tmp_path):
+    filepath = tmp_path / 'standard.tokens'
+    store = LinkStore()
+    store.set_rows([('phrase %d' % number, ['a']) for number in range(10)])
+    index = TokenIndex(store.row_names, filepath)
+    store.attach_index('rows', index)
+    assert index.checksum == 0 #Not built yet
+    assert index.search('phrase 3') == ['phrase 3']
+    store.remove_row('phrase 2')
+    assert index.checksum == get_checksum(store.row_names())
+    index.save()
+    assert not index.dirty
+    loaded_index = TokenIndex(store.row_names, filepath)
+    assert loaded_index.load()
+    assert loaded_index.search('phrase') == index.search('phrase')
+    assert loaded_index.search('2') == []
+    store.add_row('phrase 10')
+    assert not TokenIndex(store.row_names, filepath).load() #Out of date
+    other_index = TokenIndex(store.row_names, filepath)
+    assert other_index.search('10') == ['phrase 10'] #Built again
+    assert other_index.dirty
+
+def test_get_trigrams():
+    assert sorted(get_trigrams('abcab').tolist()) == sorted(
+        (ord(a) << 42) | (ord(b) << 21) | ord(c) for a, b, c in ['abc', 'bca', 'cab'])
+    assert len(get_trigrams('ab')) == 0
+
+def test_trigram_index():
+    store = LinkStore()
+    store.set_rows([("L'été à Paris", ['a']), ('Paris en été', ['a']),
+                    ('Un ete a Rome', ['b'])])
+    index = TrigramIndex(store.row_names)
+    store.attach_index('rows', index)
+    assert index.search('aris') == ["L'été à Paris", 'Paris en été']
+    assert index.search('ETE A') == ["L'été à Paris", 'Un ete a Rome']
+    assert index.search('été', ignore_accents=False) == ["L'été à Paris", 'Paris en été']
+    assert index.search('paris', case_specific=True) == []
+    assert index.search('t') == ["L'été à Paris", 'Paris en été', 'Un ete a Rome']
+    assert index.search('p%ete') == ['Paris en été']
+    assert index.search('e_a') == ["L'été à Paris", 'Un ete a Rome']
+    assert index.search('') == []
+    store.remove_row('Paris en été')
+    store.add_row('Rome en été')
+    assert index.search('en ét') == ['Rome en été']
+    assert index.search('ome') == ['Un ete a Rome', 'Rome en été']
+
+def test_trigram_index_matches_scan(tmp_path):
+    random.seed(0)
+    words = ['Été', 'été', 'ete', 'phrase', 'Phrase', 'a', 'b', 'bla']
+    phrases = list({' '.join(random.choices(words, k=random.randint(1, 4)))
+                    for _ in range(400)})
+    store = LinkStore()
+    store.set_rows((phrase, ['a']) for phrase in phrases[:200])
+    index = TrigramIndex(store.row_names, tmp_path / 'standard.trigrams')
+    index.MERGE_SIZE = 50
+    store.attach_index('rows', index)
+    index.build()
+    store.set_rows((phrase, ['a']) for phrase in phrases[200:])
+    for phrase in phrases[::3]:
+        store.remove_row(phrase)
+    index.save()
+    loaded_index = TrigramIndex(store.row_names, tmp_path / 'standard.trigrams')
+    assert loaded_index.load()
+    names = store.row_names()
+    for pattern in ['e', 'ete', 'ase b', 'e bla', 'Été ph', 'z', 'bla b']:
+        assert sorted(index.search(pattern)) == sorted(
+            name for name in names if fold(pattern) in fold(name))
+        assert sorted(loaded_index.search(pattern, case_specific=True)) == sorted(
+            name for name in names if fold_accents(pattern) in fold_accents(name))
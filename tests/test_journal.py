@@ -0,0 +1,98 @@
+""" Tests for Journal class """
+import shutil
+import pandas as pd
+from Storage import LinkStore
+from Journal import Journal
+
+def journaled_store(filepath):
+    store = LinkStore()
+    store.save(filepath)
+    journal = Journal(filepath)
+    journal.start(store)
+    store.set_row('phrase 1', ['a', 'b'])
+    store.set_row('phrase 2', ['b', 'c'])
+    journal.append(store)
+    return store, journal
+
+def load(filepath):
+    store = LinkStore.load(filepath)
+    Journal(filepath).recover(store)
+    return store
+
+def test_append_does_not_rewrite_pickle(tmp_path):
+    filepath = tmp_path / 'test.pickle'
+    store, journal = journaled_store(filepath)
+    assert LinkStore.load(filepath).row_names() == []
+    generation, records = Journal.read(journal.filepath)
+    assert generation == 0
+    assert records[0] == ['r', 'phrase 1']
+    assert len(records) == 9
+
+def test_replay_gives_same_state(tmp_path):
+    filepath = tmp_path / 'test.pickle'
+    store, journal = journaled_store(filepath)
+    store.set_row('phrase 1', ['c'])
+    store.remove_row('phrase 2')
+    store.remove_empty_columns()
+    store.set_row('phrase 2', ['d'])
+    journal.append(store)
+    loaded = load(filepath)
+    assert loaded.to_frame().equals(store.to_frame())
+    assert not journal.filepath.exists() #Folded into pickle on recovery
+    assert LinkStore.load(filepath).to_frame().equals(store.to_frame())
+
+def test_incomplete_record_ignored(tmp_path):
+    filepath = tmp_path / 'test.pickle'
+    store, journal = journaled_store(filepath)
+    with open(journal.filepath, 'a', encoding='utf-8') as journal_file:
+        journal_file.write('["l", "phrase 3", ')
+    assert load(filepath).row_names() == ['phrase 1', 'phrase 2']
+
+def test_checkpoint(tmp_path):
+    filepath = tmp_path / 'test.pickle'
+    store, journal = journaled_store(filepath)
+    journal.checkpoint(store)
+    journal.wait()
+    assert Journal.read(journal.filepath) == (1, [])
+    assert not journal.old_filepath.exists()
+    assert LinkStore.load(filepath).to_frame().equals(store.to_frame())
+
+def test_interrupted_checkpoint(tmp_path):
+    filepath = tmp_path / 'test.pickle'
+    store, journal = journaled_store(filepath)
+    shutil.copy(filepath, tmp_path / 'before.pickle')
+    shutil.copy(journal.filepath, tmp_path / 'before.journal')
+    journal.checkpoint(store)
+    journal.wait()
+    store.set_row('phrase 3', ['a'])
+    journal.append(store)
+    expected = store.to_frame()
+    #Crash after pickle was replaced, before old journal was deleted
+    shutil.copy(tmp_path / 'before.journal', journal.old_filepath)
+    assert load(filepath).to_frame().equals(expected)
+    #Crash before pickle was replaced
+    store, journal = journaled_store(filepath)
+    journal.checkpoint(store)
+    journal.wait()
+    store.set_row('phrase 3', ['a'])
+    journal.append(store)
+    shutil.copy(tmp_path / 'before.pickle', filepath)
+    shutil.copy(tmp_path / 'before.journal', journal.old_filepath)
+    assert load(filepath).to_frame().equals(expected)
+
+def test_replay_keeps_order_of_undone_removal(tmp_path):
+    filepath = tmp_path / 'test.pickle'
+    store, journal = journaled_store(filepath)
+    store.set_row('phrase 3', ['a'])
+    store.changes = []
+    store.remove_row('phrase 1', prune=True)
+    journal.checkpoint(store, background=False) #Saved without phrase 1
+    store.remove_row('phrase 2', prune=True)
+    changes, store.changes = store.changes, None
+    store.revert(changes) #Undo gives back ids 0 and 1
+    journal.append(store)
+    loaded = load(filepath)
+    assert loaded.row_names() == ['phrase 1', 'phrase 2', 'phrase 3']
+    assert loaded.column_names() == store.column_names() == ['a', 'b', 'c']
+    assert loaded.to_frame().equals(store.to_frame())
+    assert loaded.rows.get_id('phrase 1') == 0
@@ -0,0 +1,62 @@
+""" Tests for Ranker class """
+from Ranker import Ranker, HALF_LIFE
+from Indexes import ListRange
+
+class Clock():
+    """ Time set by tests | None -> float """
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+def test_top_keeps_order_of_unused():
+    ranker = Ranker(clock=Clock())
+    names = ['a', 'b', 'c', 'd']
+    assert ranker.top('rows', names) == ['a']
+    ranker.record('rows', ['c'])
+    ranker.record('rows', ['c', 'b'])
+    assert ranker.top('rows', names) == ['c']
+    assert ranker.top('rows', names, 3) == ['c', 'b', 'a']
+    assert ranker.rank('rows', names) == ['c', 'b', 'a', 'd']
+    assert ranker.rank('columns', names) == names #Axes are separate
+    assert ranker.top('rows', ['d', 'a'], 5) == ['d', 'a']
+
+def test_top_of_range():
+    ranker = Ranker(clock=Clock())
+    assert ranker.top_of_range('rows', ListRange(['a', 'b'])) == 'a'
+    assert ranker.top_of_range('rows', ListRange([])) is None
+    ranker.record('rows', ['b', 'x', 'y'])
+    ranker.record('rows', ['x'])
+    assert ranker.top_of_range('rows', ListRange(['a', 'b'])) == 'b'
+    #More names than used names, used names checked instead
+    assert ranker.top_of_range('rows', ListRange(list('abcdefx'))) == 'x'
+
+def test_decay():
+    clock = Clock()
+    ranker = Ranker(clock=clock)
+    ranker.record('rows', ['old', 'old', 'old'])
+    clock.time = 2 * HALF_LIFE
+    assert ranker.get_score('rows', 'old') == 0.75
+    ranker.record('rows', ['new'])
+    assert ranker.rank('rows', ['old', 'new']) == ['new', 'old']
+    clock.time = 200 * HALF_LIFE #Weights are rescaled
+    ranker.record('rows', ['newer'])
+    assert ranker.get_score('rows', 'newer') == 1.0
+    assert ranker.rank('rows', ['old', 'new', 'newer']) == ['newer', 'new', 'old']
+
+def test_save_and_load(tmp_path):
+    filepath = tmp_path / 'standard.ranking'
+    clock = Clock()
+    ranker = Ranker(clock=clock)
+    ranker.record('columns', ['forgotten'])
+    clock.time = 20 * HALF_LIFE
+    ranker.record('columns', ['é', 'é', 'b'])
+    assert ranker.dirty
+    ranker.save(filepath)
+    assert not ranker.dirty
+    loaded = Ranker.load(filepath)
+    assert loaded.epoch == ranker.epoch
+    assert loaded.scores['columns'] == {'é': ranker.scores['columns']['é'],
+                                        'b': ranker.scores['columns']['b']}
+    assert Ranker.load(tmp_path / 'missing.ranking').scores == {'rows':{}, 'columns':{}}
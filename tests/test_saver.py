@@ -0,0 +1,52 @@
+""" Tests for background saves """
+import threading
+import time
+import pytest
+from Saver import Saver
+
+def test_saves_coalesced():
+    writes = []
+    saver = Saver(lambda: writes.append(time.time()), delay=0.05)
+    for i in range(10):
+        saver.mark_dirty()
+    assert saver.is_dirty()
+    assert writes == [] #Waiting for idle delay
+    time.sleep(0.3)
+    assert len(writes) == 1
+    assert not saver.is_dirty()
+    assert saver.durable_time >= writes[0]
+    assert saver.thread is None #Worker stops when clean
+
+def test_flush():
+    writes = []
+    saver = Saver(lambda: writes.append(1), delay=60)
+    saver.flush() #Nothing pending
+    saver.mark_dirty()
+    saver.flush()
+    assert writes == [1]
+    assert not saver.is_dirty()
+
+def test_change_during_write():
+    started = threading.Event()
+    release = threading.Event()
+    writes = []
+    def write():
+        started.set()
+        release.wait()
+        writes.append(1)
+    saver = Saver(write, delay=0)
+    saver.mark_dirty()
+    started.wait()
+    saver.mark_dirty() #Not included in running write
+    release.set()
+    saver.flush()
+    assert len(writes) == 2
+
+def test_failed_write():
+    def write():
+        raise OSError('disk full')
+    saver = Saver(write, delay=0)
+    saver.mark_dirty()
+    with pytest.raises(OSError):
+        saver.flush()
+    assert saver.is_dirty()
@@ -0,0 +1,147 @@
+""" Tests for storage engines
+
+Database behaviour is tested in test_databases.py. These tests cover
+storage details not visible through the Database classes.
+"""
+import pandas as pd
+from Storage import StringPool, LinkStore, SQLiteStore
+
+def standard_test_store():
+    store = LinkStore()
+    store.set_row('phrase 1', ['a', 'b'])
+    store.set_row('phrase 2', ['c', 'd'])
+    store.set_row('phrase 3', ['a', 'd'])
+    return store
+
+def test_string_pool():
+    pool = StringPool(['a', 'b'])
+    assert pool.add('c') == 2
+    assert pool.add('a') == 0
+    assert pool.remove('b') == 1
+    assert pool.live_names() == ['a', 'c']
+    assert pool.add('b') == 3
+    assert pool.live_ids() == [0, 2, 3]
+    assert 'b' in pool
+    assert len(pool) == 3
+
+def test_link_store_links():
+    store = standard_test_store()
+    assert store.links == 6
+    assert store.rows_with_all(['a']) == ['phrase 1', 'phrase 3']
+    assert store.rows_with_all(['a', 'd']) == ['phrase 3']
+    assert store.columns_of_row('phrase 3') == ['a', 'd']
+    store.set_row('phrase 3', ['b'])
+    assert store.links == 5
+    assert store.columns_of_row('phrase 3') == ['b']
+    assert store.rows_of_column('b') == ['phrase 1', 'phrase 3']
+    store.remove_row('phrase 2')
+    store.remove_empty_columns()
+    assert store.column_names() == ['a', 'b']
+
+def test_link_store_frame_round_trip():
+    store = standard_test_store()
+    frame = store.to_frame()
+    assert list(frame.index) == ['phrase 1', 'phrase 2', 'phrase 3']
+    assert list(frame.columns) == ['a', 'b', 'c', 'd']
+    assert frame.loc['phrase 3', 'd'] == True
+    assert frame.loc['phrase 3', 'b'] == False
+    converted = LinkStore.from_frame(frame)
+    assert converted.to_frame().equals(frame)
+    assert LinkStore().to_frame().equals(pd.DataFrame())
+
+def test_link_store_state_round_trip():
+    store = standard_test_store()
+    store.remove_row('phrase 1')
+    store.set_row('phrase 4', ['e', 'a'])
+    loaded = LinkStore.from_state(store.get_state())
+    assert loaded.row_names() == ['phrase 2', 'phrase 3', 'phrase 4']
+    assert loaded.column_names() == store.column_names()
+    assert loaded.links == store.links
+    assert loaded.rows_with_all(['a']) == ['phrase 3', 'phrase 4']
+    assert loaded.to_frame().equals(store.to_frame())
+
+def test_rows_with_all_intersection():
+    store = LinkStore()
+    for i in range(100):
+        store.set_row(f'phrase {i}', ['common', 'even' if i % 2 else 'odd'])
+    store.set_row('phrase 100', ['common', 'even', 'rare'])
+    store.set_row('phrase 101', ['rare'])
+    assert store.rows_with_all(['common', 'even', 'rare']) == ['phrase 100']
+    assert store.rows_with_all(['rare', 'rare']) == ['phrase 100', 'phrase 101']
+    assert store.rows_with_all(['odd', 'rare']) == []
+    assert store.rows_with_all(['odd', 'common'])[:2] == ['phrase 0', 'phrase 2']
+    assert LinkStore.intersect([1, 5, 9], [0, 1, 2, 9]) == [1, 9]
+
+def test_rows_with_all_bitmaps():
+    store = LinkStore()
+    for i in range(1000):
+        keys = [key for key, step in [('two', 2), ('three', 3), ('five', 5)]
+                if i % step == 0]
+        store.set_row(f'phrase {i}', keys + ['all'])
+    assert store.use_bitmaps({0, 1})
+    assert store.rows_with_all(['two', 'three'])[:3] == ['phrase 0', 'phrase 6',
+                                                         'phrase 12']
+    assert store.count_rows_with_all(['two', 'three', 'five']) == 34
+    assert store.count_rows_with_all(['all']) == 1000
+    store.unlink_names('phrase 30', 'five') #Drops cached bitmap
+    store.set_row('phrase 1000', ['two', 'three', 'five'])
+    assert store.rows_with_all(['two', 'three', 'five'])[-2:] == ['phrase 990',
+                                                                  'phrase 1000']
+    assert store.count_rows_with_all(['two', 'three', 'five']) == 34
+
+def test_link_store_revert():
+    store = standard_test_store()
+    before = store.to_frame()
+    store.changes = []
+    store.remove_row('phrase 1')
+    store.remove_empty_columns()
+    store.set_row('phrase 1', ['a', 'e']) #New id
+    store.remove_column('d')
+    after = store.to_frame()
+    changes, store.changes = store.changes, None
+    redo = store.revert(changes)
+    assert store.to_frame().equals(before)
+    assert store.rows.get_id('phrase 1') == 0 #Same id as before removal
+    store.revert(redo)
+    assert store.to_frame().equals(after)
+
+def test_prune_only_checks_changed_ids(tmp_path):
+    sqlite_store = SQLiteStore(tmp_path / 'test.sqlite')
+    for row, columns in standard_test_store().iter_rows():
+        sqlite_store.set_row(row, columns)
+    for store in [standard_test_store(), sqlite_store]:
+        store.add_column('unused') #Left alone, not linked to removed row
+        store.changes = []
+        store.remove_row('phrase 2', prune=True)
+        assert store.column_names() == ['a', 'b', 'd', 'unused']
+        store.unlink_names('phrase 3', 'a', prune=False)
+        store.unlink_names('phrase 3', 'd', prune=True)
+        assert store.row_names() == ['phrase 1']
+        assert store.column_names() == ['a', 'b', 'unused']
+        store.revert(store.changes)
+        assert store.column_names() == ['a', 'b', 'c', 'd', 'unused']
+        assert store.rows_with_all(['d']) == ['phrase 2', 'phrase 3']
+    sqlite_store.close()
+
+def test_sqlite_store_counts(tmp_path):
+    filepath = tmp_path / 'test.sqlite'
+    store = SQLiteStore(filepath)
+    assert store.is_empty()
+    for row, columns in standard_test_store().iter_rows():
+        store.set_row(row, columns)
+    store.add_column('unused')
+    store.remove_column('d')
+    store.remove_row('phrase 1', prune=True)
+    store.changes = []
+    store.set_row('phrase 4', ['a', 'e'])
+    store.revert(store.changes)
+    assert not store.is_empty()
+    counts = dict(store.counts)
+    assert counts == {table: store.count(table) for table in counts}
+    assert counts == {'phrases': 2, 'keys': 3, 'links': 2}
+    store.save()
+    store.close()
+    reopened = SQLiteStore(filepath)
+    assert reopened.counts == counts
+    assert repr(reopened) == 'SQLiteStore(2 rows, 3 columns, 2 links)'
+    reopened.close()
@@ -0,0 +1,29 @@
+""" Tests for SuggestionCache class
+
+Invalidation by database changes is tested in test_databases.py.
+"""
+from SuggestionCache import SuggestionCache
+
+def test_least_recently_used_dropped():
+    cache = SuggestionCache(size=2)
+    computed = []
+    def get(key, version=0):
+        return cache.get(key, version, lambda: computed.append(key) or key.upper())
+    assert get('a') == 'A'
+    assert get('b') == 'B'
+    assert get('a') == 'A' #Hit, 'b' is now least recent
+    assert get('c') == 'C'
+    assert list(cache.entries) == ['a', 'c']
+    assert get('b') == 'B'
+    assert computed == ['a', 'b', 'c', 'b']
+    assert (cache.hits, cache.misses, len(cache)) == (1, 4, 2)
+
+def test_version_change_empties_cache():
+    cache = SuggestionCache()
+    assert cache.get('a', 0, lambda: 1) == 1
+    assert cache.get('a', 0, lambda: 2) == 1
+    assert cache.get('a', 1, lambda: 3) == 3
+    assert cache.get_stats() == {'entries': 1, 'size': SuggestionCache.SIZE, 'hits': 1,
+                                 'misses': 2, 'invalidations': 1, 'hit_rate': 1 / 3}
+    cache.clear()
+    assert cache.get_stats()['hit_rate'] == 0.0
@@ -0,0 +1,52 @@
+""" Tests for synthetic database generation """
+import numpy as np
+import columnar
+import synthetic
+from Storage import LinkStore, SQLiteStore
+
+WORDS = np.array(['été', 'chat', 'chien', 'maison', 'arbre', 'eau', 'feu',
+                  'terre', 'ciel', 'mer', 'jour', 'nuit'], dtype=object)
+
+def test_join_words():
+    tokens = np.array([0, 1, 2, 3, 0])
+    assert synthetic.join_words(WORDS, tokens, np.array([0, 2, 3, 5])) == [
+        'été chat', 'chien', 'maison été']
+
+def test_sample_zipf():
+    rng = np.random.default_rng(0)
+    counts = np.bincount(synthetic.sample_zipf(rng, 100, 100000), minlength=100)
+    assert len(counts) == 100
+    assert counts[0] > 4 * counts[9] > 0 #About 10x with exponent 1
+
+def test_generate_standard_seeded():
+    state = synthetic.generate_standard(WORDS, 1000, seed=1)
+    assert synthetic.generate_standard(WORDS, 1000, seed=1)['rows'] == state['rows']
+    assert not synthetic.generate_standard(WORDS, 1000, seed=2)['rows'] == state['rows']
+    store = LinkStore.from_state(state)
+    assert 800 < store.links <= 1000 #Repeated keys of an entry are dropped
+    assert len(set(state['rows'])) == len(state['rows'])
+    for phrase, key_list in list(store.iter_rows())[:10]:
+        assert 8 <= len(phrase.split(' ')) <= 30
+        assert 1 <= len(key_list) <= 3
+        assert phrase in store.rows_with_all(key_list)
+
+def test_generate_translation():
+    state = synthetic.generate_translation(WORDS, WORDS[::-1], 100, seed=0)
+    store = LinkStore.from_state(state)
+    assert store.links == 100
+    assert set(state['rows']) == set(WORDS) == set(state['columns'])
+
+def test_write_database(tmp_path):
+    state = synthetic.generate_standard(WORDS, 300, seed=0)
+    links = len(state['row_links'])
+    synthetic.write_database(state, tmp_path / 'test.columnar', 'columnar')
+    store = LinkStore.open_columnar(tmp_path / 'test.columnar')
+    assert store.links == links
+    assert store.row_names() == state['rows']
+    synthetic.write_database(state, tmp_path / 'test.sqlite', 'sqlite')
+    synthetic.write_database(state, tmp_path / 'test.sqlite', 'sqlite') #Replaced
+    store = SQLiteStore(tmp_path / 'test.sqlite')
+    assert store.links == links
+    store.close()
+    synthetic.write_database(state, tmp_path / 'test.pickle', 'pickle')
+    assert LinkStore.load(tmp_path / 'test.pickle').links == links
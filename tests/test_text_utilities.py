@@ -14,3 +14,29 @@ def test_strip_trailing_newline():
     assert strip_trailing_newline(t3) == '\n\rsfdgadfg adfgasfdg '
     assert strip_trailing_newline(t4) == ''
     assert strip_trailing_newline(t5) == 'ddd\nsdfgdf'
+
+def test_normalize():
+    assert normalize('PARIS') == normalize('Paris') == 'paris'
+    assert normalize("L'ÉTÉ") == normalize("l'Été") == "l'été"
+    assert normalize('Straße') == normalize('STRASSE')
+
+def test_fold_accents():
+    assert fold_accents("L'Été à Noël") == "L'Ete a Noel"
+    assert fold_accents('cœur') == 'cœur' #Ligature isn't an accent
+    assert fold("L'ÉTÉ") == fold("l'ete") == "l'ete"
+
+def test_tokenize():
+    assert tokenize("L'ÉTÉ à Noël, 2 fois") == ['l', 'été', 'à', 'noël', '2', 'fois']
+    assert tokenize('E\u0301te\u0301') == ['été'] #Decomposed accents stay in words
+    assert tokenize(' ... ') == []
+
+def test_edit_distance():
+    assert edit_distance('mouton', 'mouton') == 0
+    assert edit_distance('mouton', 'moutn') == 1
+    assert edit_distance('mouton', 'muoton') == 1 #Swap
+    assert edit_distance('mouton', 'mutton') == 2
+    assert edit_distance('mouton', 'mouron') == 1
+    assert edit_distance('', 'abc') == 3
+    assert edit_distance('kitten', 'sitting') == 3
+    assert edit_distance('kitten', 'sitting', limit=1) == 2
+    assert edit_distance('a', 'abcdef', limit=2) == 3
@@ -0,0 +1,66 @@
+""" Tests for word dictionaries """
+import pytest
+import WordDictionary
+from WordDictionary import WordDictionary as Dictionary
+
+WORDS = ['été', 'étés', 'a', 'abaissa', 'abaissable', 'abaissables', 'à',
+         'cassa', 'cassable', 'cassables', 'a', '']
+
+@pytest.fixture
+def dictionary(tmp_path):
+    filepath = tmp_path / 'words.dawg'
+    assert WordDictionary.write(WORDS, filepath) == 10
+    return Dictionary(filepath)
+
+def test_complete(dictionary):
+    assert dictionary.word_count == 10
+    assert dictionary.complete('abais') == ['abaissa', 'abaissable', 'abaissables']
+    assert dictionary.complete('a') == ['a', 'abaissa', 'abaissable', 'abaissables']
+    assert dictionary.complete('a', limit=2) == ['a', 'abaissa']
+    assert dictionary.complete('ét') == ['été', 'étés']
+    assert dictionary.complete('abc') == []
+    assert dictionary.complete('') == sorted(set(WORDS) - {''})[:10]
+
+def test_complete_folded(dictionary):
+    assert dictionary.complete('ete') == []
+    assert dictionary.complete('ete', fold=True) == ['été', 'étés']
+    assert dictionary.complete('étes', fold=True) == ['étés']
+    assert dictionary.complete('a', fold=True) == ['a', 'abaissa', 'abaissable',
+                                                   'abaissables', 'à']
+    assert dictionary.complete('à', fold=True) == ['a', 'abaissa', 'abaissable',
+                                                   'abaissables', 'à']
+    assert dictionary.complete('a', limit=2, fold=True) == ['a', 'abaissa']
+    assert dictionary.complete('abc', fold=True) == []
+
+def test_contains(dictionary):
+    assert 'à' in dictionary
+    assert 'cassable' in dictionary
+    assert 'cass' not in dictionary
+    assert 'cassabless' not in dictionary
+    assert '' not in dictionary
+
+def test_shared_endings():
+    edges, root, count = WordDictionary.build(['abaissable', 'cassable'])
+    assert count == 2
+    #Unused edge, 'a' and 'c', 'bai' after 'a', 'a' after 'c', shared 'ssable'
+    assert len(edges) // 2 == 1 + 2 + 3 + 1 + 6
+
+def test_not_dictionary(tmp_path):
+    filepath = tmp_path / 'words.dawg'
+    filepath.write_bytes(b'not a dictionary')
+    with pytest.raises(ValueError):
+        Dictionary(filepath)
+
+def test_get_dictionary():
+    assert WordDictionary.get_dictionary('Klingon') is None
+    french = WordDictionary.get_dictionary('Français')
+    assert french is WordDictionary.get_dictionary('Français') #Opened once
+    assert 'abaissable' in french
+
+@pytest.mark.parametrize('language', ['français', 'francais', 'french'])
+def test_get_dictionary_of_pair_language(language):
+    assert WordDictionary.get_dictionary(language) is WordDictionary.get_dictionary('Français')
+
+@pytest.mark.parametrize('language', ['English', 'anglais'])
+def test_get_dictionary_not_shipped(language):
+    assert WordDictionary.get_dictionary(language) is None
@@ -4,6 +4,20 @@ Any function that manipulates strings and isn't specific to an object or class
 goes here.
 """
 
+import re
+import unicodedata
+
+WORD = re.compile(r'\w+') #Letters, digits and underscores of a word
+
+class CombiningMarks(dict):
+    """ Translation table dropping combining marks, filled as characters are met """
+
+    def __missing__(self, code):
+        self[code] = None if unicodedata.combining(chr(code)) else code
+        return self[code]
+
+COMBINING_MARKS = CombiningMarks() #Shared by all calls of fold_accents
+
 def strip_trailing_newline(string):
     """ Removes last character recursively while it's a new line | str -> str """
     try:
@@ -12,3 +26,88 @@ def strip_trailing_newline(string):
         return string
     except IndexError:
         return string
+
+def normalize(string):
+    """ Caseless form of string for lookups | str -> str
+
+    Composed and compatibility characters are unified and case is folded,
+    so 'PARIS', 'paris' and 'Paris' or a composed and decomposed 'é' give
+    the same form.
+    """
+    return unicodedata.normalize('NFKC', unicodedata.normalize('NFKC', string).casefold())
+
+def fold_accents(string):
+    """ String without diacritics, 'Été' gives 'Ete' | str -> str
+
+    Letters are decomposed (NFD) and their combining marks dropped.
+    """
+    if string.isascii():
+        return string
+    decomposed = unicodedata.normalize('NFD', string)
+    return unicodedata.normalize('NFC', decomposed.translate(COMBINING_MARKS))
+
+def fold(string):
+    """ Caseless form of string without diacritics | str -> str """
+    return fold_accents(normalize(string))
+
+def tokenize(string):
+    """ Caseless words of string, in order | str -> list(str)
+
+    Words are runs of letters and digits, so punctuation and apostrophes
+    split them: "L'été" gives ['l', 'été'].
+    """
+    return WORD.findall(normalize(string))
+
+def edit_distance(string_1, string_2, limit=None):
+    """ Damerau-Levenshtein distance, adjacent swaps counting as one edit
+
+    str, str, opt:int -> int
+
+    With limit, only cells of the table within limit of its diagonal are
+    computed, and limit + 1 is returned as soon as the distance is known to
+    exceed limit. The shared start and end of the strings take no edits and
+    are skipped, so similar strings take little time.
+    """
+    length_1, length_2 = len(string_1), len(string_2)
+    shortest = min(length_1, length_2)
+    start = 0
+    while start < shortest and string_1[start] == string_2[start]:
+        start += 1
+    shortest -= start
+    end = 0
+    while end < shortest and string_1[-1-end] == string_2[-1-end]:
+        end += 1
+    string_1 = string_1[start:length_1-end]
+    string_2 = string_2[start:length_2-end]
+    if len(string_1) > len(string_2): #First string is the shortest
+        string_1, string_2 = string_2, string_1
+    length_1, length_2 = len(string_1), len(string_2)
+    if limit is None:
+        limit = length_2
+    if length_2 - length_1 > limit:
+        return limit + 1
+    outside = limit + 1 #Value of cells beyond limit, never computed
+    before_previous_row = None
+    previous_row = list(range(length_2 + 1))
+    for i in range(1, length_1 + 1):
+        character_1 = string_1[i-1]
+        row = [outside] * (length_2 + 1)
+        row[0] = row_minimum = min(i, outside)
+        for j in range(max(1, i - limit), min(length_2, i + limit) + 1):
+            character_2 = string_2[j-1]
+            distance = previous_row[j-1] + (character_1 != character_2)
+            if previous_row[j] + 1 < distance:
+                distance = previous_row[j] + 1
+            if row[j-1] + 1 < distance:
+                distance = row[j-1] + 1
+            if (i > 1 and j > 1 and character_1 == string_2[j-2]
+                    and string_1[i-2] == character_2 #Adjacent swap
+                    and before_previous_row[j-2] + 1 < distance):
+                distance = before_previous_row[j-2] + 1
+            row[j] = distance
+            if distance < row_minimum:
+                row_minimum = distance
+        if row_minimum > limit:
+            return outside
+        before_previous_row, previous_row = previous_row, row
+    return min(previous_row[-1], outside)